@@ -5,17 +5,17 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from src.env_models import settings # import '.env' variables pydantic validation settings
+from src.database.db_setup import get_database_url # '.env' database settings (MySQL or `DATABASE_URL`)
 from src.database.db_models import Base # import Base from 'db_models.py' and not 'db_setup.py'
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 # overwriting the `sqlalchemy.url` variable in the 'alembic.ini' file with the same custom
-# Set the path as in 'db_models.py'.  
+# Set the path as in 'db_setup.py'.  
 config.set_main_option(
     name= 'sqlalchemy.url',
-    value=f'mysql+pymysql://{settings.username}:{settings.key_db}@{settings.host}:{settings.port}/{settings.database}'
+    value=get_database_url(),
     ) 
 
 # Interpret the config file for Python logging.
@@ -0,0 +1,81 @@
+"""drop redundant unique indexes
+
+Revision ID: 0b6e4f8a2c73
+Revises: f3a9c6d1e205
+Create Date: 2026-10-18 21:48:20.662019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.fulltext import create_posts_fulltext_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e4f8a2c73'
+down_revision: Union[str, None] = 'f3a9c6d1e205'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Unique indexes that only repeat a primary key (or a key containing one) and the one on the
+# password hashes: each is one more B-tree written on every INSERT.
+# The composite ones only exist on SQLite, where the auto-incremented id is the primary key and
+# the composite primary key used to be kept as a unique constraint (see 'sqlite_compat.py').
+REDUNDANT_UNIQUE = {
+    'users': [['user_id'], ['password']],
+    'posts': [['post_id']],
+    'votes': [['vote_id'], ['vote_id', 'post_id', 'user_id']],
+    'social_groups': [['group_id', 'admin_id']],
+    'group_members': [['member_id'], ['member_id', 'user_id', 'group_id']],
+    }
+
+# Names for the unnamed constraints, to drop them in SQLite batch mode.
+NAMING_CONVENTION = {
+    'column_names': lambda constraint, table: '_'.join(column.name for column in constraint.columns),
+    'uq': 'uq_%(table_name)s_%(column_names)s',
+    }
+
+# Downgrade: MySQL named the unnamed ones after their column.
+RESTORED_UNIQUE = [
+    ('users', 'user_id', ['user_id']),
+    ('users', 'password', ['password']),
+    ('posts', 'post_id', ['post_id']),
+    ('votes', 'vote_id', ['vote_id']),
+    ('social_groups', 'group_admin_uc', ['group_id', 'admin_id']),
+    ('group_members', 'member_id', ['member_id']),
+    ]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    for table, column_sets in REDUNDANT_UNIQUE.items():
+        names = [
+            constraint['name'] or f"uq_{table}_{'_'.join(constraint['column_names'])}"
+            for constraint in inspector.get_unique_constraints(table)
+            if constraint['column_names'] in column_sets
+            ]
+        if not names:
+            continue
+
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for name in names:
+                batch_op.drop_constraint(name, type_='unique')
+
+    if bind.dialect.name == 'sqlite':
+        # Rebuilding `posts` in batch mode dropped the triggers of its full-text table.
+        create_posts_fulltext_index(None, bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+
+    for table, name, columns in RESTORED_UNIQUE:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(name, columns)
+
+    if bind.dialect.name == 'sqlite':
+        create_posts_fulltext_index(None, bind)
@@ -0,0 +1,29 @@
+"""posts title fulltext
+
+Revision ID: 8a3386ce9a37
+Revises: 499f390dc506
+Create Date: 2026-10-18 17:30:12.418302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.database.fulltext import create_posts_fulltext_index, drop_posts_fulltext_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a3386ce9a37'
+down_revision: Union[str, None] = '499f390dc506'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # MySQL: FULLTEXT index on `posts.title`; SQLite: FTS5 table and its sync triggers.
+    create_posts_fulltext_index(None, op.get_bind())
+
+
+def downgrade() -> None:
+    drop_posts_fulltext_index(None, op.get_bind())
@@ -0,0 +1,49 @@
+"""posts upvotes counter
+
+Revision ID: c41d7e2b9f60
+Revises: 8a3386ce9a37
+Create Date: 2026-10-18 19:05:41.207733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e2b9f60'
+down_revision: Union[str, None] = '8a3386ce9a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('upvotes', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill in `post_id` ranges, so that no single UPDATE locks the whole table.
+    posts = sa.table('posts', sa.column('post_id', sa.Integer), sa.column('upvotes', sa.Integer))
+    votes = sa.table('votes', sa.column('post_id', sa.Integer))
+
+    vote_count = (
+        sa.select([sa.func.count()])
+        .select_from(votes)
+        .where(votes.c.post_id == posts.c.post_id)
+        .as_scalar()
+        )
+
+    connection = op.get_bind()
+    last_post_id = connection.execute(sa.select([sa.func.max(posts.c.post_id)])).scalar() or 0
+
+    for first_post_id in range(1, last_post_id + 1, BACKFILL_BATCH_SIZE):
+        connection.execute(
+            posts.update()
+            .where(posts.c.post_id.between(first_post_id, first_post_id + BACKFILL_BATCH_SIZE - 1))
+            .values(upvotes=vote_count)
+            )
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'upvotes')
@@ -0,0 +1,35 @@
+"""table versions
+
+Revision ID: d2f8b1a6c937
+Revises: 0b6e4f8a2c73
+Create Date: 2026-10-18 23:41:12.508316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8b1a6c937'
+down_revision: Union[str, None] = '0b6e4f8a2c73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# `VERSIONED_TABLES` of 'src/database/table_versions.py' when this revision was written.
+VERSIONED_TABLES = ('users', 'posts', 'votes', 'social_groups', 'group_members')
+
+
+def upgrade() -> None:
+    table_versions = op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+        )
+    op.bulk_insert(table_versions, [{'table_name': table_name, 'version': 0} for table_name in VERSIONED_TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
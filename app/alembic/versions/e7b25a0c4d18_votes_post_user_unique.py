@@ -0,0 +1,50 @@
+"""votes post user unique
+
+Revision ID: e7b25a0c4d18
+Revises: c41d7e2b9f60
+Create Date: 2026-10-18 20:12:09.533190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b25a0c4d18'
+down_revision: Union[str, None] = 'c41d7e2b9f60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    # Keep the first vote of each user on a post, and recount the posts that had repeated votes.
+    duplicated_posts = [
+        row[0] for row in connection.execute(sa.text(
+            'SELECT DISTINCT post_id FROM votes GROUP BY post_id, user_id HAVING COUNT(*) > 1'
+            ))
+        ]
+    if duplicated_posts:
+        connection.execute(sa.text(
+            'DELETE FROM votes WHERE vote_id NOT IN ('
+            'SELECT vote_id FROM (SELECT MIN(vote_id) AS vote_id FROM votes GROUP BY post_id, user_id) AS kept_votes'
+            ')'
+            ))
+        connection.execute(
+            sa.text(
+                'UPDATE posts SET upvotes = (SELECT COUNT(*) FROM votes WHERE votes.post_id = posts.post_id) '
+                'WHERE post_id IN :post_ids'
+                ).bindparams(sa.bindparam('post_ids', expanding=True)),
+            {'post_ids': duplicated_posts},
+            )
+
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.create_unique_constraint('votes_post_user_u', ['post_id', 'user_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('votes') as batch_op:
+        batch_op.drop_constraint('votes_post_user_u', type_='unique')
@@ -0,0 +1,59 @@
+"""hot query indexes
+
+Revision ID: f3a9c6d1e205
+Revises: e7b25a0c4d18
+Create Date: 2026-10-18 21:02:47.815392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6d1e205'
+down_revision: Union[str, None] = 'e7b25a0c4d18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# `votes.post_id` is served by the `votes_post_user_u` (post_id, user_id) unique constraint,
+# `group_members.user_id` by `_user_group_uc` (user_id, group_id) and `social_groups.title` by
+# its unique constraint.
+INDEXES = [
+    # GET /posts/ (keyset on created_at, post_id) and `fetch_last_created`.
+    ('posts_created_at_i', 'posts', ['created_at', 'post_id']),
+    # GET /posts/my_posts, and the posts count of a user.
+    ('posts_user_created_at_i', 'posts', ['user_id', 'created_at', 'post_id']),
+    # Votes of a user (also the `ON DELETE CASCADE` of users).
+    ('votes_user_i', 'votes', ['user_id']),
+    # GET /social_groups/ (keyset on created_at, group_id).
+    ('social_groups_created_at_i', 'social_groups', ['created_at', 'group_id']),
+    # GET /group_members/{group_id} (keyset on member_id) and the members count of a group.
+    ('group_members_group_i', 'group_members', ['group_id', 'member_id']),
+    # GET /users/name/{name}.
+    ('users_name_i', 'users', ['name']),
+    ]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+# MySQL drops the index it created for a foreign key once another index can serve it, and
+# refuses to drop that other index later: these put a foreign key index back on downgrade.
+FOREIGN_KEY_INDEXES = {
+    'posts_user_created_at_i': ('posts_users_fk', 'posts', ['user_id']),
+    'votes_user_i': ('votes_users_fk', 'votes', ['user_id']),
+    'group_members_group_i': ('group_members_social_groups_fk', 'group_members', ['group_id']),
+    }
+
+
+def downgrade() -> None:
+    is_mysql = op.get_bind().dialect.name == 'mysql'
+
+    for name, table, columns in reversed(INDEXES):
+        if is_mysql and name in FOREIGN_KEY_INDEXES:
+            op.create_index(*FOREIGN_KEY_INDEXES[name])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,160 @@
+# Concurrency benchmark: the same posts listing served by a plain `def` route (FastAPI
+# threadpool) and by an `async def` route (database executor), under N simultaneous clients.
+# Each variant runs in its own uvicorn process against a temporary SQLite file;
+# `--db-latency-ms` adds a sleep to every statement to stand in for the network round trip
+# to MySQL.
+#
+#   $ cd app
+#   $ python benchmarks/bench_async_routes.py --clients 500 --db-latency-ms 20 --db-workers 128
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--clients', type=int, default=500)
+parser.add_argument('--rounds', type=int, default=3)
+parser.add_argument('--posts', type=int, default=1000)
+parser.add_argument('--page-size', type=int, default=5)
+parser.add_argument('--db-latency-ms', type=float, default=20.0)
+parser.add_argument('--db-workers', type=int, default=128)
+parser.add_argument('--database-file', default=os.path.join(tempfile.mkdtemp(), 'bench_async_routes.db'))
+parser.add_argument('--serve', choices=['sync', 'async'], help=argparse.SUPPRESS)
+parser.add_argument('--port', type=int, default=8765, help=argparse.SUPPRESS)
+args = parser.parse_args()
+
+os.environ['DATABASE_URL'] = f'sqlite:///{args.database_file}'
+os.environ['DB_EXECUTOR_WORKERS'] = str(args.db_workers)
+for variable, value in [('AUTH_SECRET_KEY', 'benchmark'), ('AUTH_ALGORITHM', 'HS256'), ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30')]:
+    os.environ.setdefault(variable, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import event
+
+from src.database.db_setup import engine, get_db, get_async_db
+from src.database.db_models import (
+    Base,
+    Users,
+    Posts,
+    DBSessionPosts,
+    AsyncDBSessionPosts,
+    )
+
+
+def seed() -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            Users.__table__.insert(),
+            [{'user_id': 1, 'name': 'Bench User', 'email': 'bench@mymail.com', 'password': 'x'}],
+            )
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {
+                    'post_id': i,
+                    'user_id': 1,
+                    'title': f'benchmark post {i}',
+                    'view_count': 0,
+                    'created_at': datetime(2023, 1, 1) + timedelta(seconds=i),
+                    }
+                for i in range(1, args.posts + 1)
+            ],
+            )
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+    time.sleep(args.db_latency_ms / 1000)
+
+
+sync_app = FastAPI()
+async_app = FastAPI()
+
+
+@sync_app.get('/posts/')
+def sync_posts(db=Depends(get_db)):
+    return DBSessionPosts(db).all_posts(limit=args.page_size)
+
+
+@async_app.get('/posts/')
+async def async_posts(db=Depends(get_async_db)):
+    return await AsyncDBSessionPosts(db).all_posts(limit=args.page_size)
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'The benchmark server did not start on port {port}.')
+
+
+async def run_clients(port: int) -> dict:
+    limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=None) as client:
+
+        async def one_request() -> float:
+            start = time.perf_counter()
+            response = await client.get('/posts/')
+            assert response.status_code == 200, response.text
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[one_request() for _ in range(args.clients)])
+        elapsed = time.perf_counter() - start
+
+    latencies = sorted(latencies)
+    return {
+        'requests/s': args.clients / elapsed,
+        'p50 ms': statistics.median(latencies) * 1000,
+        'p99 ms': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        }
+
+
+def benchmark(variant: str) -> dict:
+    server = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), *sys.argv[1:], '--database-file', args.database_file, '--serve', variant],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_for_port(args.port)
+        asyncio.run(run_clients(args.port)) # warm up connections and imports.
+        results = [asyncio.run(run_clients(args.port)) for _ in range(args.rounds)]
+    finally:
+        server.terminate()
+        server.wait()
+    return max(results, key=lambda result: result['requests/s'])
+
+
+def main() -> None:
+    if args.serve:
+        app = sync_app if args.serve == 'sync' else async_app
+        uvicorn.run(app, host='127.0.0.1', port=args.port, log_level='warning', backlog=4096)
+        return
+
+    seed()
+    print(
+        f'{args.clients} simultaneous clients, {args.db_latency_ms} ms per statement, '
+        f'{args.db_workers} database executor threads (FastAPI threadpool: 40)'
+        )
+    for name, variant in [('def route', 'sync'), ('async def route', 'async')]:
+        best = benchmark(variant)
+        print(f"{name:>16}: {best['requests/s']:8.1f} requests/s | p50 {best['p50 ms']:8.1f} ms | p99 {best['p99 ms']:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
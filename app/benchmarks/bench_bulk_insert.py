@@ -0,0 +1,73 @@
+# Insert throughput: `DBSession.add_resource` once per row (what thousands of `POST /posts/`
+# calls amount to, without the HTTP overhead) against `DBSession.add_resources` (batched
+# executemany INSERTs), on a temporary SQLite file. `--db-latency-ms` adds a sleep to every
+# statement to stand in for the network round trip to MySQL.
+#
+#   $ cd app
+#   $ python benchmarks/bench_bulk_insert.py --rows 5000 --chunk-size 500 --db-latency-ms 1
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--rows', type=int, default=5000)
+parser.add_argument('--chunk-size', type=int, default=500)
+parser.add_argument('--db-latency-ms', type=float, default=0.0)
+parser.add_argument('--database-file', default=os.path.join(tempfile.mkdtemp(), 'bench_bulk_insert.db'))
+args = parser.parse_args()
+
+os.environ['DATABASE_URL'] = f'sqlite:///{args.database_file}'
+for variable, value in [('AUTH_SECRET_KEY', 'benchmark'), ('AUTH_ALGORITHM', 'HS256'), ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30')]:
+    os.environ.setdefault(variable, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from src.database.db_setup import engine, SessionLocal
+from src.database.db_models import Base, Users, Posts, DBSessionPosts
+
+
+@event.listens_for(engine, 'before_cursor_execute')
+def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+    if args.db_latency_ms:
+        time.sleep(args.db_latency_ms / 1000)
+
+
+def post_dumps(prefix: str) -> list:
+    return [{'user_id': 1, 'title': f'{prefix} post {i}', 'view_count': 0} for i in range(args.rows)]
+
+
+def main() -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            Users.__table__.insert(),
+            [{'user_id': 1, 'name': 'Bench User', 'email': 'bench@mymail.com', 'password': 'x'}],
+            )
+
+    print(f'{args.rows} posts, chunks of {args.chunk_size}, {args.db_latency_ms} ms per statement')
+
+    db = SessionLocal()
+    db_session = DBSessionPosts(db)
+
+    start = time.perf_counter()
+    for dump in post_dumps('single'):
+        db_session.add_resource(dump)
+    single_row = args.rows / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    errors = db_session.add_resources(post_dumps('bulk'), chunk_size=args.chunk_size)
+    bulk = args.rows / (time.perf_counter() - start)
+
+    assert not any(errors)
+    assert db.query(Posts).count() == 2 * args.rows
+    db.close()
+
+    print(f'{"add_resource":>14}: {single_row:10.1f} rows/s')
+    print(f'{"add_resources":>14}: {bulk:10.1f} rows/s ({bulk / single_row:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
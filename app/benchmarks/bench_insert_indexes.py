@@ -0,0 +1,118 @@
+# Insert throughput on `votes` and `group_members` with the schema before and after the
+# 'drop_redundant_unique_indexes' migration (each index is one more B-tree written per row).
+# Both databases are temporary SQLite files built by Alembic.
+#
+#   $ cd app
+#   $ python benchmarks/bench_insert_indexes.py --rows 50000 --chunk-size 1000
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--rows', type=int, default=50000)
+parser.add_argument('--chunk-size', type=int, default=1000)
+parser.add_argument('--repeat', type=int, default=3)
+args = parser.parse_args()
+
+for variable, value in [('AUTH_SECRET_KEY', 'benchmark'), ('AUTH_ALGORITHM', 'HS256'), ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30')]:
+    os.environ.setdefault(variable, value)
+app_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+sys.path.insert(0, app_path)
+
+from sqlalchemy import create_engine, func, select
+
+from src.database.db_models import Users, Posts, Votes, SocialGroups, GroupMembers
+
+SCHEMAS = [
+    ('before', 'f3a9c6d1e205'),
+    ('after', '0b6e4f8a2c73'),
+    ]
+
+# Enough users, posts and groups for `--rows` distinct (post, user) and (user, group) pairs.
+USERS = 1000
+
+
+def build_database(revision: str):
+    database_file = os.path.join(tempfile.mkdtemp(), 'bench_insert_indexes.db')
+    subprocess.run(
+        ['alembic', 'upgrade', revision],
+        cwd=app_path,
+        env={**os.environ, 'DATABASE_URL': f'sqlite:///{database_file}'},
+        check=True,
+        capture_output=True,
+        )
+    return create_engine(f'sqlite:///{database_file}')
+
+
+def seed(engine) -> None:
+    parents = args.rows // USERS + 1
+    with engine.begin() as connection:
+        connection.execute(
+            Users.__table__.insert(),
+            [
+                {'user_id': user_id, 'name': f'User {user_id}', 'email': f'user_{user_id}@mymail.com', 'password': f'hash {user_id}'}
+                for user_id in range(1, USERS + 1)
+                ],
+            )
+        connection.execute(
+            Posts.__table__.insert(),
+            [{'post_id': post_id, 'user_id': 1, 'title': f'post {post_id}', 'view_count': 0} for post_id in range(1, parents + 1)],
+            )
+        connection.execute(
+            SocialGroups.__table__.insert(),
+            [
+                {'group_id': group_id, 'admin_id': group_id, 'title': f'group {group_id}', 'details': 'details'}
+                for group_id in range(1, parents + 1)
+                ],
+            )
+
+
+def rows(table) -> list:
+    if table is Votes:
+        return [{'post_id': i // USERS + 1, 'user_id': i % USERS + 1} for i in range(args.rows)]
+    return [{'group_id': i // USERS + 1, 'user_id': i % USERS + 1, 'admin': False} for i in range(args.rows)]
+
+
+def index_count(engine, table) -> int:
+    return len(engine.execute(f"PRAGMA index_list('{table.__tablename__}')").fetchall())
+
+
+def time_inserts(engine, table) -> float:
+    """Best of `--repeat` runs, emptying the table in between."""
+    dumps = rows(table)
+    timings = []
+    for _ in range(args.repeat):
+        engine.execute(table.__table__.delete())
+        start = time.perf_counter()
+        with engine.begin() as connection:
+            for position in range(0, len(dumps), args.chunk_size):
+                connection.execute(table.__table__.insert(), dumps[position:position + args.chunk_size])
+        timings.append(time.perf_counter() - start)
+        assert engine.execute(select([func.count()]).select_from(table.__table__)).scalar() == args.rows
+    return min(timings)
+
+
+def main() -> None:
+    print(f'{args.rows} rows per table, chunks of {args.chunk_size}, best of {args.repeat}')
+
+    results = {}
+    for schema, revision in SCHEMAS:
+        engine = build_database(revision)
+        seed(engine)
+        for table in [Votes, GroupMembers]:
+            results[schema, table] = (index_count(engine, table), time_inserts(engine, table))
+
+    for table in [Votes, GroupMembers]:
+        (indexes_before, before), (indexes_after, after) = results['before', table], results['after', table]
+        print(
+            f'{table.__tablename__:>14}: before {indexes_before} indexes {args.rows / before:>9.0f} rows/s | '
+            f'after {indexes_after} indexes {args.rows / after:>9.0f} rows/s ({before / after:.2f}x)'
+            )
+
+
+if __name__ == '__main__':
+    main()
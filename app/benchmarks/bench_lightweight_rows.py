@@ -0,0 +1,92 @@
+# Listing fetch time: ORM entities (`joinedload`, then copied into dicts) against the
+# lightweight rows mode (Core select of the response columns mapped straight to dicts) of
+# `DBSessionPosts.all_posts` and `DBSession.all_resources`, on a temporary SQLite file with
+# `--posts` posts (100k by default) and one vote per post.
+#
+#   $ cd app
+#   $ python benchmarks/bench_lightweight_rows.py --posts 100000 --page-sizes 100 1000 10000
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--posts', type=int, default=100000)
+parser.add_argument('--users', type=int, default=100)
+parser.add_argument('--page-sizes', type=int, nargs='+', default=[100, 1000, 10000])
+parser.add_argument('--repeat', type=int, default=5)
+parser.add_argument('--database-file', default=os.path.join(tempfile.mkdtemp(), 'bench_lightweight_rows.db'))
+args = parser.parse_args()
+
+os.environ['DATABASE_URL'] = f'sqlite:///{args.database_file}'
+for variable, value in [('AUTH_SECRET_KEY', 'benchmark'), ('AUTH_ALGORITHM', 'HS256'), ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30')]:
+    os.environ.setdefault(variable, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.db_setup import engine, SessionLocal
+from src.database.db_models import Base, Users, Posts, Votes, DBSession, DBSessionPosts
+
+
+def seed() -> None:
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            Users.__table__.insert(),
+            [
+                {'user_id': i, 'name': f'Bench User {i}', 'email': f'bench_{i}@mymail.com', 'password': f'x{i}'}
+                for i in range(1, args.users + 1)
+            ],
+            )
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {
+                    'post_id': i,
+                    'user_id': i % args.users + 1,
+                    'title': f'benchmark post {i}',
+                    'view_count': i,
+                    'created_at': datetime(2023, 1, 1) + timedelta(seconds=i),
+                    }
+                for i in range(1, args.posts + 1)
+            ],
+            )
+        connection.execute(
+            Votes.__table__.insert(),
+            [{'vote_id': i, 'post_id': i, 'user_id': (i + 1) % args.users + 1} for i in range(1, args.posts + 1)],
+            )
+
+
+def best_time_ms(fetch) -> float:
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        fetch()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    seed()
+    db = SessionLocal()
+    print(f'{args.posts} posts, best of {args.repeat}')
+
+    for page_size in args.page_sizes:
+        for name, db_session, fetch in [
+            ('all_posts', DBSessionPosts(db), lambda db_session, lightweight: db_session.all_posts(limit=page_size, lightweight=lightweight)),
+            ('all_resources', DBSession(db, Votes), lambda db_session, lightweight: db_session.all_resources('post_id', limit=page_size, lightweight=lightweight)),
+            ]:
+            orm = best_time_ms(lambda: (fetch(db_session, False), db.expunge_all()))
+            lightweight = best_time_ms(lambda: fetch(db_session, True))
+            print(
+                f'{name:>14} {page_size:>6} rows: ORM {orm:9.1f} ms | lightweight {lightweight:9.1f} ms '
+                f'({orm / lightweight:.1f}x)'
+                )
+
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
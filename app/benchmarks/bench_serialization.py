@@ -0,0 +1,84 @@
+# Serialization cost of a posts listing per 1,000 posts: the default FastAPI path (the rows
+# validated against `response_model=List[GetAllPosts]`, then encoded by `JSONResponse`)
+# against `rows_response` (the rows reshaped without validation, encoded by `orjson`).
+#
+#   $ cd app
+#   $ python benchmarks/bench_serialization.py --posts 1000 10000
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--posts', type=int, nargs='+', default=[1000, 10000])
+parser.add_argument('--repeat', type=int, default=20)
+args = parser.parse_args()
+
+for variable, value in [('DATABASE_URL', 'sqlite://'), ('AUTH_SECRET_KEY', 'benchmark'), ('AUTH_ALGORITHM', 'HS256'), ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30')]:
+    os.environ.setdefault(variable, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from src.posts.models_posts import GetAllPosts
+from src.serialization import rows_response
+
+response_field = create_response_field(name='response', type_=List[GetAllPosts])
+
+
+def post_rows(posts: int) -> List[dict]:
+    """Rows as `DBSessionPosts.all_posts` builds them."""
+    return [
+        {
+            'post_id': i,
+            'view_count': i * 3,
+            'user_id': i % 100 + 1,
+            'title': f'How to tune the hyperparameters of model {i} without overfitting the validation set?',
+            'created_at': datetime(2023, 1, 1) + timedelta(seconds=i, microseconds=i),
+            'updated_at': None if i % 2 else datetime(2023, 6, 1) + timedelta(seconds=i),
+            'author': f'Bench User {i % 100 + 1}',
+            'email': f'bench_user_{i % 100 + 1}@mymail.com',
+            'upvotes': i % 17,
+            }
+        for i in range(1, posts + 1)
+        ]
+
+
+def default_path(rows: List[dict]) -> bytes:
+    content = asyncio.run(serialize_response(field=response_field, response_content=rows))
+    return JSONResponse(content).body
+
+
+def fast_path(rows: List[dict]) -> bytes:
+    return rows_response(Response(), rows, GetAllPosts).body
+
+
+def best_time_ms(serialize, rows) -> float:
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        serialize(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main() -> None:
+    print(f'best of {args.repeat}')
+    for posts in args.posts:
+        rows = post_rows(posts)
+        default = best_time_ms(default_path, rows) * 1000 / posts
+        fast = best_time_ms(fast_path, rows) * 1000 / posts
+        print(
+            f'{posts:>6} posts: default {default:7.2f} ms | fast {fast:7.2f} ms per 1,000 posts '
+            f'({default / fast:.1f}x), {len(fast_path(rows)) / posts:.0f} bytes per post'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+# Gunicorn settings from `Settings` (see 'src/server.py'):
+#
+#   $ cd app
+#   $ gunicorn -c gunicorn_conf.py main:my_rest_api
+from src.server import gunicorn_options
+
+globals().update(gunicorn_options())
@@ -1,3 +1,6 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from uvicorn import run
 
 from fastapi import FastAPI, Request
@@ -9,23 +12,61 @@ from src.votes.routes_votes import router as votes_router
 from src.social_groups.routes_social_groups import router as social_groups_router
 from src.group_members.routes_group_members import router as group_members_router
 from src.auth.routes_auth import router as auth_router
+from src.metrics.routes_metrics import router as metrics_router
+from src.middleware import TrackRequestRoute, CacheResponses, ConditionalGet, CompressResponses
+from src.pagination import NEXT_CURSOR_HEADER
+from src.posts.view_counter import view_count_buffer
+from src.background_writes import write_queue
+from src.warmup import warm_up
+from src.database.db_setup import run_in_db_executor
+from src.password_hashing import password_hasher
+from src.env_models import settings
 
 from src.route_config import LOGIN_ROUTE
 
-my_rest_api = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before the first request: the server only takes requests once the startup is complete.
+    if settings.warmup:
+        await run_in_db_executor(warm_up, app)
+    write_queue.start()
+    view_count_flusher = asyncio.create_task(
+        view_count_buffer.flush_periodically(write_queue, settings.view_count_flush_interval)
+        )
+    yield
+    view_count_flusher.cancel()
+    # Views counted since the last interval, then everything still queued.
+    view_count_buffer.submit_pending(write_queue)
+    await write_queue.stop()
+    await asyncio.get_running_loop().run_in_executor(None, password_hasher.shutdown)
+
+
+my_rest_api = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://127.0.0.1:8000",
 ]
 
+# Innermost, so that the CORS headers are set per request and not stored with the responses;
+# the ETag check wraps the cache, a `304 Not Modified` does not even look the response up.
+my_rest_api.add_middleware(CacheResponses)
+my_rest_api.add_middleware(ConditionalGet)
+# Outside the cache, which stores the responses uncompressed and serves the hits compressed
+# itself (once per entry and encoding).
+my_rest_api.add_middleware(CompressResponses)
+
 my_rest_api.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, 'ETag'],
 )
 
+my_rest_api.add_middleware(TrackRequestRoute)
+
 # # Add CSP middleware to set Content-Security-Policy header.
 # @my_rest_api.middleware("http")
 # async def add_csp_header(request: Request, call_next):
@@ -39,6 +80,7 @@ my_rest_api.include_router(votes_router, prefix='/votes', tags=['votes'])
 my_rest_api.include_router(social_groups_router, prefix='/social_groups', tags=['social_groups'])
 my_rest_api.include_router(group_members_router, prefix='/group_members', tags=['group_members'])
 my_rest_api.include_router(auth_router, prefix='/' + LOGIN_ROUTE, tags=['authentication'])
+my_rest_api.include_router(metrics_router, prefix='/metrics', tags=['metrics'])
 
 
 def main() -> None:
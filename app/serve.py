@@ -0,0 +1,13 @@
+# Production entry point (see 'src/server.py'); `python main.py` runs the development server.
+#
+#   $ cd app
+#   $ WEB_CONCURRENCY=4 python serve.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from src.server import serve
+
+if __name__ == '__main__':
+    serve()
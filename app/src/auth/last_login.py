@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy import bindparam
+
+from src.database.db_models import Users
+from src.database.db_setup import engine
+from src.background_writes import write_queue
+
+
+def write_last_logins(logins: List[dict]) -> None:
+    """`last_login` of the users of `logins` (`{'login_user_id': ..., 'last_login': ...}`), in
+    one batched UPDATE; a user logged in more than once keeps the latest.
+    """
+    users = Users.__table__
+    statement = (
+        users.update()
+        .where(users.c.user_id == bindparam('login_user_id'))
+        .values(last_login=bindparam('last_login'))
+        )
+    with engine.begin() as connection:
+        connection.execute(statement, logins)
+
+
+def record_login(user_id: int) -> bool:
+    """Hands the login time of `user_id` to the background write queue: the login does not wait
+    for the UPDATE.
+    """
+    return write_queue.submit('last_login', {'login_user_id': user_id, 'last_login': datetime.utcnow()})
+
+
+write_queue.register('last_login', write_last_logins)
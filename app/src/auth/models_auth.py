@@ -11,4 +11,12 @@ class GetToken(BaseModel):
     token_type: str
 
 class TokenData(BaseModel):
-    user_id: Optional[int] = None
\ No newline at end of file
+    user_id: Optional[int] = None
+    exp: Optional[int] = None
+
+class CurrentUser(BaseModel):
+    """The user a request is authenticated as (see `get_current_user`)."""
+    model_config = ConfigDict(from_attributes=True, frozen=True,)
+    user_id: int
+    name: str
+    email: str
@@ -4,15 +4,17 @@ from datetime import datetime
 from fastapi import APIRouter, Depends,  status, HTTPException
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
 
-from src.utils import validate_pw
+from src.password_hashing import password_hasher
+from src.auth.last_login import record_login
 from src.auth.models_auth import GetToken
 from src.oauth2 import create_access_token
-from src.database.db_setup import Session, get_db
-from src.database.db_models import DBSessionUsers
+from src.database.db_setup import Session, get_async_db
+from src.database.db_models import AsyncDBSessionUsers
 from src.database.http_exceptions import (
     check_object_availability,
     check_password,
-    check_add_resource,
+    check_add_resource_async,
+    check_password_hashing_async,
 )
 
 router = APIRouter()
@@ -21,31 +23,39 @@ router = APIRouter()
 # class attribute `email` to `username` but we still use it to store the email as part of the login credentials.
 
 @router.post("/", response_model=GetToken)
-def send_login_credentials(
+async def send_login_credentials(
     user_credentials: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     ):
 
-    db_session = DBSessionUsers(db,)
+    db_session = AsyncDBSessionUsers(db,)
     email = user_credentials.username # login email
     password = user_credentials.password # login password
 
-    resource = db_session.fetch_resource({'email': email}, False)
+    resource = await db_session.fetch_resource({'email': email}, False)
     
     check_object_availability(resource, f'Invalid credentials', 403)
 
     hashed_pw = resource.password
     user_id = resource.user_id
 
-    check_password(validate_pw(password, hashed_pw))
+    # Verified on the hashing processes (see `PasswordHasher`).
+    valid_pw, updated_hashed_pw = await check_password_hashing_async(
+        lambda: password_hasher.verify_password(password, hashed_pw)
+        )
 
-    access_token = create_access_token(data = {"user_id": user_id}) # user ID embedded into the token.
+    check_password(valid_pw)
 
-    check_add_resource(
-        lambda: db_session.update_resource(id_column='user_id', id=user_id, dump={'last_login': datetime.utcnow()}),
-        status_code=500,
-        )
+    access_token = create_access_token(data = {"user_id": user_id}) # user ID embedded into the token.
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    # Hashed with another cost than `BCRYPT_ROUNDS`: stored again with the current one.
+    if updated_hashed_pw is not None:
+        await check_add_resource_async(
+            lambda: db_session.update_resource(id_column='user_id', id=user_id, dump={'password': updated_hashed_pw}),
+            status_code=500,
+            )
 
+    # Written in the background (see `BackgroundWriteQueue`).
+    record_login(user_id)
 
+    return {"access_token": access_token, "token_type": "bearer"}
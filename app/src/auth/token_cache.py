@@ -0,0 +1,105 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from src.auth.models_auth import CurrentUser
+from src.env_models import settings
+
+
+def token_key(token: str) -> bytes:
+    """Cache key of a token: its SHA-256 digest, so the tokens themselves are not kept."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenCache:
+    """Users resolved from verified access tokens, so that the next requests with the same token
+    skip both the signature check and the user lookup. At most `max_entries` tokens are kept,
+    least recently used evicted first; an entry expires with its token (`exp`) or after `ttl`
+    seconds, whichever comes first.
+
+    `invalidate_user` drops the entries of an updated or deleted user. The cache is per worker
+    process, so another process keeps its entries until `ttl` runs out. As in `ResponseCache`,
+    `generation` is bumped by every invalidation and `put` drops users resolved before it.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, clock: Callable[[], float] = time.time,):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[bytes, Tuple[CurrentUser, float]]' = OrderedDict()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self,) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    def get(self, token: str) -> Optional[CurrentUser]:
+        if not self.enabled:
+            return None
+
+        key = token_key(token)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= self.clock():
+                del self.entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, user: CurrentUser, token_expires_at: Optional[float], generation: int) -> bool:
+        if not self.enabled:
+            return False
+
+        expires_at = self.clock() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+
+        with self.lock:
+            if generation != self.generation:
+                return False
+
+            self.entries[token_key(token)] = (user, expires_at)
+            self.entries.move_to_end(token_key(token))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return True
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drops the entries of `user_id`; returns how many were dropped."""
+        with self.lock:
+            self.generation += 1
+            keys = [key for key, (user, _) in self.entries.items() if user.user_id == user_id]
+            for key in keys:
+                del self.entries[key]
+            return len(keys)
+
+    def clear(self,) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def snapshot(self,) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                }
+
+
+token_cache = TokenCache(
+    max_entries=settings.token_cache_size,
+    ttl=settings.token_cache_ttl,
+    )
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from src.database.db_setup import run_in_db_executor
+from src.env_models import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundWriteQueue:
+    """Writes the routes do not need to wait for (e.g. the last login of a user), handed over
+    with `submit` and run by an asyncio worker on the database executor.
+
+    Each kind of write is registered with a function writing a batch of items at once (one
+    executemany UPDATE, say): the worker waits `batch_delay` seconds after an item arrives so
+    that the next ones join it, then writes up to `batch_size` items per call. A failed batch is
+    retried `max_retries` times with exponential backoff, then handed to the kind's
+    `on_failure` (if any) and dropped. At most `max_pending` items wait; beyond that `submit`
+    drops the item.
+
+    Pending items are lost if the process dies; `stop` writes them on a normal shutdown (see
+    the lifespan in 'main.py').
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        batch_delay: float,
+        max_retries: int,
+        retry_delay: float,
+        max_pending: int,
+        clock: Callable[[], float] = time.monotonic,
+        ):
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_pending = max_pending
+        self.clock = clock
+        self.lock = threading.Lock()
+        # (kind, item, submitted at)
+        self.pending: Deque[Tuple[str, Any, float]] = deque()
+        self.writers: Dict[str, Tuple[Callable[[List[Any]], Any], Optional[Callable[[List[Any]], Any]]]] = {}
+        self.wakeup: Optional[asyncio.Event] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.stopping = False
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+
+    def register(
+        self,
+        kind: str,
+        write: Callable[[List[Any]], Any],
+        on_failure: Optional[Callable[[List[Any]], Any]] = None,
+        ) -> None:
+        self.writers[kind] = (write, on_failure)
+
+    def submit(self, kind: str, item: Any) -> bool:
+        """Queues `item` for the `kind` writer; `False` if the queue is full and it was dropped.
+        Called from the event loop.
+        """
+        if kind not in self.writers:
+            raise KeyError(f'No background writer registered for {kind}.')
+
+        with self.lock:
+            if len(self.pending) >= self.max_pending:
+                self.dropped += 1
+                return False
+            self.pending.append((kind, item, self.clock()))
+
+        if self.wakeup is not None:
+            self.wakeup.set()
+        return True
+
+    def take_batch(self,) -> List[Tuple[str, Any, float]]:
+        with self.lock:
+            return [self.pending.popleft() for _ in range(min(self.batch_size, len(self.pending)))]
+
+    async def flush(self,) -> int:
+        """Writes the pending items (on the database executor); returns how many were written."""
+        written = 0
+        while True:
+            batch = self.take_batch()
+            if not batch:
+                return written
+
+            # One call per kind, the items in the order they were submitted.
+            kinds: Dict[str, List[Tuple[Any, float]]] = {}
+            for kind, item, submitted_at in batch:
+                kinds.setdefault(kind, []).append((item, submitted_at))
+
+            for kind, items in kinds.items():
+                if await self.write_batch(kind, [item for item, _ in items]):
+                    written += len(items)
+                    self.last_lag = self.clock() - items[0][1]
+
+    async def write_batch(self, kind: str, items: List[Any]) -> bool:
+        write, on_failure = self.writers[kind]
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await run_in_db_executor(write, items)
+            except Exception:
+                if attempt < self.max_retries:
+                    logger.warning('Background %s write of %d items failed, retrying.', kind, len(items))
+                    self.retries += 1
+                    await asyncio.sleep(self.retry_delay * 2 ** attempt)
+                else:
+                    logger.exception(
+                        'Background %s write of %d items failed %d times, %s.',
+                        kind, len(items), attempt + 1, 'handed back' if on_failure else 'dropped',
+                        )
+                continue
+
+            self.written += len(items)
+            self.batches += 1
+            return True
+
+        self.failed += len(items)
+        if on_failure is not None:
+            on_failure(items)
+        return False
+
+    async def run(self,) -> None:
+        """The worker: runs until `stop`."""
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            if self.batch_delay and not self.stopping:
+                await asyncio.sleep(self.batch_delay)
+            await self.flush()
+            if self.stopping:
+                return
+
+    def start(self,) -> None:
+        self.stopping = False
+        self.wakeup = asyncio.Event()
+        self.worker = asyncio.create_task(self.run())
+        if self.pending:
+            self.wakeup.set()
+
+    async def stop(self,) -> None:
+        """Stops the worker once the pending items are written."""
+        if self.worker is None:
+            await self.flush()
+            return
+
+        self.stopping = True
+        self.wakeup.set()
+        await self.worker
+        self.worker = None
+        self.wakeup = None
+
+    def snapshot(self,) -> Dict[str, Any]:
+        with self.lock:
+            oldest = self.pending[0][2] if self.pending else None
+            return {
+                'depth': len(self.pending),
+                # Age of the oldest pending item; of the last batch written when it was written.
+                'lag_seconds': self.clock() - oldest if oldest is not None else 0.0,
+                'last_write_lag_seconds': self.last_lag,
+                'written': self.written,
+                'batches': self.batches,
+                'retries': self.retries,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                }
+
+
+write_queue = BackgroundWriteQueue(
+    batch_size=settings.write_queue_batch_size,
+    batch_delay=settings.write_queue_batch_delay,
+    max_retries=settings.write_queue_max_retries,
+    retry_delay=settings.write_queue_retry_delay,
+    max_pending=settings.write_queue_max_pending,
+    )
@@ -0,0 +1,69 @@
+# Response compression: gzip, and brotli when the `brotli` package is installed.
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from src.env_models import settings
+
+# Preferred first when the client accepts both.
+SUPPORTED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def preferred_encoding(accept_encoding: str) -> Optional[str]:
+    """Encoding of `SUPPORTED_ENCODINGS` accepted by the `Accept-Encoding` header (with the
+    highest q-value, ties going to the first one), `None` if there is none.
+    """
+    accepted = {}
+    for coding in accept_encoding.split(','):
+        name, _, parameters = coding.partition(';')
+        quality = 1.0
+        parameter, _, value = parameters.partition('=')
+        if parameter.strip().lower() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+
+    candidates = [
+        (accepted.get(encoding, accepted.get('*', 0)), -index, encoding)
+        for index, encoding in enumerate(SUPPORTED_ENCODINGS)
+        ]
+    quality, _, encoding = max(candidates)
+    return encoding if quality > 0 else None
+
+
+class Compressor:
+    """Incremental compression of a response body in `encoding`: `compress` returns the bytes
+    ready for every chunk given (so a streamed response is still sent as it is produced),
+    `finish` the rest.
+    """
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=settings.brotli_quality)
+        else:
+            # wbits 16 + 15: gzip header and trailer.
+            self.compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.process(chunk) + self.compressor.flush()
+        return self.compressor.compress(chunk) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self,) -> bytes:
+        if self.encoding == 'br':
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=settings.brotli_quality)
+    compressor = Compressor(encoding)
+    return compressor.compressor.compress(body) + compressor.finish()
@@ -5,7 +5,10 @@ from typing import (
     Dict,
     List,
     Iterable,
+    Iterator,
+    Callable,
     )
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -23,30 +26,44 @@ from sqlalchemy import (
     ForeignKey,
     PrimaryKeyConstraint,
     UniqueConstraint,
+    Index,
+    select,
+    event,
+    bindparam,
+    literal,
     )
 from sqlalchemy.orm import Session, relationship, joinedload
-from sqlalchemy.sql import func, and_, label
+from sqlalchemy.sql import func, and_, or_, label
 
-from src.database.db_setup import Base, engine
+from src.database.db_setup import Base, engine, run_in_db_executor
+from src.database.read_cache import RequestReadCache, get_read_cache, make_cache_key
+from src.database.table_versions import bumps_table_versions
+from src.database import fulltext
 from src.env_models import settings
 
 class Users(Base):
     __tablename__ = 'users'
-    user_id = Column(Integer, primary_key=True, autoincrement=True, unique=True,)
+    user_id = Column(Integer, primary_key=True, autoincrement=True,)
     name = Column(VARCHAR(100,), nullable=False,)
     email = Column(VARCHAR(100,), nullable=False, unique=True,)
-    password = Column(VARCHAR(100,), nullable=False, unique=True,)
+    password = Column(VARCHAR(100,), nullable=False,)
     created_at = Column(DateTime(timezone=True,), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True,), onupdate=func.now(), nullable=True)
     last_login = Column(DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        Index('users_name_i', 'name'),
+        )
 
 
 class Posts(Base):
     __tablename__ = 'posts'
-    post_id = Column(Integer, primary_key=True, autoincrement=True, unique=True,)
+    post_id = Column(Integer, primary_key=True, autoincrement=True,)
     created_at = Column(DateTime, default=datetime.utcnow,)
     updated_at = Column(DateTime(timezone=True,), onupdate=func.now(), nullable=True)
     view_count = Column(Integer,)
+    # Number of rows in `votes` for the post, kept up to date by `DBSessionVotes` (see
+    # 'src/jobs/reconcile_upvotes.py' for drift, e.g. votes removed by cascades).
+    upvotes = Column(Integer, nullable=False, default=0, server_default='0',)
     title = Column(TEXT,)
     user_id = Column(
         Integer, 
@@ -54,11 +71,22 @@ class Posts(Base):
         nullable=False,
         )
     user_info = relationship('Users', uselist=False)
+    __table_args__ = (
+        # Keyset pages newest first, of all posts and of a user's posts.
+        Index('posts_created_at_i', 'created_at', 'post_id'),
+        Index('posts_user_created_at_i', 'user_id', 'created_at', 'post_id'),
+        )
+
+
+# Full-text index of the titles for databases created with `Base.metadata.create_all` (the
+# Alembic migration 'posts_title_fulltext' creates it otherwise).
+event.listen(Posts.__table__, 'after_create', fulltext.create_posts_fulltext_index)
+event.listen(Posts.__table__, 'before_drop', fulltext.drop_posts_fulltext_index)
 
 
 class Votes(Base):
     __tablename__ = 'votes'
-    vote_id = Column(Integer, primary_key=True, autoincrement=True, unique=True,)
+    vote_id = Column(Integer, primary_key=True, autoincrement=True,)
     post_id = Column(
         Integer,
         ForeignKey('posts.post_id', ondelete='CASCADE', onupdate='CASCADE', name='votes_posts_f',),
@@ -73,10 +101,16 @@ class Votes(Base):
         )
     created_at = Column(DateTime, default=datetime.utcnow,)
     updated_at = Column(DateTime(timezone=True,), onupdate=func.now(), nullable=True)
+    __table_args__ = (
+        # One vote per user and post; lets `DBSessionVotes.add_vote` insert without a lookup.
+        UniqueConstraint('post_id', 'user_id', name='votes_post_user_u'),
+        Index('votes_user_i', 'user_id'),
+        )
 
 
 class SocialGroups(Base):
     __tablename__ = 'social_groups'
+    # Unique on its own (not only in the primary key): `group_members.group_id` references it.
     group_id = Column(Integer, primary_key=True, autoincrement=True, unique=True,)
     admin_id = Column(
         Integer,
@@ -91,13 +125,13 @@ class SocialGroups(Base):
     members_info = relationship('GroupMembers', uselist=False)
     __table_args__ = (
         PrimaryKeyConstraint('group_id', 'admin_id', name='social_groups_p'),
-        UniqueConstraint('group_id', 'admin_id', name='group_user_u'),
+        Index('social_groups_created_at_i', 'created_at', 'group_id'),
     )
 
 
 class GroupMembers(Base):
     __tablename__ = 'group_members'    
-    member_id = Column(Integer, primary_key=True, autoincrement=True, unique=True,)
+    member_id = Column(Integer, primary_key=True, autoincrement=True,)
     created_at = Column(DateTime, default=datetime.utcnow,)
     updated_at = Column(DateTime(timezone=True,), onupdate=func.now(), nullable=True,)
     admin = Column(Boolean, nullable=False, default=False)
@@ -117,6 +151,7 @@ class GroupMembers(Base):
     __table_args__ = (
         PrimaryKeyConstraint('member_id', 'user_id', 'group_id', name='group_members_p'),
         UniqueConstraint('user_id', 'group_id', name='user_group_u'),
+        Index('group_members_group_i', 'group_id', 'member_id'),
     )
     
 #-----------------------------------------------------------------------------------------------------------------------
@@ -128,6 +163,16 @@ class DBSession:
         self.SessionLocal = session_local
         self.Table = Table
 
+    @property
+    def read_cache(self,) -> RequestReadCache:
+        """Lookups already made in this session (request), see `RequestReadCache`."""
+        return get_read_cache(self.SessionLocal)
+
+    @property
+    def written_tables(self,) -> tuple:
+        """Tables whose version the writes of this session bump (see `TableVersions`)."""
+        return (self.Table.__tablename__,)
+
     @property
     def fetch_last_created(self,):
         newest_resource = (
@@ -150,6 +195,71 @@ class DBSession:
         return newest_resource
 
 
+    def keyset_conditions(self, keyset_columns: list, cursor: Optional[list], descending: bool) -> list:
+        """Filter that starts a page right after the row whose `keyset_columns` values are
+        `cursor`, e.g. `(created_at, post_id) < (cursor_created_at, cursor_post_id)` for pages
+        ordered newest first. Written as nested OR/AND so that MySQL can seek on the index.
+        """
+
+        if not cursor:
+            return []
+
+        values = [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) and isinstance(value, str) else value
+            for column, value in zip(keyset_columns, cursor)
+            ]
+
+        condition = None
+        for column, value in reversed(list(zip(keyset_columns, values))):
+            after_value = column < value if descending else column > value
+            if condition is None:
+                condition = after_value
+            else:
+                condition = or_(after_value, and_(column == value, condition))
+
+        return [condition]
+
+
+    @staticmethod
+    def keyset_order(keyset_columns: list, descending: bool) -> list:
+        return [column.desc() if descending else column.asc() for column in keyset_columns]
+
+
+    def fetch_rows(self, statement) -> List[dict]:
+        """Lightweight rows mode: runs a Core `select` of just the columns a response needs and
+        maps the result tuples straight to dicts, skipping the ORM (instances, identity map,
+        relationship loading), which is most of the CPU time of a large page.
+        """
+
+        result = self.SessionLocal.execute(statement)
+        keys = result.keys()
+        return [dict(zip(keys, row)) for row in result.fetchall()]
+
+
+    def stream_rows(self, statement, chunk_size: Optional[int] = None) -> Iterator[dict]:
+        """Streaming version of `fetch_rows`: the rows come from a server-side cursor
+        (`stream_results`, an unbuffered cursor on MySQL) `chunk_size` at a time, so the memory
+        used does not grow with the size of the result. The connection is held until the
+        generator is exhausted or closed.
+        """
+
+        result = self.SessionLocal.execute(statement.execution_options(stream_results=True))
+        try:
+            keys = result.keys()
+            while True:
+                rows = result.fetchmany(chunk_size or settings.stream_chunk_size)
+                if not rows:
+                    return
+                for row in rows:
+                    yield dict(zip(keys, row))
+        finally:
+            result.close()
+
+
+    def select_rows(self, statement, stream: bool = False) -> Union[List[dict], Iterator[dict]]:
+        return self.stream_rows(statement) if stream else self.fetch_rows(statement)
+
+
     def all_resources(
             self,
             search_column: str, 
@@ -157,9 +267,35 @@ class DBSession:
             limit: Optional[int] = None,
             skip: Optional[int] = None,
             search: Optional[str] = "",
+            cursor: Optional[list] = None,
+            columns: List[str] = None,
+            lightweight: bool = True,
+            stream: bool = False,
             ) -> list:
+        """Resources ordered by primary key. `cursor` holds the primary key values of the last
+        row of the previous page (keyset pagination). Without `relationships` the rows are
+        fetched in lightweight mode (`fetch_rows`), restricted to `columns` if given; `stream`
+        returns them as a generator instead (see `stream_rows`).
+        """
         
         search_attr = getattr(self.Table, search_column)
+        keyset_columns = list(self.Table.__table__.primary_key.columns)
+        filter_container = [search_attr.contains(search)] + self.keyset_conditions(keyset_columns, cursor, False)
+
+        if lightweight and not relationships:
+            table_columns = self.Table.__table__.columns
+            selected_columns = [table_columns[column] for column in columns] if columns else list(table_columns)
+
+            all_resources = self.select_rows(
+                select(selected_columns)
+                .where(and_(*filter_container))
+                .order_by(*self.keyset_order(keyset_columns, False))
+                .limit(limit)
+                .offset(skip),
+                stream,
+                )
+
+            return all_resources if stream else all_resources or None
 
         if relationships:
 
@@ -169,7 +305,8 @@ class DBSession:
             all_resources = (
                 self.SessionLocal
                 .query(self.Table)
-                .filter(search_attr.contains(search))
+                .filter(and_(*filter_container))
+                .order_by(*self.keyset_order(keyset_columns, False))
                 .limit(limit)
                 .offset(skip)
                 .options(*join_attributes)
@@ -179,7 +316,8 @@ class DBSession:
             all_resources = (
                 self.SessionLocal
                 .query(self.Table)
-                .filter(search_attr.contains(search))
+                .filter(and_(*filter_container))
+                .order_by(*self.keyset_order(keyset_columns, False))
                 .limit(limit)
                 .offset(skip)
                 .all()
@@ -201,21 +339,32 @@ class DBSession:
         return unique_values
 
     
-    def fetch_resource(self, columns_values: Dict[str, str], convert_to_dict: bool = False) -> dict:
+    def fetch_resource(
+            self,
+            columns_values: Dict[str, str],
+            convert_to_dict: bool = False,
+            relationships: List[str] = None,
+            ) -> dict:
         """Fetch a full resource/row based on a column and its value. The input `columns_values` is a 
         dictionary whose a single item is a {column: value} in the database table, that will serve to
         filter out/find the correct resource; this dictionary, can take as much items as the number of
-        fields in the table. 
+        fields in the table. `relationships` are loaded in the same query (joined), so that reading
+        them later (e.g. in the response model, on the event loop) does not query the database.
         """
         
         items = columns_values.items()
         filter_attributes = [getattr(self.Table, item[0]) == item[1] for item in items]
+        join_attributes = [joinedload(getattr(self.Table, relationship_attr)) for relationship_attr in relationships or []]
 
-        row = (
-            self.SessionLocal
-            .query(self.Table)
-            .filter(and_(*filter_attributes))
-            .first()
+        row = self.read_cache.get_or_fetch(
+            make_cache_key('fetch_resource', self.Table.__tablename__, tuple(sorted(items)), tuple(relationships or [])),
+            lambda: (
+                self.SessionLocal
+                .query(self.Table)
+                .options(*join_attributes)
+                .filter(and_(*filter_attributes))
+                .first()
+                ),
             )
         
         if row and convert_to_dict:
@@ -224,6 +373,19 @@ class DBSession:
         return row
 
 
+    def resource_exists(self, columns_values: Dict[str, Any]) -> bool:
+        """Existence probe: `SELECT EXISTS (SELECT 1 ... WHERE column = value ...)`; with the
+        columns indexed it costs one index lookup, unlike fetching `unique_values`.
+        """
+
+        items = columns_values.items()
+        filter_attributes = [getattr(self.Table, item[0]) == item[1] for item in items]
+
+        resource_query = self.SessionLocal.query(self.Table).filter(and_(*filter_attributes))
+
+        return self.SessionLocal.query(resource_query.exists()).scalar()
+
+
     def fetch_grouped_resources(self, id_column: str, id: int, join_column: str = False) -> list:
         
         attribute = getattr(self.Table, id_column)
@@ -253,15 +415,22 @@ class DBSession:
     
 
     def fetch_value_by_unique_value(self, column_unique: str, column_target: str, value_to_match: Any):
+        """Value of `column_target` in the row where `column_unique` is `value_to_match`, `None`
+        if there is no such row; with a non-nullable target (e.g. the owner `user_id` of a post)
+        it is an ownership and existence check in one query.
+        """
 
         attribute_find_row = getattr(self.Table, column_unique)
         attribute_find_column = getattr(self.Table, column_target)
 
-        value = (
-            self.SessionLocal
-            .query(attribute_find_column)
-            .filter(attribute_find_row == value_to_match)
-            .first()
+        value = self.read_cache.get_or_fetch(
+            make_cache_key('fetch_value_by_unique_value', self.Table.__tablename__, column_unique, column_target, value_to_match),
+            lambda: (
+                self.SessionLocal
+                .query(attribute_find_column)
+                .filter(attribute_find_row == value_to_match)
+                .first()
+                ),
             )
         
         if isinstance(value, tuple):
@@ -270,7 +439,13 @@ class DBSession:
             return value
 
 
-    def add_resource(self, dump: dict) -> None:
+    @bumps_table_versions
+    def add_resource(self, dump: dict) -> Any:
+        """Inserts the resource and returns it as persisted: the primary key comes back with the
+        INSERT (cursor `lastrowid`) and the sessions do not expire objects on commit, so no query
+        is needed to read the new row.
+        """
+        self.read_cache.invalidate()
         
         new_resource = self.Table(**dump)
         try:
@@ -282,12 +457,74 @@ class DBSession:
             self.SessionLocal.begin()
             self.SessionLocal.add(new_resource)
             self.SessionLocal.commit()
-        return
+        return new_resource
     
     
+    @bumps_table_versions
+    def add_resources(
+        self,
+        dumps: List[dict],
+        chunk_size: Optional[int] = None,
+        on_inserted: Callable[[List[dict]], None] = None,
+        ) -> List[Optional[str]]:
+        """Bulk version of `add_resource`: rows are inserted with one executemany INSERT (Core, no
+        ORM objects) per chunk of `chunk_size` rows, each chunk in its own transaction. If a chunk
+        fails, its rows are inserted one by one so that only the offending rows are rejected.
+        `on_inserted` runs in the same transaction as each INSERT, with the inserted dumps.
+        Returns, for each dump, `None` if it was inserted or the database error otherwise.
+        """
+        self.read_cache.invalidate()
+
+        chunk_size = chunk_size or settings.bulk_chunk_size
+        insert_statement = self.Table.__table__.insert()
+        errors = [None] * len(dumps)
+
+        for start in range(0, len(dumps), chunk_size):
+            chunk = dumps[start:start + chunk_size]
+            try:
+                self.SessionLocal.begin()
+                self.SessionLocal.execute(insert_statement, chunk)
+                if on_inserted:
+                    on_inserted(chunk)
+                self.SessionLocal.commit()
+            except Exception:
+                self.SessionLocal.rollback()
+                for index, dump in enumerate(chunk, start):
+                    try:
+                        self.SessionLocal.begin()
+                        self.SessionLocal.execute(insert_statement, dump)
+                        if on_inserted:
+                            on_inserted([dump])
+                        self.SessionLocal.commit()
+                    except Exception as error:
+                        self.SessionLocal.rollback()
+                        errors[index] = str(getattr(error, 'orig', error))
+
+        return errors
+
+
+    def existing_values(self, column_name: str, values: list, columns_values: Dict[str, Any] = None) -> set:
+        """Which of `values` are found in `column_name` (in rows also matching `columns_values`),
+        in one `WHERE column IN (...)` query.
+        """
+
+        attribute = getattr(self.Table, column_name)
+        filter_attributes = [attribute.in_(values)]
+
+        if columns_values:
+            items = columns_values.items()
+            filter_attributes = filter_attributes + [getattr(self.Table, item[0]) == item[1] for item in items]
+
+        rows = self.SessionLocal.query(attribute).filter(and_(*filter_attributes)).all()
+
+        return {row[0] for row in rows}
+
+
+    @bumps_table_versions
     def update_resource(self, id_column: str, id: int, dump: dict,) -> None:
         """This function can be used to either update or patch a resource.
         """
+        self.read_cache.invalidate()
 
         (
         self.SessionLocal
@@ -299,7 +536,30 @@ class DBSession:
         return 
     
 
+    @bumps_table_versions
+    def delete_resources(self, column_name: str, values: list, columns_values: Dict[str, Any] = None) -> int:
+        """Bulk version of `delete_resource`: one `DELETE ... WHERE column IN (...)`; returns the
+        number of deleted rows.
+        """
+        self.read_cache.invalidate()
+
+        filter_attributes = [getattr(self.Table, column_name).in_(values)]
+
+        if columns_values:
+            items = columns_values.items()
+            filter_attributes = filter_attributes + [getattr(self.Table, item[0]) == item[1] for item in items]
+
+        return (
+            self.SessionLocal
+            .query(self.Table)
+            .filter(and_(*filter_attributes))
+            .delete(synchronize_session=False)
+            )
+
+
+    @bumps_table_versions
     def delete_resource(self, columns_values: Dict[str, str],) -> None:
+        self.read_cache.invalidate()
         
         items = columns_values.items()
         filter_attributes = [getattr(self.Table, item[0]) == item[1] for item in items]
@@ -320,34 +580,31 @@ class DBSessionPosts(DBSession):
         # Call the constructor of the Base class (DBSession).
         super().__init__(session_local, Table)
 
-    def get_upvotes_by_post(self, post_id: int) -> int:
-        post_votes = (
-            self.SessionLocal
-            .query(self.Table, func.count(Votes.post_id).label('upvotes'))
-            .join(
-                Votes, Votes.post_id == self.Table.post_id,
-                isouter=False,
-            )
-            .group_by(self.Table.post_id)
-            .filter(self.Table.post_id==post_id)
-            .first()
-            )
-        
-        if post_votes:
-            return post_votes[1] # value inside a tuple
-        else: 
-            return 0 # if there are no upvotes for this post return `0`.
-    
-
     def all_posts(
         self,
         limit: Optional[int] = None,
         skip: Optional[int] = None,
         search: Optional[str] = "",
         filter_columns: Dict[str, Any] = None,
+        cursor: Optional[list] = None,
+        lightweight: bool = True,
+        search_mode: str = 'substring',
+        stream: bool = False,
         ) -> list:
+        """Posts ordered newest first on `(created_at, post_id)`. `cursor` holds those two values
+        for the last post of the previous page (keyset pagination). `lightweight` selects only the
+        `GetAllPosts` columns (see `fetch_rows`) instead of loading `Posts` and `Users` entities.
+        `search` matches substrings of the titles (`LIKE '%search%'`, a full scan); with
+        `search_mode='fulltext'` the full-text index is used instead (see `search_posts`).
+        `stream` returns the lightweight rows as a generator (see `stream_rows`).
+        """
+
+        if search_mode == 'fulltext' and search and search.strip():
+            return self.search_posts(search, limit, skip, filter_columns, cursor, stream)
 
-        filter_container = [self.Table.title.contains(search)]
+        keyset_columns = [self.Table.created_at, self.Table.post_id]
+
+        filter_container = [self.Table.title.contains(search)] + self.keyset_conditions(keyset_columns, cursor, True)
         
         if filter_columns:
             items = filter_columns.items()
@@ -355,23 +612,37 @@ class DBSessionPosts(DBSession):
 
             filter_container = filter_container + filter_attributes
 
+        if lightweight or stream:
+            return self.select_rows(
+                select([
+                    self.Table.post_id,
+                    self.Table.view_count,
+                    self.Table.user_id,
+                    self.Table.title,
+                    self.Table.created_at,
+                    self.Table.updated_at,
+                    Users.name.label('author'),
+                    Users.email.label('email'),
+                    self.Table.upvotes,
+                    ])
+                .select_from(self.Table.__table__.join(Users.__table__, Users.user_id == self.Table.user_id))
+                .where(and_(*filter_container))
+                .order_by(*self.keyset_order(keyset_columns, True))
+                .limit(limit)
+                .offset(skip),
+                stream,
+                )
+
         all_resources = (
             self.SessionLocal
-            .query(
-                self.Table,
-                label('upvotes', func.count(Votes.post_id))
-                )
-            .join(
-                Votes, Votes.post_id == self.Table.post_id,
-                isouter=True
-                )
+            .query(self.Table)
             .filter(
                 and_(*filter_container)
                 )
             .options(
                 joinedload(self.Table.user_info),
                 )
-            .group_by(self.Table.post_id)
+            .order_by(*self.keyset_order(keyset_columns, True))
             .limit(limit)
             .offset(skip)
             .all()
@@ -381,18 +652,16 @@ class DBSessionPosts(DBSession):
 
         for row in all_resources:
             post_dict = {
-                'post_id': row[0].post_id,
-                'view_count': row[0].view_count,
-                'user_id': row[0].user_id,
-                'title': row[0].title,
-                # 'score': row[0].score,
-                'created_at': row[0].created_at,
-                'updated_at': row[0].updated_at,
-                'author': row[0].user_info.name,
-                'email': row[0].user_info.email,
-                # SQLAlchemy is not providing a name to 'upvotes' despite of setting 
-                # setting `label('upvotes', func.count(Votes.post_id))` for `all_resources`.
-                'upvotes': row[1]  
+                'post_id': row.post_id,
+                'view_count': row.view_count,
+                'user_id': row.user_id,
+                'title': row.title,
+                # 'score': row.score,
+                'created_at': row.created_at,
+                'updated_at': row.updated_at,
+                'author': row.user_info.name,
+                'email': row.user_info.email,
+                'upvotes': row.upvotes,
             }
             
             organized_results.append(post_dict)
@@ -400,6 +669,224 @@ class DBSessionPosts(DBSession):
         return organized_results
 
 
+    def search_posts(
+        self,
+        search: str,
+        limit: Optional[int] = None,
+        skip: Optional[int] = None,
+        filter_columns: Dict[str, Any] = None,
+        cursor: Optional[list] = None,
+        stream: bool = False,
+        ) -> list:
+        """Full-text search of the post titles (MySQL FULLTEXT index, SQLite FTS5, see
+        'fulltext.py'), most relevant first: the rows of `all_posts` plus their `relevance`.
+        `cursor` holds the `(relevance, post_id)` of the last post of the previous page.
+        """
+
+        matches = fulltext.search_posts(self.SessionLocal.get_bind().dialect.name, search)
+
+        keyset_columns = [matches.c.relevance, self.Table.post_id]
+
+        filter_container = self.keyset_conditions(keyset_columns, cursor, True)
+
+        if filter_columns:
+            items = filter_columns.items()
+            filter_container = filter_container + [getattr(self.Table, item[0]) == item[1] for item in items]
+
+        return self.select_rows(
+            select([
+                self.Table.post_id,
+                self.Table.view_count,
+                self.Table.user_id,
+                self.Table.title,
+                self.Table.created_at,
+                self.Table.updated_at,
+                Users.name.label('author'),
+                Users.email.label('email'),
+                self.Table.upvotes,
+                matches.c.relevance,
+                ])
+            .select_from(
+                self.Table.__table__
+                .join(matches, matches.c.post_id == self.Table.post_id)
+                .join(Users.__table__, Users.user_id == self.Table.user_id)
+                )
+            .where(and_(*filter_container))
+            .order_by(*self.keyset_order(keyset_columns, True))
+            .limit(limit)
+            .offset(skip),
+            stream,
+            )
+
+
+#--------------------------------------------------------------------------------------------------------------------
+
+
+@dataclass
+class DBSessionVotes(DBSession):
+    """Vote writes also maintain `Posts.upvotes`, in the transaction of the INSERT or DELETE of
+    the votes and with relative updates (`upvotes = upvotes + n`), so that concurrent votes on
+    the same post do not overwrite each other.
+    """
+
+    def __init__(self, session_local, Table=Votes,):
+        self.SessionLocal = session_local
+        self.Table = Table
+
+    @property
+    def written_tables(self,) -> tuple:
+        # Votes also change `posts.upvotes`.
+        return ('votes', 'posts')
+
+
+    def change_upvotes(self, changes: Dict[int, int]) -> None:
+        """Adds `changes[post_id]` to the upvotes of each post (one executemany UPDATE)."""
+
+        if not changes:
+            return
+
+        self.SessionLocal.execute(
+            update(Posts.__table__)
+            .where(Posts.post_id == bindparam('changed_post_id'))
+            # A vote is not an edit of the post.
+            .values(upvotes=Posts.upvotes + bindparam('upvotes_change'), updated_at=Posts.updated_at),
+            [{'changed_post_id': post_id, 'upvotes_change': change} for post_id, change in changes.items()],
+            )
+
+
+    @bumps_table_versions
+    def add_resource(self, dump: dict) -> Any:
+        self.read_cache.invalidate()
+
+        new_vote = self.Table(**dump)
+        self.SessionLocal.begin()
+        try:
+            self.SessionLocal.add(new_vote)
+            self.SessionLocal.flush()
+            self.change_upvotes({new_vote.post_id: 1})
+            self.SessionLocal.commit()
+        except:
+            self.SessionLocal.rollback()
+            raise
+        return new_vote
+
+
+    @bumps_table_versions
+    def add_vote(self, post_id: int, user_id: int) -> int:
+        """Upvote in one conditional INSERT (`INSERT IGNORE` on MySQL, `INSERT OR IGNORE` on
+        SQLite, selecting from `posts` so that a missing post inserts nothing either). Returns the
+        rows inserted: 0 when the user already voted on the post, or when the post does not exist.
+        """
+        self.read_cache.invalidate()
+
+        statement = (
+            self.Table.__table__.insert()
+            .prefix_with('IGNORE', dialect='mysql')
+            .prefix_with('OR IGNORE', dialect='sqlite')
+            .from_select(
+                ['post_id', 'user_id', 'created_at'],
+                select([Posts.post_id, literal(user_id), literal(datetime.utcnow())])
+                .where(Posts.post_id == post_id),
+                )
+            )
+
+        self.SessionLocal.begin()
+        try:
+            inserted = self.SessionLocal.execute(statement).rowcount
+            if inserted:
+                self.change_upvotes({post_id: inserted})
+            self.SessionLocal.commit()
+        except:
+            self.SessionLocal.rollback()
+            raise
+        return inserted
+
+
+    @bumps_table_versions
+    def remove_vote(self, post_id: int, user_id: int) -> int:
+        """Vote removal in one DELETE. Returns the rows deleted (0 when there was no vote)."""
+        self.read_cache.invalidate()
+
+        statement = (
+            self.Table.__table__.delete()
+            .where(and_(self.Table.post_id == post_id, self.Table.user_id == user_id))
+            )
+
+        self.SessionLocal.begin()
+        try:
+            deleted = self.SessionLocal.execute(statement).rowcount
+            if deleted:
+                self.change_upvotes({post_id: -deleted})
+            self.SessionLocal.commit()
+        except:
+            self.SessionLocal.rollback()
+            raise
+        return deleted
+
+
+    def add_resources(
+        self,
+        dumps: List[dict],
+        chunk_size: Optional[int] = None,
+        on_inserted: Callable[[List[dict]], None] = None,
+        ) -> List[Optional[str]]:
+
+        def count_upvotes(inserted_dumps: List[dict]) -> None:
+            self.change_upvotes(Counter(dump['post_id'] for dump in inserted_dumps))
+            if on_inserted:
+                on_inserted(inserted_dumps)
+
+        return super().add_resources(dumps, chunk_size, on_inserted=count_upvotes)
+
+
+    @bumps_table_versions
+    def delete_votes(self, filter_attributes: list) -> int:
+        """Deletes the matching votes and takes them off the upvotes of their posts. The votes
+        are counted with `SELECT ... FOR UPDATE`, so a concurrent delete of the same votes waits
+        instead of decrementing the counters a second time.
+        """
+        self.read_cache.invalidate()
+
+        self.SessionLocal.begin()
+        try:
+            removed_by_post = (
+                self.SessionLocal
+                .query(self.Table.post_id, func.count(self.Table.post_id))
+                .filter(and_(*filter_attributes))
+                .group_by(self.Table.post_id)
+                .with_for_update()
+                .all()
+                )
+            deleted = (
+                self.SessionLocal
+                .query(self.Table)
+                .filter(and_(*filter_attributes))
+                .delete(synchronize_session=False)
+                )
+            self.change_upvotes({post_id: -count for post_id, count in removed_by_post})
+            self.SessionLocal.commit()
+        except:
+            self.SessionLocal.rollback()
+            raise
+        return deleted
+
+
+    def delete_resource(self, columns_values: Dict[str, str],) -> None:
+        items = columns_values.items()
+        self.delete_votes([getattr(self.Table, item[0]) == item[1] for item in items])
+        return
+
+
+    def delete_resources(self, column_name: str, values: list, columns_values: Dict[str, Any] = None) -> int:
+        filter_attributes = [getattr(self.Table, column_name).in_(values)]
+
+        if columns_values:
+            items = columns_values.items()
+            filter_attributes = filter_attributes + [getattr(self.Table, item[0]) == item[1] for item in items]
+
+        return self.delete_votes(filter_attributes)
+
+
 #--------------------------------------------------------------------------------------------------------------------
 
 
@@ -466,6 +953,24 @@ class DBSessionSocialGroups(DBSession):
     def __init__(self, session_local, Table=SocialGroups,):
         super().__init__(session_local, Table)
 
+    @staticmethod
+    def nest_admin_info(row: dict) -> dict:
+        row['admin_info'] = {
+            'user_id': row.pop('user_id'),
+            'name': row.pop('name'),
+            'email': row.pop('email'),
+            }
+        return row
+
+
+    def stream_nested_admin_info(self, rows: Iterator[dict]) -> Iterator[dict]:
+        try:
+            for row in rows:
+                yield self.nest_admin_info(row)
+        finally:
+            rows.close()
+
+
     def count_members_by_social_group(self, group_id: int) -> int:
         groups_members = (
             self.SessionLocal
@@ -488,9 +993,17 @@ class DBSessionSocialGroups(DBSession):
         skip: Optional[int] = None,
         search: Optional[str] = "",
         filter_columns: Dict[str, Any] = None,
+        cursor: Optional[list] = None,
+        lightweight: bool = True,
+        stream: bool = False,
         ) -> list:
+        """Social groups ordered newest first on `(created_at, group_id)`; `cursor`,
+        `lightweight` and `stream` work as in `DBSessionPosts.all_posts`.
+        """
+
+        keyset_columns = [self.Table.created_at, self.Table.group_id]
 
-        filter_container = [self.Table.title.contains(search)]
+        filter_container = [self.Table.title.contains(search)] + self.keyset_conditions(keyset_columns, cursor, True)
 
         if filter_columns:
             items = filter_columns.items()
@@ -505,6 +1018,53 @@ class DBSessionSocialGroups(DBSession):
         
             filter_container = filter_container + filter_attributes
 
+        if lightweight or stream:
+            # The page is selected first (on the `(created_at, group_id)` index), then its admins
+            # are joined and its members counted, for the page rows only.
+            page = (
+                select([
+                    self.Table.group_id,
+                    self.Table.admin_id,
+                    self.Table.title,
+                    self.Table.details,
+                    self.Table.created_at,
+                    self.Table.updated_at,
+                    ])
+                .where(and_(*filter_container))
+                .order_by(*self.keyset_order(keyset_columns, True))
+                .offset(skip)
+                .limit(limit)
+                .alias('page')
+                )
+
+            members = (
+                select([func.count()])
+                .select_from(GroupMembers.__table__)
+                .where(GroupMembers.group_id == page.c.group_id)
+                .as_scalar()
+                )
+
+            rows = self.select_rows(
+                select([
+                    page.c.group_id,
+                    page.c.title,
+                    page.c.details,
+                    page.c.created_at,
+                    page.c.updated_at,
+                    Users.user_id,
+                    Users.name,
+                    Users.email,
+                    members.label('members'),
+                    ])
+                .select_from(page.join(Users.__table__, Users.user_id == page.c.admin_id))
+                .order_by(*self.keyset_order([page.c.created_at, page.c.group_id], True)),
+                stream,
+                )
+
+            if stream:
+                return self.stream_nested_admin_info(rows)
+            return [self.nest_admin_info(row) for row in rows]
+
         all_resources = (
             self.SessionLocal
             .query(
@@ -520,6 +1080,7 @@ class DBSessionSocialGroups(DBSession):
                 )
             .filter(and_(*filter_container))
             .group_by(self.Table.group_id)
+            .order_by(*self.keyset_order(keyset_columns, True))
             .offset(skip)
             .limit(limit)
             .all()
@@ -543,7 +1104,15 @@ class DBSessionSocialGroups(DBSession):
         return organized_results
     
 
-    def fetch_social_group_members(self, user_id: int,) -> list:
+    def fetch_social_group_members(
+        self,
+        user_id: int,
+        limit: Optional[int] = None,
+        skip: Optional[int] = None,
+        search: Optional[str] = "",
+        cursor: Optional[list] = None,
+        stream: bool = False,
+        ) -> list:
 
         social_groups_id = (
             self.SessionLocal
@@ -558,7 +1127,12 @@ class DBSessionSocialGroups(DBSession):
 
         
         return self.all_social_groups(
-            filter_columns={'group_id': social_groups_id}
+            limit=limit,
+            skip=skip,
+            search=search,
+            filter_columns={'group_id': social_groups_id},
+            cursor=cursor,
+            stream=stream,
             )
     
 
@@ -570,32 +1144,91 @@ class DBSessionGroupMembers(DBSession):
         super().__init__(session_local, Table)
 
 
-    def get_all_members_by_group(self, id_column: str, id_value: Any) -> list:
+    def get_all_members_by_group(
+        self,
+        id_column: str,
+        id_value: Any,
+        limit: Optional[int] = None,
+        cursor: Optional[list] = None,
+        stream: bool = False,
+        ) -> list:
+        """Members ordered by `member_id`; `cursor` holds the `member_id` of the last member of
+        the previous page. `stream` works as in `DBSessionPosts.all_posts`.
+        """
     
         identification_attribute = getattr(self.Table, id_column)
         find_group = identification_attribute == id_value
-
-        group_members = (
-            self.SessionLocal
-            .query(Users, GroupMembers)
-            .join(
-                self.Table, self.Table.user_id == Users.user_id,
-                isouter=False,
-                )
-            .filter(find_group)
-            .all()
+        keyset_columns = [self.Table.member_id]
+
+        return self.select_rows(
+            select([
+                Users.user_id,
+                Users.name,
+                self.Table.member_id,
+                self.Table.admin,
+                ])
+            .select_from(Users.__table__.join(self.Table.__table__, self.Table.user_id == Users.user_id))
+            .where(and_(find_group, *self.keyset_conditions(keyset_columns, cursor, False)))
+            .order_by(*self.keyset_order(keyset_columns, False))
+            .limit(limit),
+            stream,
             )
-        
-        organized_results = []
-        
-        for row in group_members:
-            post_dict = {
-                "user_id": row[0].user_id,
-                "name": row[0].name,
-                "member_id": row[1].member_id,
-                "admin": row[1].admin,
-                }
-            
-            organized_results.append(post_dict)
 
-        return organized_results
\ No newline at end of file
+
+#--------------------------------------------------------------------------------------------------------------------
+
+
+class AsyncDBSession:
+    """Awaitable version of `DBSession` for the `async` routes. Every `DBSession` method (and
+    property) is exposed under the same name and runs on the database executor, e.g.
+    `await AsyncDBSession(db, Users).fetch_resource({'user_id': 1})`.
+    """
+
+    SyncSession = DBSession
+
+    def __init__(self, session_local, Table=None,):
+        if Table is None:
+            self.sync_session = self.SyncSession(session_local)
+        else:
+            self.sync_session = self.SyncSession(session_local, Table)
+
+    @property
+    def Table(self,):
+        return self.sync_session.Table
+
+    def __getattr__(self, name: str):
+        if name == 'sync_session':
+            raise AttributeError(name)
+
+        if isinstance(getattr(self.SyncSession, name, None), property):
+            return run_in_db_executor(lambda: getattr(self.sync_session, name))
+
+        attribute = getattr(self.sync_session, name)
+
+        if not callable(attribute):
+            return attribute
+
+        async def run_method(*args, **kwargs):
+            return await run_in_db_executor(attribute, *args, **kwargs)
+
+        return run_method
+
+
+class AsyncDBSessionPosts(AsyncDBSession):
+    SyncSession = DBSessionPosts
+
+
+class AsyncDBSessionVotes(AsyncDBSession):
+    SyncSession = DBSessionVotes
+
+
+class AsyncDBSessionUsers(AsyncDBSession):
+    SyncSession = DBSessionUsers
+
+
+class AsyncDBSessionSocialGroups(AsyncDBSession):
+    SyncSession = DBSessionSocialGroups
+
+
+class AsyncDBSessionGroupMembers(AsyncDBSession):
+    SyncSession = DBSessionGroupMembers
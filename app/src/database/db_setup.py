@@ -1,16 +1,115 @@
+import asyncio
+import contextvars
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.expression import Select, CompoundSelect
 
 from src.env_models import settings
+from src.database import sqlite_compat # SQLite DDL for the composite auto-increment keys.
+from src.database.pool_stats import InstrumentedQueuePool
 
-engine = create_engine(
-    f'mysql+pymysql://{settings.username}:{settings.key_db}@{settings.host}:{settings.port}/{settings.database}'
-    )
+
+def get_database_url() -> str:
+    if settings.database_url:
+        return settings.database_url
+    return f'mysql+pymysql://{settings.username}:{settings.key_db}@{settings.host}:{settings.port}/{settings.database}'
+
+
+def get_engine_options(url: str) -> dict:
+    options = {}
+
+    if url.startswith('sqlite'):
+        # Sessions are handed over to the database executor threads.
+        options['connect_args'] = {'check_same_thread': False}
+        if url in ('sqlite://', 'sqlite:///:memory:'):
+            return options # in-memory databases live in a single connection.
+
+    options.update({
+        'poolclass': InstrumentedQueuePool,
+        'long_hold_seconds': settings.db_pool_long_hold_seconds,
+        'pool_size': settings.db_pool_size,
+        'max_overflow': settings.db_max_overflow,
+        'pool_timeout': settings.db_pool_timeout,
+        'pool_recycle': settings.db_pool_recycle,
+        'pool_pre_ping': settings.db_pool_pre_ping,
+        })
+    return options
+
+
+database_url = get_database_url()
+
+engine = create_engine(database_url, **get_engine_options(database_url))
+
+replica_engines = [
+    create_engine(url, **get_engine_options(url))
+    for url in (settings.db_replica_urls or '').split(',') if url.strip()
+    ]
 
 Base = declarative_base()
 
-SessionLocal = sessionmaker(autocommit=True, autoflush=False, bind=engine)
+# `expire_on_commit=False`: rows returned by `DBSession.add_resource` keep their values after
+# the commit instead of being reloaded with a SELECT when they are serialized.
+SessionLocal = sessionmaker(autocommit=True, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+class RoutingSession(Session):
+    """Session that runs SELECT statements on a replica and everything else (flushes, bulk
+    UPDATE/DELETE, INSERT, raw SQL) on the primary. After its first write the session sticks to
+    the primary, so a request reads its own writes. Sessions live for one request (`get_db`), so
+    the rule is per request. Replicas are picked round-robin, one per session.
+    """
+
+    def __init__(self, primary: Engine = None, replicas: Optional[Iterator[Engine]] = None, **kw):
+        kw['bind'] = primary
+        super().__init__(**kw)
+        self.primary = primary
+        self.replica = next(replicas) if replicas is not None else None
+        self.stick_to_primary = False
+
+    def get_bind(self, mapper=None, clause=None):
+        if self.replica is None or self.stick_to_primary:
+            return self.primary
+
+        if self._flushing or (clause is not None and not isinstance(clause, (Select, CompoundSelect))):
+            self.stick_to_primary = True
+            return self.primary
+
+        if clause is None:
+            return self.primary
+
+        return self.replica
+
+
+RoutedSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=True,
+    autoflush=False,
+    expire_on_commit=False,
+    primary=engine,
+    replicas=itertools.cycle(replica_engines) if replica_engines else None,
+    )
+
+# Blocking database calls made by the `async` routes run on these threads instead of
+# FastAPI's threadpool, so the number of in-flight queries follows the connection pool
+# and not the number of open requests.
+db_executor = ThreadPoolExecutor(
+    max_workers=settings.db_executor_workers or settings.db_pool_size + settings.db_max_overflow,
+    thread_name_prefix='db_executor',
+    )
+
+
+async def run_in_db_executor(function: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context() # keeps the request's context vars (e.g. its route).
+    return await loop.run_in_executor(db_executor, partial(context.run, function, *args, **kwargs))
+
 
 # Dependency.
 def get_db():
@@ -18,4 +117,31 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Same as `get_db`, reads go to the replicas in `DB_REPLICA_URLS` (see `RoutingSession`).
+def get_routed_db():
+    db = RoutedSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Async dependency: creating the session does not touch the database, closing it
+# (returning the connection to the pool) happens on the database executor.
+async def get_async_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_db_executor(db.close)
+
+
+async def get_async_routed_db():
+    db = RoutedSessionLocal()
+    try:
+        yield db
+    finally:
+        await run_in_db_executor(db.close)
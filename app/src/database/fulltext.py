@@ -0,0 +1,83 @@
+# Full-text search on `posts.title`.
+# MySQL: a FULLTEXT index on the column, queried with `MATCH ... AGAINST` in natural language
+# mode (its score is the relevance).
+# SQLite (local profile and tests): an FTS5 table indexing the titles, kept in sync with `posts`
+# by triggers and queried with `MATCH`, ranked by `bm25`.
+# The index is created by the Alembic migration 'posts_title_fulltext' and, for databases built
+# with `Base.metadata.create_all`, right after the `posts` table (see 'db_models.py').
+from sqlalchemy import Float, Integer, text
+
+POSTS_FULLTEXT_INDEX = 'posts_title_ft'
+POSTS_FTS_TABLE = 'posts_fts'
+
+SQLITE_CREATE_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {POSTS_FTS_TABLE} USING fts5(title, content='posts', content_rowid='post_id')",
+    f"""CREATE TRIGGER IF NOT EXISTS {POSTS_FTS_TABLE}_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO {POSTS_FTS_TABLE} (rowid, title) VALUES (new.post_id, new.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {POSTS_FTS_TABLE}_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO {POSTS_FTS_TABLE} ({POSTS_FTS_TABLE}, rowid, title) VALUES ('delete', old.post_id, old.title);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {POSTS_FTS_TABLE}_update AFTER UPDATE OF title ON posts BEGIN
+        INSERT INTO {POSTS_FTS_TABLE} ({POSTS_FTS_TABLE}, rowid, title) VALUES ('delete', old.post_id, old.title);
+        INSERT INTO {POSTS_FTS_TABLE} (rowid, title) VALUES (new.post_id, new.title);
+    END""",
+    # Index the rows already in `posts`.
+    f"INSERT INTO {POSTS_FTS_TABLE} ({POSTS_FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+SQLITE_DROP_STATEMENTS = [
+    f'DROP TRIGGER IF EXISTS {POSTS_FTS_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {POSTS_FTS_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {POSTS_FTS_TABLE}_update',
+    f'DROP TABLE IF EXISTS {POSTS_FTS_TABLE}',
+    ]
+
+
+def create_posts_fulltext_index(target, connection, **kw) -> None:
+    """Also usable as an `after_create` listener of the `posts` table."""
+    if connection.dialect.name == 'mysql':
+        connection.execute(f'CREATE FULLTEXT INDEX {POSTS_FULLTEXT_INDEX} ON posts (title)')
+    elif connection.dialect.name == 'sqlite':
+        for statement in SQLITE_CREATE_STATEMENTS:
+            connection.execute(statement)
+
+
+def drop_posts_fulltext_index(target, connection, **kw) -> None:
+    """Also usable as a `before_drop` listener of the `posts` table."""
+    if connection.dialect.name == 'mysql':
+        connection.execute(f'DROP INDEX {POSTS_FULLTEXT_INDEX} ON posts')
+    elif connection.dialect.name == 'sqlite':
+        for statement in SQLITE_DROP_STATEMENTS:
+            connection.execute(statement)
+
+
+def fts5_query(search: str) -> str:
+    """Every word of `search` as an FTS5 string (so that quotes, '-' or ':' typed by the user
+    are not read as query syntax), any of them matching, as in MySQL natural language mode.
+    """
+    terms = ['"' + term.replace('"', '""') + '"' for term in search.split()]
+    return ' OR '.join(terms)
+
+
+def search_posts(dialect_name: str, search: str):
+    """Selectable of the posts whose title matches `search`: `post_id` and `relevance` (higher
+    is better).
+    """
+    if dialect_name == 'mysql':
+        statement = text(
+            'SELECT post_id, MATCH (title) AGAINST (:fulltext_search IN NATURAL LANGUAGE MODE) AS relevance '
+            'FROM posts WHERE MATCH (title) AGAINST (:fulltext_search IN NATURAL LANGUAGE MODE)'
+            ).bindparams(fulltext_search=search)
+    elif dialect_name == 'sqlite':
+        statement = text(
+            f'SELECT rowid AS post_id, -bm25({POSTS_FTS_TABLE}) AS relevance '
+            f'FROM {POSTS_FTS_TABLE} WHERE {POSTS_FTS_TABLE} MATCH :fulltext_search '
+            # `bm25` only runs inside the FTS query: the LIMIT stops SQLite from merging this
+            # subquery into the outer query.
+            'LIMIT -1'
+            ).bindparams(fulltext_search=fts5_query(search))
+    else:
+        raise ValueError(f'Full-text search is not available on {dialect_name}.')
+
+    return statement.columns(post_id=Integer, relevance=Float).alias('matches')
@@ -1,6 +1,8 @@
-from typing import Union, Any
+from typing import Union, Any, Awaitable, Callable
 from fastapi import HTTPException, status
 
+from src.password_hashing import PasswordHashingBusy
+
 def check_user_id_authorization(user_id: Union[int, None], credentials_user_id: int) -> Union[HTTPException, None]:
     if (user_id) and (user_id != credentials_user_id):
         raise HTTPException(
@@ -47,16 +49,18 @@ def check_resource_availability(resource: Any, msg: str, conflict: bool = False)
             )
 
 
-def check_uniqueness(unique: bool, unique_values: list, value: Any, msg: str,) -> Union[HTTPException, None]:
+def check_uniqueness(unique: bool, value_exists: bool, msg: str,) -> Union[HTTPException, None]:
+    """`value_exists` comes from an existence probe (e.g. `DBSession.resource_exists`): 422 if
+    the value must be new but exists, 404 if it must exist but does not."""
     if unique == True:
-        if value in unique_values:
+        if value_exists:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail=msg,
                 )
     
     if unique == False:
-        if value not in unique_values:
+        if not value_exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=msg,
@@ -73,25 +77,43 @@ def check_password(validate_pw: callable) -> Union[HTTPException, None]:
     return
 
 
-def check_add_resource(add_resource: callable, status_code: int) -> Union[HTTPException, None]:
-    """This function can be used to assess the successful resource addition or update."""
-    
+def raise_add_resource_error(error: Exception, status_code: int) -> Union[HTTPException, None]:
+    if status_code == 400:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(error),
+            )
+    if status_code == 500:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(error),
+            )
+    return
+
+
+def check_add_resource(add_resource: callable, status_code: int) -> Union[HTTPException, Any]:
+    """This function can be used to assess the successful resource addition or update; it
+    returns what `add_resource` returns (the new row for `DBSession.add_resource`)."""
+
     try:
-        add_resource()
+        return add_resource()
     except Exception as e:
-        if status_code == 400:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=str(e), 
-                )
-        if status_code == 500: 
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=str(e), 
-                )
-        
+        raise_add_resource_error(e, status_code)
+
     return
 
+
+async def check_add_resource_async(add_resource: Callable[[], Awaitable], status_code: int) -> Union[HTTPException, Any]:
+    """Same as `check_add_resource`, for the awaitable methods of `AsyncDBSession`."""
+
+    try:
+        return await add_resource()
+    except Exception as e:
+        raise_add_resource_error(e, status_code)
+
+    return
+
+
 def check_delete_resource(to_delete: callable, msg: Any) -> Union[HTTPException, None]:
     try:
         to_delete()
@@ -103,6 +125,17 @@ def check_delete_resource(to_delete: callable, msg: Any) -> Union[HTTPException,
     return
 
 
+async def check_delete_resource_async(to_delete: Callable[[], Awaitable], msg: Any) -> Union[HTTPException, None]:
+    try:
+        await to_delete()
+    except:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=msg,
+            )
+    return
+
+
 def check_partial_fields(input_fields: list, required_fields: list) -> Union[HTTPException, None]:
     if input_fields == required_fields:
         raise HTTPException(
@@ -111,3 +144,42 @@ def check_partial_fields(input_fields: list, required_fields: list) -> Union[HTT
             )
     
 
+
+
+def check_cursor(decode_cursor: callable) -> Union[HTTPException, list, None]:
+    """Returns the decoded pagination cursor, 400 if the client sent a cursor that was not issued by the API."""
+
+    try:
+        return decode_cursor()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+            )
+
+
+def check_bulk_size(items: list, max_items: int) -> Union[HTTPException, None]:
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='No items to process.',
+            )
+    if len(items) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {max_items} items can be sent in one request.',
+            )
+    return
+
+
+async def check_password_hashing_async(hash_job: Callable[[], Awaitable]) -> Union[HTTPException, Any]:
+    """Result of a `password_hasher` job, 503 if the hashing processes are saturated."""
+
+    try:
+        return await hash_job()
+    except PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='The server is busy, try again shortly.',
+            headers={'Retry-After': '1'},
+            )
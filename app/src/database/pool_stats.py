@@ -0,0 +1,115 @@
+import time
+import threading
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Route of the request being served (set by `TrackRequestRoute` in 'src/middleware.py'), so
+# that connections held for too long can be traced back to the endpoint that held them.
+current_route: ContextVar[str] = ContextVar('current_route', default='unknown')
+
+
+def percentile(samples: list, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PoolStatistics:
+    """Checkout counters of one connection pool. Wait times are measured from the checkout
+    request until a connection is handed over, hold times from checkout until checkin.
+    """
+
+    def __init__(self, long_hold_seconds: float, window: int = 1000, long_holds_kept: int = 20,):
+        self.long_hold_seconds = long_hold_seconds
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.recent_waits = deque(maxlen=window)
+        self.total_hold = 0.0
+        self.max_hold = 0.0
+        self.checkins = 0
+        self.long_holds = deque(maxlen=long_holds_kept)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self.lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self.recent_waits.append(seconds)
+
+    def record_hold(self, seconds: float, route: str) -> None:
+        with self.lock:
+            self.checkins += 1
+            self.total_hold += seconds
+            self.max_hold = max(self.max_hold, seconds)
+            if seconds >= self.long_hold_seconds:
+                self.long_holds.append({'route': route, 'hold_ms': seconds * 1000})
+
+    def snapshot(self, pool: Optional[QueuePool] = None) -> dict:
+        with self.lock:
+            recent_waits = list(self.recent_waits)
+            summary = {
+                'checkouts': self.checkouts,
+                'checkout_timeouts': self.checkout_timeouts,
+                'wait_ms_avg': self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                'wait_ms_p95': percentile(recent_waits, 0.95) * 1000,
+                'wait_ms_max': self.max_wait * 1000,
+                'hold_ms_avg': self.total_hold / self.checkins * 1000 if self.checkins else 0.0,
+                'hold_ms_max': self.max_hold * 1000,
+                'long_holds': list(self.long_holds),
+                }
+
+        if pool is not None:
+            summary.update({
+                'pool_size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                })
+        return summary
+
+
+class InstrumentedQueuePool(QueuePool):
+    """`QueuePool` that records checkout wait and hold times in `self.statistics`."""
+
+    def __init__(self, creator, statistics: Optional[PoolStatistics] = None, long_hold_seconds: float = 1, **kw):
+        super().__init__(creator, **kw)
+        self.statistics = statistics or PoolStatistics(long_hold_seconds)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.statistics = self.statistics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection_record = super()._do_get()
+        except PoolTimeoutError:
+            self.statistics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+
+        checked_out_at = time.perf_counter()
+        self.statistics.record_wait(checked_out_at - start)
+        connection_record.info['checked_out_at'] = checked_out_at
+        connection_record.info['checkout_route'] = current_route.get()
+        return connection_record
+
+    def _do_return_conn(self, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        if checked_out_at is not None:
+            self.statistics.record_hold(
+                time.perf_counter() - checked_out_at,
+                connection_record.info.pop('checkout_route', 'unknown'),
+                )
+        super()._do_return_conn(connection_record)
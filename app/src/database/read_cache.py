@@ -0,0 +1,82 @@
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from sqlalchemy.orm import Session
+
+
+class ReadCacheStatistics:
+    """Process-wide counters of the request read caches (`GET /metrics/read_cache`)."""
+
+    def __init__(self,):
+        self.lock = threading.Lock()
+        self.queries_saved = 0
+        self.queries_run = 0
+        self.invalidations = 0
+
+    def record_lookup(self, hit: bool) -> None:
+        with self.lock:
+            if hit:
+                self.queries_saved += 1
+            else:
+                self.queries_run += 1
+
+    def record_invalidation(self) -> None:
+        with self.lock:
+            self.invalidations += 1
+
+    def snapshot(self,) -> dict:
+        with self.lock:
+            return {
+                'queries_saved': self.queries_saved,
+                'queries_run': self.queries_run,
+                'invalidations': self.invalidations,
+                }
+
+
+read_cache_statistics = ReadCacheStatistics()
+
+
+class RequestReadCache:
+    """Read-through cache of one database session. Sessions live for one request, and FastAPI
+    hands one session per dependency function to the request: `get_current_user` (on
+    `get_async_db`) shares it with the routes on `get_async_db`, so identical lookups made by
+    the authentication and the route run once. A route on `get_async_routed_db` would get a
+    second session, with its own cache (the public routes using it do not authenticate). Any
+    write through `DBSession` empties it.
+    """
+
+    def __init__(self,):
+        self.entries = {}
+        self.queries_saved = 0
+
+    def get_or_fetch(self, key: Optional[Hashable], fetch: Callable[[], Any]) -> Any:
+        if key is None:
+            return fetch()
+
+        if key in self.entries:
+            self.queries_saved += 1
+            read_cache_statistics.record_lookup(hit=True)
+            return self.entries[key]
+
+        value = fetch()
+        self.entries[key] = value
+        read_cache_statistics.record_lookup(hit=False)
+        return value
+
+    def invalidate(self,) -> None:
+        if self.entries:
+            self.entries.clear()
+            read_cache_statistics.record_invalidation()
+
+
+def get_read_cache(session: Session) -> RequestReadCache:
+    return session.info.setdefault('read_cache', RequestReadCache())
+
+
+def make_cache_key(*parts) -> Optional[Hashable]:
+    """`None` (no caching) if a part, e.g. a filter value, is not hashable."""
+    try:
+        hash(parts)
+    except TypeError:
+        return None
+    return parts
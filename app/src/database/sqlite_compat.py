@@ -0,0 +1,36 @@
+# SQLite DDL for the local database profile (`DATABASE_URL=sqlite:///...`).
+# The MySQL schema declares auto-incremented ids inside composite primary keys (e.g. `votes`
+# (`vote_id`, `post_id`, `user_id`)), which SQLite refuses to create. On SQLite only, the
+# auto-incremented column becomes the table's `INTEGER PRIMARY KEY` (the rowid, so inserted ids
+# are still returned) and the composite primary key is left out: it contains the rowid, so it is
+# unique anyway, and its index would only slow the inserts down.
+from sqlalchemy import Integer, PrimaryKeyConstraint
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.schema import CreateColumn
+
+
+def is_composite_autoincrement(column) -> bool:
+    table = column.table
+    return (
+        column.autoincrement is True
+        and len(table.primary_key.columns) > 1
+        and table._autoincrement_column is column
+        )
+
+
+@compiles(CreateColumn, 'sqlite')
+def compile_create_column(create_column, compiler, **kw):
+    column = create_column.element
+
+    if column.primary_key and isinstance(column.type, Integer) and is_composite_autoincrement(column):
+        return f'{compiler.preparer.format_column(column)} INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT'
+
+    return compiler.visit_create_column(create_column, **kw)
+
+
+@compiles(PrimaryKeyConstraint, 'sqlite')
+def compile_primary_key_constraint(constraint, compiler, **kw):
+    if any(is_composite_autoincrement(column) for column in constraint.columns):
+        return None
+
+    return compiler.visit_primary_key_constraint(constraint, **kw)
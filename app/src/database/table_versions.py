@@ -0,0 +1,88 @@
+from functools import wraps
+from typing import Callable, Iterable, Tuple
+
+from sqlalchemy import BigInteger, Column, String, event, select
+
+from src.database.db_setup import Base, engine
+from src.response_cache import response_cache
+
+# Tables whose writes are counted: those read by the cached routes (see `CACHED_ROUTES`).
+VERSIONED_TABLES = ('users', 'posts', 'votes', 'social_groups', 'group_members')
+
+
+class TableVersion(Base):
+    """Write counter of a table, shared by every worker process (see `TableVersions`)."""
+    __tablename__ = 'table_versions'
+    table_name = Column(String(64), primary_key=True,)
+    version = Column(BigInteger, nullable=False, server_default='0',)
+
+
+def insert_table_versions(target, connection, **kw) -> None:
+    connection.execute(
+        TableVersion.__table__.insert(),
+        [{'table_name': table_name, 'version': 0} for table_name in VERSIONED_TABLES],
+        )
+
+
+# One row per table for databases created with `Base.metadata.create_all` (the Alembic migration
+# 'table_versions' inserts them otherwise).
+event.listen(TableVersion.__table__, 'after_create', insert_table_versions)
+
+
+class TableVersions:
+    """Write counter of each table, bumped by the `DBSession` writes once they are committed.
+    A response built from tables whose versions did not move since is still current, which is
+    what the ETags of 'src/etags.py' rely on.
+
+    The counters are rows of the `table_versions` table, read from the primary database, so
+    every worker process sees the writes of the others. Writes made behind `DBSession` (the
+    buffered view counts, the last logins) are not counted, which is why the ETags also expire
+    after `ETAG_WINDOW` seconds.
+    """
+
+    def __init__(self, bind_engine,):
+        self.engine = bind_engine
+
+    def bump(self, session, *tables: str) -> None:
+        """One UPDATE, made through the writing session (and so on the primary database)."""
+        session.execute(
+            TableVersion.__table__.update()
+            .where(TableVersion.table_name.in_(tables))
+            .values(version=TableVersion.version + 1)
+            )
+
+    def get(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Blocking: run it on the database executor."""
+        tables = tuple(tables)
+        with self.engine.connect() as connection:
+            versions = dict(
+                connection.execute(
+                    select([TableVersion.table_name, TableVersion.version])
+                    .where(TableVersion.table_name.in_(tables))
+                    ).fetchall()
+                )
+        return tuple(versions.get(table, 0) for table in tables)
+
+
+table_versions = TableVersions(engine)
+
+
+def bumps_table_versions(write: Callable) -> Callable:
+    """Decorator of the `DBSession` write methods: bumps the versions of the session's
+    `written_tables` and drops the cached responses tagged with them once the write returns (or
+    fails, as part of it may have been committed). Both happen before the route answers, so a
+    client reads its own write on its next request.
+    """
+
+    @wraps(write)
+    def write_and_bump(self, *args, **kwargs):
+        try:
+            return write(self, *args, **kwargs)
+        finally:
+            if not self.SessionLocal.is_active:
+                # The transaction of the failed write, rolled back so that the bump can run.
+                self.SessionLocal.rollback()
+            table_versions.bump(self.SessionLocal, *self.written_tables)
+            response_cache.invalidate(*self.written_tables)
+
+    return write_and_bump
@@ -0,0 +1,46 @@
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from src.compression import SUPPORTED_ENCODINGS
+from src.env_models import settings
+from src.response_cache import response_cache_key
+
+
+def route_etag(path: str, query_string: bytes, versions: Iterable[int], now: Optional[float] = None,) -> str:
+    """Strong ETag of a GET response built from tables at `versions` (see `TableVersions`):
+    changes with the query, with the versions and at least every `ETAG_WINDOW` seconds (the
+    versions do not count the buffered view counts). The same in every worker process.
+    """
+    now = time.time() if now is None else now
+    window = int(now // settings.etag_window) if settings.etag_window > 0 else 0
+
+    versions = ','.join(str(version) for version in versions)
+    token = f'{window}|{response_cache_key(path, query_string)}|{versions}'
+
+    return '"' + hashlib.sha1(token.encode()).hexdigest() + '"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the response tagged `etag` once compressed in `encoding`: RFC 9110 asks for a
+    different strong validator per content coding (e.g. `"1a2b-gzip"` for `"1a2b"`).
+    """
+    prefix = 'W/' if etag.startswith('W/') else ''
+    opaque = etag.removeprefix('W/').strip('"')
+    return f'{prefix}"{opaque}-{encoding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """`If-None-Match` check (weak comparison, as RFC 9110 asks for this header) against `etag`
+    and its compressed variants (see `encoded_etag`); returns the one matched, if any.
+    """
+    if not if_none_match:
+        return None
+
+    candidates = [candidate.strip().removeprefix('W/') for candidate in if_none_match.split(',')]
+    if '*' in candidates:
+        return etag
+    for variant in [etag, *(encoded_etag(etag, encoding) for encoding in SUPPORTED_ENCODINGS)]:
+        if variant in candidates:
+            return variant
+    return None
@@ -17,4 +17,9 @@ class GetGroupMemberShort_2(BaseModel):
     member_id: int
     name: str
     user_id: int
-    admin: bool
\ No newline at end of file
+    admin: bool
+
+
+class PostGroupMember(BaseModel):
+    model_config = ConfigDict(extra='forbid',)
+    group_id: int
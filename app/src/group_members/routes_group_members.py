@@ -1,53 +1,87 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Response, status
 from src.oauth2 import get_current_user
 from src.group_members.models_group_members import (
     GetGroupMemberShort_1,
     GetGroupMemberShort_2,
+    PostGroupMember,
     )
-from src.database.db_setup import SessionLocal, get_db
+from src.database.db_setup import SessionLocal, get_async_db, get_async_routed_db
 from src.database.db_models import (
     Session,
-    DBSessionGroupMembers,
+    AsyncDBSession,
+    AsyncDBSessionGroupMembers,
+    GroupMembers,
+    SocialGroups,
     )
 from src.database.http_exceptions import (
     check_resource_availability,
-    check_add_resource,
+    check_add_resource_async,
     check_object_availability,
-    check_delete_resource,
+    check_delete_resource_async,
+    check_cursor,
+    check_bulk_size,
     )
+from src.pagination import get_page_size, decode_cursor, paginate
+from src.models_bulk import BulkItemResult, BulkResult, bulk_result, insert_results
+from src.env_models import settings
+from src.streaming import wants_ndjson, ndjson_response, stream_limit
+from src.serialization import rows_response
 
 router = APIRouter()
 
 @router.get("/{group_id}", response_model=List[GetGroupMemberShort_2],)
-def get_all_members_by_group(
+async def get_all_members_by_group(
     group_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_async_routed_db),
     limit: Optional[int] = None,
     skip: Optional[int] = None,
     search: Optional[str] = "",
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     ):
-
-    db_session = DBSessionGroupMembers(db)
-
-    members_by_group = db_session.get_all_members_by_group('group_id', group_id)
+    """Members of a group ordered by membership; paginated (or streamed) like `GET /posts/`."""
+
+    db_session = AsyncDBSessionGroupMembers(db)
+
+    if wants_ndjson(accept):
+        rows = await db_session.get_all_members_by_group(
+            'group_id',
+            group_id,
+            limit=stream_limit(limit),
+            cursor=check_cursor(lambda: decode_cursor(cursor, [int])),
+            stream=True,
+            )
+        return ndjson_response(rows, GetGroupMemberShort_2)
+
+    page_size = get_page_size(limit)
+
+    members_by_group = await db_session.get_all_members_by_group(
+        'group_id',
+        group_id,
+        limit=page_size + 1,
+        cursor=check_cursor(lambda: decode_cursor(cursor, [int])),
+        )
 
     check_object_availability(members_by_group, 'No posts were found.', 404)
     
-    return members_by_group
+    page = paginate(response, members_by_group, page_size, ['member_id'])
+
+    return rows_response(response, page, GetGroupMemberShort_2)
 
 
 @router.get("/{group_id}/{user_id}", response_model=GetGroupMemberShort_2,)
-def get_group_member(
+async def get_group_member(
     group_id: int,
     user_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     ):
     
-    db_session = DBSessionGroupMembers(db)
+    db_session = AsyncDBSessionGroupMembers(db)
 
-    members_by_group = db_session.get_all_members_by_group('group_id', group_id)
+    members_by_group = await db_session.get_all_members_by_group('group_id', group_id)
 
     check_object_availability(members_by_group, 'No posts were found.', 404)
 
@@ -57,48 +91,72 @@ def get_group_member(
 
 
 @router.get("/", response_model=List[GetGroupMemberShort_1],)
-def get_all_users_with_membership(
-    db: Session = Depends(get_db),
+async def get_all_users_with_membership(
+    response: Response,
+    db: Session = Depends(get_async_db),
     limit: Optional[int] = None,
     skip: Optional[int] = None,
     search: Optional[str] = "",
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     ):
+    """Memberships ordered by primary key; paginated (or streamed) like `GET /posts/`."""
+
+    db_session = AsyncDBSessionGroupMembers(db)
+
+    primary_key = [column.name for column in GroupMembers.__table__.primary_key.columns]
 
-    db_session = DBSessionGroupMembers(db)
+    if wants_ndjson(accept):
+        rows = await db_session.all_resources(
+            search_column='group_id',
+            limit=stream_limit(limit),
+            skip=skip,
+            search=search,
+            cursor=check_cursor(lambda: decode_cursor(cursor, [int] * len(primary_key))),
+            columns=list(GetGroupMemberShort_1.model_fields),
+            stream=True,
+            )
+        return ndjson_response(rows, GetGroupMemberShort_1)
 
-    all_resources = db_session.all_resources(
+    page_size = get_page_size(limit)
+
+    all_resources = await db_session.all_resources(
         search_column='group_id',
-        limit=limit,
+        limit=page_size + 1,
         skip=skip,
         search=search,
+        cursor=check_cursor(lambda: decode_cursor(cursor, [int] * len(primary_key))),
+        columns=list(GetGroupMemberShort_1.model_fields),
         )
 
     check_object_availability(all_resources, 'No posts were found.', 404)
     
-    return all_resources
+    page = paginate(response, all_resources, page_size, primary_key)
+
+    return rows_response(response, page, GetGroupMemberShort_1)
 
 
 @router.post(
     '/join/{group_id}',
     status_code=status.HTTP_201_CREATED,
     )
-def join_group_member(
+async def join_group_member(
     group_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
     user_id = credentials_user.user_id
    
-    db_session = DBSessionGroupMembers(db)
+    db_session = AsyncDBSessionGroupMembers(db)
     
     dump = {'group_id': group_id, 'user_id': user_id}
 
-    current_resource = db_session.fetch_resource({'group_id': group_id,}, True)
+    group_exists = await db_session.resource_exists({'group_id': group_id,})
 
-    check_resource_availability(current_resource, f'Group {group_id} was not found.',)
+    check_resource_availability(group_exists, f'Group {group_id} was not found.',)
     
-    check_add_resource(lambda: db_session.add_resource(dump), 500) 
+    await check_add_resource_async(lambda: db_session.add_resource(dump), 500) 
     
     return Response(
         status_code=status.HTTP_201_CREATED,
@@ -106,10 +164,48 @@ def join_group_member(
 
 
 
+@router.post('/bulk', response_model=BulkResult,)
+async def join_group_members_bulk(
+    memberships: List[PostGroupMember],
+    db: Session = Depends(get_async_db),
+    credentials_user: int = Depends(get_current_user),
+    ):
+    """Join several groups at once; groups are checked in one query and the memberships are
+    inserted in batches (joining a group twice fails on the `user_group_u` constraint).
+    """
+
+    check_bulk_size(memberships, settings.bulk_max_items)
+
+    user_id = credentials_user.user_id
+
+    db_session = AsyncDBSessionGroupMembers(db)
+    db_session_groups = AsyncDBSession(db, SocialGroups)
+
+    existing_groups = await db_session_groups.existing_values(
+        'group_id', list({membership.group_id for membership in memberships}),
+        )
+
+    results = []
+    member_dumps, member_indexes = [], []
+
+    for index, membership in enumerate(memberships):
+        if membership.group_id in existing_groups:
+            member_dumps.append({'group_id': membership.group_id, 'user_id': user_id})
+            member_indexes.append(index)
+        else:
+            results.append(BulkItemResult(index=index, status='failed', detail=f'Group {membership.group_id} was not found.'))
+
+    if member_dumps:
+        errors = await check_add_resource_async(lambda: db_session.add_resources(member_dumps), 500)
+        results = results + insert_results(errors, member_indexes)
+
+    return bulk_result(sorted(results, key=lambda result: result.index))
+
+
 @router.delete("/leave/{group_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_membership(
+async def delete_membership(
     group_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
@@ -117,36 +213,30 @@ def delete_membership(
     user_id = credentials_user.user_id
 
     # Check social group.
-    db_session_group = DBSessionGroupMembers(db)
+    db_session_group = AsyncDBSessionGroupMembers(db)
 
-    current_group = db_session_group.fetch_resource(
-        {'group_id': group_id,},
-        True
-        )
+    group_exists = await db_session_group.resource_exists({'group_id': group_id,})
 
     check_resource_availability(
-        current_group,
+        group_exists,
         f'Group {group_id} was not found.',
         )
 
     # Check membership.
-    db_session_members = DBSessionGroupMembers(db)
+    db_session_members = AsyncDBSessionGroupMembers(db)
 
     user_id = credentials_user.user_id
 
-    current_resource = db_session_members.fetch_resource(
-        {'group_id': group_id, 'user_id': user_id},
-        True
-        )
+    is_member = await db_session_members.resource_exists({'group_id': group_id, 'user_id': user_id})
 
     check_resource_availability(
-        current_resource,
+        is_member,
         f'User {user_id} is not a member of group {group_id}.',
         )
     
     # Check delete not working: it deletes, but it cannot recognize when noting is deleted.
     # Check deletes works fine for every other 'routes' script.
-    check_delete_resource(
+    await check_delete_resource_async(
         lambda: db_session_members.delete_resource({'group_id': group_id, 'user_id': user_id}),
         f'User {user_id} is not a member of group {group_id}.',
         )
@@ -0,0 +1,91 @@
+# Reconciles `posts.upvotes` with the votes table.
+# The counter is kept in step by `DBSessionVotes`, but votes removed outside of it (e.g. the
+# `ON DELETE CASCADE` of a deleted user, or a manual fix in the database) leave it behind. This
+# job walks the posts in `post_id` ranges, finds the posts whose counter differs from the number
+# of their votes and recounts them, each range in its own short transaction.
+#
+# Usage (from the 'app' folder):
+#   python -m src.jobs.reconcile_upvotes [--batch-size 1000] [--dry-run]
+import argparse
+from typing import Dict
+
+from sqlalchemy import and_, bindparam, func, select
+
+from src.database.db_models import Posts, Votes
+
+posts = Posts.__table__
+votes = Votes.__table__
+
+
+def drifted_upvotes(connection, first_post_id: int, last_post_id: int) -> Dict[int, int]:
+    """Post ids in `[first_post_id, last_post_id]` whose counter is wrong, with their vote count."""
+
+    vote_count = func.count(votes.c.post_id)
+
+    statement = (
+        select([posts.c.post_id, vote_count])
+        .select_from(posts.outerjoin(votes, votes.c.post_id == posts.c.post_id))
+        .where(and_(posts.c.post_id >= first_post_id, posts.c.post_id <= last_post_id))
+        .group_by(posts.c.post_id, posts.c.upvotes)
+        .having(posts.c.upvotes != vote_count)
+        )
+
+    return {post_id: count for post_id, count in connection.execute(statement)}
+
+
+def recount_upvotes(connection, post_ids: list) -> None:
+    """Sets the counters to the vote count in a single statement, so votes written meanwhile are
+    not lost between reading the count and writing it.
+    """
+    vote_count = (
+        select([func.count()])
+        .select_from(votes)
+        .where(votes.c.post_id == posts.c.post_id)
+        .as_scalar()
+        )
+
+    connection.execute(
+        posts.update()
+        .where(posts.c.post_id.in_(bindparam('post_ids', expanding=True)))
+        .values(upvotes=vote_count),
+        {'post_ids': post_ids},
+        )
+
+
+def reconcile_upvotes(engine, batch_size: int = 1000, dry_run: bool = False) -> Dict[int, int]:
+    """Fixes the drifted counters (or only reports them with `dry_run`) and returns them as
+    `{post_id: vote count}`.
+    """
+    with engine.connect() as connection:
+        last_post_id = connection.execute(select([func.max(posts.c.post_id)])).scalar()
+
+    drifted = {}
+    if last_post_id is None:
+        return drifted
+
+    for first_post_id in range(1, last_post_id + 1, batch_size):
+        with engine.begin() as connection:
+            batch = drifted_upvotes(connection, first_post_id, first_post_id + batch_size - 1)
+            if batch and not dry_run:
+                recount_upvotes(connection, list(batch))
+        drifted.update(batch)
+
+    return drifted
+
+
+def main() -> None:
+    from src.database.db_setup import engine
+
+    parser = argparse.ArgumentParser(description='Reconcile posts.upvotes with the votes table.')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--dry-run', action='store_true', help='only report the drifted posts')
+    arguments = parser.parse_args()
+
+    drifted = reconcile_upvotes(engine, arguments.batch_size, arguments.dry_run)
+
+    action = 'Found' if arguments.dry_run else 'Fixed'
+    print(f'{action} {len(drifted)} posts with a drifted upvote counter.')
+
+
+if __name__ == '__main__':
+    main()
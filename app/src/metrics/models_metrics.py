@@ -0,0 +1,66 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class LongHold(BaseModel):
+    route: str
+    hold_ms: float
+
+
+class GetPoolStatistics(BaseModel):
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    wait_ms_avg: float
+    wait_ms_p95: float
+    wait_ms_max: float
+    hold_ms_avg: float
+    hold_ms_max: float
+    long_holds: List[LongHold]
+
+
+class GetReadCacheStatistics(BaseModel):
+    queries_saved: int
+    queries_run: int
+    invalidations: int
+
+
+class GetResponseCacheStatistics(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    size_bytes: int
+    max_bytes: int
+
+
+class GetTokenCacheStatistics(BaseModel):
+    hits: int
+    misses: int
+    entries: int
+    max_entries: int
+
+
+class GetWriteQueueStatistics(BaseModel):
+    depth: int
+    lag_seconds: float
+    last_write_lag_seconds: float
+    written: int
+    batches: int
+    retries: int
+    failed: int
+    dropped: int
+
+
+class GetWarmupReport(BaseModel):
+    pool_connections: int
+    queries: int
+    failed_queries: List[str]
+    pool_seconds: float
+    queries_seconds: float
+    openapi_seconds: float
+    total_seconds: float
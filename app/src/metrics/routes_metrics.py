@@ -0,0 +1,67 @@
+from fastapi import APIRouter
+
+from src.metrics.models_metrics import (
+    GetPoolStatistics,
+    GetReadCacheStatistics,
+    GetResponseCacheStatistics,
+    GetTokenCacheStatistics,
+    GetWriteQueueStatistics,
+    GetWarmupReport,
+    )
+from src.database.db_setup import engine
+from src.database.read_cache import read_cache_statistics
+from src.response_cache import response_cache
+from src.auth.token_cache import token_cache
+from src.background_writes import write_queue
+from src.warmup import warmup_report
+from src.database.http_exceptions import check_object_availability
+
+router = APIRouter()
+
+
+@router.get("/db_pool", response_model=GetPoolStatistics,)
+async def get_pool_statistics():
+    """Connection pool usage of this worker process."""
+
+    statistics = getattr(engine.pool, 'statistics', None)
+
+    check_object_availability(statistics, 'The database engine has no pool statistics.', 404)
+
+    return statistics.snapshot(engine.pool)
+
+
+@router.get("/read_cache", response_model=GetReadCacheStatistics,)
+async def get_read_cache_statistics():
+    """Lookups answered by the per-request read caches (`queries_saved`) of this worker process."""
+
+    return read_cache_statistics.snapshot()
+
+
+@router.get("/response_cache", response_model=GetResponseCacheStatistics,)
+async def get_response_cache_statistics():
+    """Hits and misses of the response cache of the public routes, in this worker process."""
+
+    return response_cache.snapshot()
+
+
+@router.get("/token_cache", response_model=GetTokenCacheStatistics,)
+async def get_token_cache_statistics():
+    """Authenticated requests answered from the verified-token cache of this worker process."""
+
+    return token_cache.snapshot()
+
+
+@router.get("/write_queue", response_model=GetWriteQueueStatistics,)
+async def get_write_queue_statistics():
+    """Depth and lag of the background write queue of this worker process."""
+
+    return write_queue.snapshot()
+
+
+@router.get("/warmup", response_model=GetWarmupReport,)
+async def get_warmup_report():
+    """What the startup warmup of this worker process did, and how long it took."""
+
+    check_object_availability(warmup_report, 'This worker process was not warmed up.', 404)
+
+    return warmup_report
@@ -0,0 +1,258 @@
+from typing import Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from src.database.db_setup import run_in_db_executor
+from src.database.pool_stats import current_route
+from src.database.table_versions import TableVersions, table_versions
+from src.response_cache import (
+    CACHE_STATUS_HEADER,
+    ResponseCache,
+    response_cache,
+    cached_route_tags,
+    response_cache_key,
+    )
+from src.etags import route_etag, etag_matches, encoded_etag
+from src.streaming import wants_ndjson
+from src.compression import Compressor, compress, preferred_encoding
+from src.env_models import settings
+
+
+def cached_request_tags(scope) -> Optional[Tuple[str, ...]]:
+    """Tags of the GET requests to the routes of `CACHED_ROUTES`; `None` for the other requests
+    and for streamed (NDJSON) listings, which are neither cached nor given an ETag.
+    """
+    if scope['type'] != 'http' or scope['method'] != 'GET':
+        return None
+    accept = dict(scope['headers']).get(b'accept', b'').decode('latin-1')
+    if wants_ndjson(accept):
+        return None
+    return cached_route_tags(scope['path'])
+
+
+async def request_table_versions(scope, tables: Tuple[str, ...], versions: TableVersions) -> Tuple[int, ...]:
+    """Versions of `tables` when the request came in, read once per request (`ConditionalGet`
+    and `CacheResponses` both use them).
+    """
+    state = scope.setdefault('state', {})
+    if 'table_versions' not in state:
+        state['table_versions'] = await run_in_db_executor(versions.get, tables)
+    return state['table_versions']
+
+
+def request_encoding(scope) -> Optional[str]:
+    """Content encoding the response to the request may be compressed in (see `preferred_encoding`)."""
+    accept_encoding = dict(scope['headers']).get(b'accept-encoding', b'').decode('latin-1')
+    return preferred_encoding(accept_encoding) if accept_encoding else None
+
+
+def compressible(headers: MutableHeaders, body: bytes) -> bool:
+    return 'content-encoding' not in headers and len(body) >= settings.compression_minimum_size
+
+
+def set_encoding_headers(headers: MutableHeaders, encoding: str, body: Optional[bytes]) -> None:
+    """Headers of a body compressed in `encoding`; without `body` (streamed) there is no
+    `Content-Length`. An ETag becomes the one of the compressed representation.
+    """
+    headers['content-encoding'] = encoding
+    if 'etag' in headers:
+        headers['etag'] = encoded_etag(headers['etag'], encoding)
+    if body is None:
+        del headers['content-length']
+    else:
+        headers['content-length'] = str(len(body))
+    headers.add_vary_header('Accept-Encoding')
+
+
+class TrackRequestRoute:
+    """Pure ASGI middleware that stores the request's method and path in `current_route`."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            current_route.set(f"{scope['method']} {scope['path']}")
+        await self.app(scope, receive, send)
+
+
+class CacheResponses:
+    """Pure ASGI middleware answering the GET routes of `CACHED_ROUTES` from the response cache;
+    successful responses of these routes are stored on the way out, with the versions of their
+    tables (`versions=None`: not checked).
+    """
+
+    def __init__(
+        self,
+        app,
+        cache: ResponseCache = response_cache,
+        versions: Optional[TableVersions] = table_versions,
+        ):
+        self.app = app
+        self.cache = cache
+        self.versions = versions
+
+    async def __call__(self, scope, receive, send):
+        tags = cached_request_tags(scope) if self.cache.enabled else None
+
+        if tags is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = response_cache_key(scope['path'], scope['query_string'])
+        versions = None
+        if self.versions is not None:
+            versions = await request_table_versions(scope, tags, self.versions)
+        entry = self.cache.get(key, versions)
+
+        if entry is not None:
+            headers = MutableHeaders(raw=list(entry.headers))
+            body = entry.body
+            # Compressed once per entry and encoding, `CompressResponses` lets it through as is.
+            encoding = request_encoding(scope)
+            if encoding is not None and compressible(headers, body):
+                body = self.cache.encoded_body(key, entry, encoding, lambda body: compress(body, encoding))
+                set_encoding_headers(headers, encoding, body)
+
+            headers[CACHE_STATUS_HEADER] = 'HIT'
+            await send({'type': 'http.response.start', 'status': entry.status, 'headers': headers.raw})
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        generation = self.cache.generation
+        response_start = {}
+        body_chunks = []
+
+        async def send_and_store(message):
+            if message['type'] == 'http.response.start':
+                response_start.update(message)
+                message = {
+                    **message,
+                    'headers': list(message.get('headers', [])) + [(CACHE_STATUS_HEADER.lower().encode(), b'MISS')],
+                    }
+            elif message['type'] == 'http.response.body' and response_start.get('status') == 200:
+                body_chunks.append(message.get('body', b''))
+                if not message.get('more_body', False):
+                    self.cache.put(
+                        key,
+                        response_start['status'],
+                        list(response_start.get('headers', [])),
+                        b''.join(body_chunks),
+                        tags,
+                        generation,
+                        versions,
+                        )
+            await send(message)
+
+        await self.app(scope, receive, send_and_store)
+
+
+class ConditionalGet:
+    """Pure ASGI middleware adding an ETag to the responses of the cached GET routes (see
+    `route_etag`) and answering `If-None-Match` with `304 Not Modified` before the route (and
+    its queries) runs.
+    """
+
+    def __init__(self, app, versions: TableVersions = table_versions,):
+        self.app = app
+        self.versions = versions
+
+    async def __call__(self, scope, receive, send):
+        tags = cached_request_tags(scope)
+
+        if tags is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Computed before the route reads the tables: a write committed in between changes
+        # the next ETag instead of being hidden behind this one.
+        etag = route_etag(
+            scope['path'], scope['query_string'], await request_table_versions(scope, tags, self.versions),
+            )
+
+        request_headers = dict(scope['headers'])
+        matched_etag = etag_matches(request_headers.get(b'if-none-match', b'').decode('latin-1'), etag)
+        if matched_etag:
+            await send({'type': 'http.response.start', 'status': 304, 'headers': [(b'etag', matched_etag.encode())]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        async def send_with_etag(message):
+            if message['type'] == 'http.response.start' and message['status'] == 200:
+                headers = MutableHeaders(raw=list(message.get('headers', [])))
+                # Compressed cache hits (`CompressResponses` changes the others on its way out).
+                encoding = headers.get('content-encoding')
+                headers['etag'] = encoded_etag(etag, encoding) if encoding else etag
+                message = {**message, 'headers': headers.raw}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
+
+
+class CompressResponses:
+    """Pure ASGI middleware compressing the response bodies in the encoding preferred by the
+    client (see `preferred_encoding`): whole bodies of at least `COMPRESSION_MINIMUM_SIZE` bytes,
+    and streamed bodies chunk by chunk whatever their size. Responses that already have a
+    `Content-Encoding` (e.g. compressed cache hits) go through unchanged.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        encoding = request_encoding(scope) if scope['type'] == 'http' else None
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        response_start = {}
+        compressor = None
+
+        async def send_compressed(message):
+            nonlocal compressor
+
+            if message['type'] == 'http.response.start':
+                # Held back until the first body chunk tells whether to compress.
+                response_start.update(message)
+                return
+
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+            if compressor is not None:
+                body = compressor.compress(body)
+                if not more_body:
+                    body += compressor.finish()
+                await send({**message, 'body': body})
+                return
+
+            if not response_start:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(response_start.get('headers', [])))
+            start = {**response_start}
+            response_start.clear()
+
+            if 'content-encoding' in headers or (not more_body and not compressible(headers, body)):
+                await send(start)
+                await send(message)
+                return
+
+            if more_body:
+                compressor = Compressor(encoding)
+                body = compressor.compress(body)
+                set_encoding_headers(headers, encoding, None)
+            else:
+                body = compress(body, encoding)
+                set_encoding_headers(headers, encoding, body)
+
+            await send({**start, 'headers': headers.raw})
+            await send({**message, 'body': body})
+
+        await self.app(scope, receive, send_compressed)
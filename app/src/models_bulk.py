@@ -0,0 +1,31 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class BulkItemResult(BaseModel):
+    index: int # position of the item in the request body.
+    status: str # 'created', 'removed' or 'failed'.
+    detail: Optional[str] = None
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    items: List[BulkItemResult]
+
+
+def bulk_result(items: List[BulkItemResult]) -> BulkResult:
+    failed = sum(item.status == 'failed' for item in items)
+    return BulkResult(succeeded=len(items) - failed, failed=failed, items=items)
+
+
+def insert_results(errors: List[Optional[str]], indexes: List[int] = None) -> List[BulkItemResult]:
+    """Per-item results of `DBSession.add_resources`; `indexes` maps its dumps back to the
+    positions of the items in the request, when only some of them were inserted.
+    """
+    indexes = indexes if indexes is not None else list(range(len(errors)))
+    return [
+        BulkItemResult(index=index, status='created') if error is None
+        else BulkItemResult(index=index, status='failed', detail=error)
+        for index, error in zip(indexes, errors)
+        ]
@@ -4,13 +4,15 @@ from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from fastapi import Depends, status, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from src.env_models import settings
-from src.auth.models_auth import TokenData 
+from src.auth.models_auth import TokenData, CurrentUser
+from src.auth.token_cache import token_cache
 from src.route_config import LOGIN_ROUTE
-from src.database.db_setup import get_db
-from src.database.db_models import DBSession, Users
+from src.database.db_setup import get_async_db
+from src.database.db_models import AsyncDBSession, Users
 
 oauth_scheme = OAuth2PasswordBearer(tokenUrl=LOGIN_ROUTE)
 
@@ -32,33 +34,38 @@ def verify_access_token(
     credentials_exception_expiration_check: HTTPException
     ) -> TokenData:
 
-    # Time validation.
+    # Signature and time validation, in a single decode.
     try:
         decoded_token = jwt.decode(token, settings.key_token, algorithms=[settings.algorithm])
     except jwt.ExpiredSignatureError:
         raise credentials_exception_expiration_check
-    
+    except JWTError:
+        raise credentials_exception
+
     # Credential (user ID in this case) validation.
-    try:
-        decoded_token = jwt.decode(token, settings.key_token, algorithms=[settings.algorithm])
+    id: str = decoded_token.get('user_id')
 
-        id: str = decoded_token.get('user_id')
+    if id is None:
+        raise credentials_exception
+
+    try:
+        token_data = TokenData(user_id=id, exp=decoded_token.get('exp'))
+    except ValidationError:
+        raise credentials_exception
 
-        if id is None:
-            raise credentials_exception
-        
-        token_data = TokenData(user_id=id)
-    
-    except JWTError:
-        raise credentials_exception 
-    
     return token_data # is a pydantic class TokenData, not a dictionary
 
-def get_current_user(
+async def get_current_user(
         token: str = Depends(oauth_scheme),
-        db: Session = Depends(get_db),
-        ) -> Callable:
-    
+        db: Session = Depends(get_async_db),
+        ) -> CurrentUser:
+    """User the request is authenticated as. Verified tokens are kept in `token_cache`: the
+    next requests with the same token skip the decoding and the user lookup.
+    """
+
+    user = token_cache.get(token)
+    if user is not None:
+        return user
 
     credentials_exception_expiration_check = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -72,12 +79,20 @@ def get_current_user(
         headers={'WWW-Authenticate': 'Bearer'},
         )
     
-    
+    # Taken before the lookup: a user updated or deleted meanwhile is not cached.
+    generation = token_cache.generation
+
     token_data = verify_access_token(token, credentials_exception, credentials_exception_expiration_check)
 
     # Verify that that the ID contained in the token is from a user that is registered 
     # in the database.
-    db_session = DBSession(db, Users)
-    user_credential = db_session.fetch_resource({'user_id': token_data.user_id})
+    db_session = AsyncDBSession(db, Users)
+    user_credential = await db_session.fetch_resource({'user_id': token_data.user_id})
+
+    if user_credential is None:
+        raise credentials_exception
+
+    user = CurrentUser.model_validate(user_credential)
+    token_cache.put(token, user, token_data.exp, generation)
 
-    return user_credential
\ No newline at end of file
+    return user
@@ -0,0 +1,69 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import Response
+
+from src.env_models import settings
+
+# Header holding the cursor of the next page of a listing; it is absent on the last page.
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+# Types of the cursor values of the keysets: (created_at, id) and (relevance, post_id).
+CREATED_AT_CURSOR = (datetime, int)
+RELEVANCE_CURSOR = (float, int)
+
+
+def get_page_size(limit: Optional[int]) -> int:
+    """Clamp the page size requested by the client to `MAX_PAGE_SIZE`."""
+    if not limit or limit < 1:
+        return settings.max_page_size
+    return min(limit, settings.max_page_size)
+
+
+def encode_cursor(values: list) -> str:
+    """Opaque cursor holding the ordering values of the last row of a page."""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def cursor_value(value: Any, value_type: type) -> Any:
+    """`value` of a decoded cursor as `value_type` (datetimes are sent as ISO strings)."""
+    if value_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if value_type is float and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if value_type is int and isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise ValueError('Invalid cursor.')
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[list]:
+    """Inverse of `encode_cursor`, each value checked against (and converted to) `types`, so that
+    no query runs with a tampered cursor; raises `ValueError` if the cursor was not issued by it.
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError('Invalid cursor.')
+        return [cursor_value(value, value_type) for value, value_type in zip(values, types)]
+    except (ValueError, TypeError) as error:
+        raise ValueError('Invalid cursor.') from error
+
+
+def paginate(response: Response, rows: list, page_size: int, keys: List[str]) -> list:
+    """Trim the `page_size` + 1 rows fetched for a page to `page_size`; if there was an extra
+    row, the cursor of the next page (the `keys` values of the last row kept) is set in the
+    `X-Next-Cursor` header.
+    """
+    if len(rows) <= page_size:
+        return rows
+
+    rows = rows[:page_size]
+    last_row = rows[-1]
+    values = [last_row[key] if isinstance(last_row, dict) else getattr(last_row, key) for key in keys]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(values)
+    return rows
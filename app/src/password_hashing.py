@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from src.env_models import settings
+from src.utils import hash_pw, verify_and_update_pw
+
+
+class PasswordHashingBusy(Exception):
+    """Raised instead of queueing one more job on a saturated `PasswordHasher`."""
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification on a pool of `workers` processes, away from the event
+    loop, the database threads and the GIL. At most `max_pending` jobs are running or queued;
+    beyond that `PasswordHashingBusy` is raised at once (a burst of logins is turned away
+    instead of delaying every other request).
+
+    The processes are started by the first job (not at import, e.g. by Alembic or the tests).
+    """
+
+    def __init__(self, workers: int, max_pending: int,):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def get_executor(self,) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self.executor
+
+    async def run(self, function: Callable, *args) -> Any:
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise PasswordHashingBusy(f'{self.pending} password hashing jobs are pending.')
+            self.pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.get_executor(), function, *args)
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        return await self.run(hash_pw, password)
+
+    async def verify_password(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """See `verify_and_update_pw`."""
+        return await self.run(verify_and_update_pw, password, hashed_password)
+
+    def shutdown(self,) -> None:
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hashing_workers,
+    max_pending=settings.password_hashing_max_pending,
+    )
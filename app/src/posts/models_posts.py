@@ -1,4 +1,5 @@
 from datetime import datetime
+from enum import Enum
 from typing import Union, Any, List
 from pydantic import (
     BaseModel,
@@ -50,4 +51,9 @@ class PatchPost(BaseModel):
     view_count: int = None
     title: str = None
     # secret_number: int = None
-  
\ No newline at end of file
+  
+
+
+class SearchMode(str, Enum):
+    substring = 'substring' # `LIKE '%search%'` on the titles.
+    fulltext = 'fulltext' # full-text index, most relevant posts first.
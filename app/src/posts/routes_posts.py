@@ -1,6 +1,6 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Response, status
 from src.oauth2 import get_current_user
 from src.posts.models_posts import (
     PatchPost,
@@ -8,88 +8,146 @@ from src.posts.models_posts import (
     GetAllPosts,
     PostPost,
     PutPost,
+    SearchMode,
     )
-from src.database.db_setup import SessionLocal, get_db
+from src.database.db_setup import SessionLocal, get_async_db, get_async_routed_db
 from src.database.db_models import (
     Session,
-    DBSessionPosts,
+    AsyncDBSessionPosts,
     )
 from src.database.http_exceptions import (
     check_object_availability,
-    check_add_resource,
+    check_add_resource_async,
     check_user_id_authorization,
     check_uniqueness,
     check_partial_fields,
-    check_delete_resource,
+    check_delete_resource_async,
+    check_cursor,
+    check_bulk_size,
     )
+from src.posts.view_counter import view_count_buffer
+from src.pagination import get_page_size, decode_cursor, paginate, CREATED_AT_CURSOR, RELEVANCE_CURSOR
+from src.models_bulk import BulkResult, bulk_result, insert_results
+from src.env_models import settings
+from src.streaming import wants_ndjson, ndjson_response, stream_limit
+from src.serialization import rows_response
 
 router = APIRouter()
 
 @router.get("/my_posts", response_model=List[GetAllPosts],)
-def get_users_posts(
-    db: Session = Depends(get_db),
+async def get_users_posts(
+    response: Response,
+    db: Session = Depends(get_async_db),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     credentials_user: int = Depends(get_current_user),
     ):
-    """Fetch logged in user's posts."""
+    """Fetch logged in user's posts, newest first. The cursor of the next page is returned in
+    the `X-Next-Cursor` header. Streamed as NDJSON like `GET /posts/`.
+    """
+
+    db_session = AsyncDBSessionPosts(db)
+
+    if wants_ndjson(accept):
+        rows = await db_session.all_posts(
+            limit=stream_limit(limit),
+            filter_columns={'user_id': credentials_user.user_id},
+            cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
+            stream=True,
+            )
+        return ndjson_response(rows, GetAllPosts)
 
-    db_session = DBSessionPosts(db)
+    page_size = get_page_size(limit)
 
-    user_resources = db_session.all_posts(
+    user_resources = await db_session.all_posts(
+        limit=page_size + 1,
         filter_columns={'user_id': credentials_user.user_id},
+        cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
         )
     
     check_object_availability(user_resources, 'No posts were found.', 404)
     
-    return user_resources
+    page = paginate(response, user_resources, page_size, ['created_at', 'post_id'])
+
+    return rows_response(response, page, GetAllPosts)
 
 
 @router.get("/{id}", response_model=GetPost,)
-def get_post(
+async def get_post(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_routed_db),
     ):
 
-    db_session = DBSessionPosts(db)
+    db_session = AsyncDBSessionPosts(db)
     
-    resource = db_session.fetch_resource({'post_id': id}, False)
+    # The author is joined in: `GetPost` reads `user_info` on the event loop.
+    resource = await db_session.fetch_resource({'post_id': id}, False, ['user_info'])
     check_object_availability(resource, 'Post not found.', 404)
 
-    resource.upvotes = db_session.get_upvotes_by_post(post_id=id)
+    # Add a view: counted in memory and written in batches (see `ViewCountBuffer`); the
+    # response includes the views not written yet.
+    pending_views = view_count_buffer.add_view(id)
 
-    # Add a view.
-    updated_view_count = resource.view_count + 1
-    
-    check_add_resource(
-        lambda: db_session.update_resource(
-            id_column='post_id',
-            id=id,
-            dump={'view_count': updated_view_count}
-            ),
-        status_code=500,
+    return GetPost.model_validate(resource, from_attributes=True).model_copy(
+        update={'view_count': (resource.view_count or 0) + pending_views}
         )
-    
-    return resource
 
 
 @router.get("/", response_model=List[GetAllPosts],)
-def get_all_posts(
-    db: Session = Depends(get_db),
+async def get_all_posts(
+    response: Response,
+    db: Session = Depends(get_async_routed_db),
     limit: Optional[int] = None,
     skip: Optional[int] = None,
     search: Optional[str] = "",
+    search_mode: SearchMode = SearchMode.substring,
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     ):
+    """Posts, newest first. Pass the `X-Next-Cursor` header of a page as `cursor` to get the
+    next one (`skip` still works, but gets slower the deeper the page). With
+    `search_mode=fulltext`, `search` goes through the full-text index and the posts come most
+    relevant first.
+
+    With `Accept: application/x-ndjson` the posts are streamed instead, one JSON object per
+    line, read from the database in chunks: `limit` is optional, capped at `STREAM_MAX_ROWS` (no
+    `X-Next-Cursor`), and no posts is an empty body rather than a 404.
+    """
+
+    db_session = AsyncDBSessionPosts(db)
+
+    fulltext_search = search_mode == SearchMode.fulltext and bool(search.strip())
+    cursor_types = RELEVANCE_CURSOR if fulltext_search else CREATED_AT_CURSOR
+
+    if wants_ndjson(accept):
+        rows = await db_session.all_posts(
+            limit=stream_limit(limit),
+            skip=skip,
+            search=search,
+            cursor=check_cursor(lambda: decode_cursor(cursor, cursor_types)),
+            search_mode=search_mode.value,
+            stream=True,
+            )
+        return ndjson_response(rows, GetAllPosts)
 
-    db_session = DBSessionPosts(db)
-    
-    all_resources = db_session.all_posts(
-        limit=limit,
+    page_size = get_page_size(limit)
+
+    all_resources = await db_session.all_posts(
+        limit=page_size + 1,
         skip=skip,
         search=search,
+        cursor=check_cursor(lambda: decode_cursor(cursor, cursor_types)),
+        search_mode=search_mode.value,
         )
 
     check_object_availability(all_resources, 'No posts were found.', 404)
     
-    return all_resources
+    cursor_keys = ['relevance', 'post_id'] if fulltext_search else ['created_at', 'post_id']
+
+    page = paginate(response, all_resources, page_size, cursor_keys)
+
+    return rows_response(response, page, GetAllPosts)
 
 
 @router.post(
@@ -97,46 +155,64 @@ def get_all_posts(
     status_code=status.HTTP_201_CREATED,
     response_model=PostPost,
     )
-def post_post(
+async def post_post(
     resource: PostPost,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionPosts(db)
+    db_session = AsyncDBSessionPosts(db)
 
     post_dump = resource.model_dump()
 
     post_dump['user_id'] = credentials_user.user_id
 
-    check_add_resource(lambda: db_session.add_resource(post_dump), 404)
-    
-    resource = db_session.fetch_last_created
+    resource = await check_add_resource_async(lambda: db_session.add_resource(post_dump), 404)
+
+    check_object_availability(resource, 'The post could not be created.', 404)
     
     return resource
 
 
+@router.post('/bulk', response_model=BulkResult,)
+async def post_posts_bulk(
+    resources: List[PostPost],
+    db: Session = Depends(get_async_db),
+    credentials_user: int = Depends(get_current_user),
+    ):
+    """Create up to `BULK_MAX_ITEMS` posts of the logged in user in batched INSERTs."""
+
+    check_bulk_size(resources, settings.bulk_max_items)
+
+    db_session = AsyncDBSessionPosts(db)
+
+    post_dumps = [{**resource.model_dump(), 'user_id': credentials_user.user_id} for resource in resources]
+
+    errors = await check_add_resource_async(lambda: db_session.add_resources(post_dumps), 500)
+
+    return bulk_result(insert_results(errors))
+
+
 @router.put("/{id}",)
-def put_post(
+async def put_post(
     id: int,
     resource: PutPost,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionPosts(db)
+    db_session = AsyncDBSessionPosts(db)
 
-    user_id = db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
+    user_id = await db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
 
     check_user_id_authorization(user_id, credentials_user.user_id)
 
     resource_dump = resource.model_dump()
 
-    check_uniqueness(
-        False, db_session.unique_values('post_id'), id, f'Post {id} was not found.',
-        )
+    # The owner lookup doubles as the existence check.
+    check_uniqueness(False, user_id is not None, f'Post {id} was not found.',)
     
-    check_add_resource(
+    await check_add_resource_async(
     lambda: db_session.update_resource('post_id', id, resource_dump),
     500,
     )
@@ -148,21 +224,20 @@ def put_post(
 
 
 @router.patch("/{id}")
-def patch_post(id: int,
+async def patch_post(id: int,
     resource: PatchPost,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionPosts(db)
+    db_session = AsyncDBSessionPosts(db)
 
-    user_id = db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
+    user_id = await db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
 
     check_user_id_authorization(user_id, credentials_user.user_id)
 
-    check_uniqueness(
-        False, db_session.unique_values('post_id'), id, f'Post {id} was not found.',
-        )
+    # The owner lookup doubles as the existence check.
+    check_uniqueness(False, user_id is not None, f'Post {id} was not found.',)
 
     partial_resource_dump = resource.model_dump()
     partial_resource_dump = {
@@ -172,13 +247,8 @@ def patch_post(id: int,
     input_fields = partial_resource_dump.keys()
     required_fields = PatchPost.__annotations__.keys()
     check_partial_fields(input_fields, required_fields)
-
     
-    check_uniqueness(
-        False, db_session.unique_values('post_id'), id, f'Post {id} was not found.',
-        )
-    
-    check_add_resource(
+    await check_add_resource_async(
     lambda: db_session.update_resource('post_id', id, partial_resource_dump),
     500,
     )
@@ -190,23 +260,22 @@ def patch_post(id: int,
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionPosts(db)
+    db_session = AsyncDBSessionPosts(db)
 
-    user_id = db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
+    user_id = await db_session.fetch_value_by_unique_value('post_id', 'user_id', id)
 
     check_user_id_authorization(user_id, credentials_user.user_id)
 
-    check_uniqueness(
-        False, db_session.unique_values('post_id'), id, f'Post {id} was not found.',
-        )
+    # The owner lookup doubles as the existence check.
+    check_uniqueness(False, user_id is not None, f'Post {id} was not found.',)
     
-    check_delete_resource(
+    await check_delete_resource_async(
         lambda: db_session.delete_resource({'post_id': id}),
         f'Post {id} was not found.',
         )
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Dict, List
+
+from sqlalchemy import bindparam, func
+
+from src.database.db_models import Posts
+from src.database.db_setup import engine
+from src.background_writes import BackgroundWriteQueue, write_queue
+
+
+class ViewCountBuffer:
+    """Views of `GET /posts/{id}` counted in memory, per post, and handed every
+    `VIEW_COUNT_FLUSH_INTERVAL` seconds to the background write queue, which writes them with
+    one batched `view_count = view_count + n` UPDATE, instead of a read-modify-write of the
+    post on every read (which loses views under concurrency and locks popular posts). Views not
+    written yet are lost if the process dies; a normal shutdown writes them (see the lifespan
+    in 'main.py').
+    """
+
+    def __init__(self,):
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def add_view(self, post_id: int) -> int:
+        """Counts a view and returns the views of the post not flushed yet."""
+        with self.lock:
+            self.pending[post_id] = self.pending.get(post_id, 0) + 1
+            return self.pending[post_id]
+
+    def take_pending(self,) -> Dict[int, int]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+    def restore_pending(self, views: Dict[int, int]) -> None:
+        with self.lock:
+            for post_id, count in views.items():
+                self.pending[post_id] = self.pending.get(post_id, 0) + count
+
+    def write_views(self, engine, views: Dict[int, int]) -> int:
+        """Adds `views` (post ID: views) to the posts in one batched UPDATE."""
+        if not views:
+            return 0
+
+        posts = Posts.__table__
+        statement = (
+            posts.update()
+            .where(posts.c.post_id == bindparam('viewed_post_id'))
+            .values(
+                view_count=func.coalesce(posts.c.view_count, 0) + bindparam('views'),
+                # A view is not an edit of the post.
+                updated_at=posts.c.updated_at,
+                )
+            )
+        with engine.begin() as connection:
+            connection.execute(
+                statement,
+                [{'viewed_post_id': post_id, 'views': count} for post_id, count in views.items()],
+                )
+        return len(views)
+
+    def submit_pending(self, queue: BackgroundWriteQueue) -> bool:
+        """Hands the pending views to the background write queue (see the 'post_views' writer)."""
+        views = self.take_pending()
+        if not views:
+            return False
+        if not queue.submit('post_views', views):
+            self.restore_pending(views)
+            return False
+        return True
+
+    async def flush_periodically(self, queue: BackgroundWriteQueue, interval: float) -> None:
+        """Runs until cancelled; the views go through `queue`, which retries failed writes."""
+        while True:
+            await asyncio.sleep(interval)
+            self.submit_pending(queue)
+
+
+def merge_views(batches: List[Dict[int, int]]) -> Dict[int, int]:
+    views = {}
+    for batch in batches:
+        for post_id, count in batch.items():
+            views[post_id] = views.get(post_id, 0) + count
+    return views
+
+
+def register_views_writer(queue: BackgroundWriteQueue, buffer: ViewCountBuffer, bind_engine) -> None:
+    """The 'post_views' writer of `queue`: the views submitted by `buffer` are written together;
+    views that could not be written go back to `buffer`.
+    """
+    queue.register(
+        'post_views',
+        lambda batches: buffer.write_views(bind_engine, merge_views(batches)),
+        on_failure=lambda batches: buffer.restore_pending(merge_views(batches)),
+        )
+
+
+view_count_buffer = ViewCountBuffer()
+
+register_views_writer(write_queue, view_count_buffer, engine)
@@ -0,0 +1,188 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from src.env_models import settings
+
+# Public GET routes whose responses are cached, with the tags of the tables they read. A write
+# through `DBSession` invalidates the responses tagged with its tables (see
+# `bumps_table_versions` in 'src/database/table_versions.py').
+CACHED_ROUTES = [
+    (re.compile(r'^/posts/$'), ('posts', 'users')),
+    (re.compile(r'^/social_groups/$'), ('social_groups', 'group_members', 'users')),
+    (re.compile(r'^/social_groups/\d+$'), ('social_groups', 'group_members', 'users')),
+    (re.compile(r'^/group_members/\d+$'), ('group_members', 'social_groups', 'users')),
+    ]
+
+# Response header telling whether the response came from the cache ('HIT') or not ('MISS').
+CACHE_STATUS_HEADER = 'X-Cache'
+
+
+def cached_route_tags(path: str) -> Optional[Tuple[str, ...]]:
+    for pattern, tags in CACHED_ROUTES:
+        if pattern.match(path):
+            return tags
+    return None
+
+
+def response_cache_key(path: str, query_string: bytes) -> str:
+    """Path and query parameters, the parameters sorted (`?limit=5&skip=1` and
+    `?skip=1&limit=5` share an entry).
+    """
+    parameters = sorted(parse_qsl(query_string.decode('latin-1'), keep_blank_values=True))
+    return f'{path}?{urlencode(parameters)}'
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: List[Tuple[bytes, bytes]]
+    body: bytes
+    tags: Tuple[str, ...]
+    expires_at: float
+    # Compressed versions of `body`, by content encoding (see `ResponseCache.encoded_body`).
+    encoded_bodies: Dict[str, bytes] = field(default_factory=dict)
+    # Versions of the tagged tables the response was read at (see `TableVersions`).
+    versions: Optional[Tuple[int, ...]] = None
+
+    @property
+    def size(self,) -> int:
+        return (
+            len(self.body)
+            + sum(len(body) for body in self.encoded_bodies.values())
+            + sum(len(name) + len(value) for name, value in self.headers)
+            )
+
+
+class ResponseCache:
+    """Serialized responses kept for `ttl` seconds, least recently used evicted first once they
+    take more than `max_bytes`. Entries carry the tags of the tables they were read from.
+
+    `generation` is bumped by every invalidation: a response computed while a write was
+    committing may hold the old rows, so `put` drops responses whose request started before the
+    last invalidation. Invalidations only reach the cache of their own worker process: entries
+    stored with the `versions` of their tables are also dropped by `get` once these moved (a
+    write through another process).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, clock: Callable[[], float] = time.monotonic,):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self.size = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self,) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def get(self, key: str, versions: Optional[Tuple[int, ...]] = None) -> Optional[CachedResponse]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (
+                entry.expires_at <= self.clock() or (versions is not None and entry.versions != versions)
+                ):
+                self.remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(
+        self,
+        key: str,
+        status: int,
+        headers: List[Tuple[bytes, bytes]],
+        body: bytes,
+        tags: Iterable[str],
+        generation: int,
+        versions: Optional[Tuple[int, ...]] = None,
+        ) -> bool:
+        entry = CachedResponse(status, headers, body, tuple(tags), self.clock() + self.ttl, versions=versions)
+
+        with self.lock:
+            if generation != self.generation or entry.size > self.max_bytes:
+                return False
+
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = entry
+            self.size += entry.size
+            self.evict()
+            return True
+
+    def encoded_body(self, key: str, entry: CachedResponse, encoding: str, encode: Callable[[bytes], bytes]) -> bytes:
+        """`entry`'s body in `encoding`: encoded by `encode` on the first request for it, then
+        kept with the entry (and counted in its size) for the next hits.
+        """
+        body = entry.encoded_bodies.get(encoding)
+        if body is not None:
+            return body
+
+        body = encode(entry.body)
+        with self.lock:
+            if self.entries.get(key) is entry and encoding not in entry.encoded_bodies:
+                entry.encoded_bodies[encoding] = body
+                self.size += len(body)
+                self.evict()
+        return body
+
+    def evict(self,) -> None:
+        """Caller holds the lock."""
+        while self.size > self.max_bytes:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def remove(self, key: str) -> None:
+        """Caller holds the lock."""
+        entry = self.entries.pop(key)
+        self.size -= entry.size
+
+    def invalidate(self, *tags: str) -> int:
+        """Drops the responses tagged with any of `tags`; returns how many were dropped."""
+        with self.lock:
+            self.generation += 1
+            self.invalidations += 1
+            keys = [key for key, entry in self.entries.items() if set(entry.tags) & set(tags)]
+            for key in keys:
+                self.remove(key)
+            return len(keys)
+
+    def clear(self,) -> None:
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+            self.size = 0
+
+    def snapshot(self,) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'size_bytes': self.size,
+                'max_bytes': self.max_bytes,
+                }
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.response_cache_max_bytes,
+    ttl=settings.response_cache_ttl,
+    )
@@ -0,0 +1,74 @@
+# Production server: gunicorn managing `WEB_CONCURRENCY` uvicorn worker processes, configured
+# from `Settings` (`python serve.py`, or `gunicorn -c gunicorn_conf.py main:my_rest_api`).
+# Without gunicorn, uvicorn runs the workers itself, without replacing them.
+# Each worker has its own connection pool, caches and background write queue.
+import logging
+import logging.config
+import os
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+from src.env_models import settings
+
+APP = 'main:my_rest_api'
+
+# uvicorn's error logger: its messages go to the server logs, along with uvicorn's own.
+logger = logging.getLogger('uvicorn.error')
+
+# Left to the worker after its graceful shutdown (`SERVER_GRACEFUL_TIMEOUT`) for the app's own
+# shutdown before gunicorn kills it.
+APP_SHUTDOWN_SECONDS = 10
+
+
+def server_workers() -> int:
+    return settings.server_workers or os.cpu_count() or 1
+
+
+def gunicorn_options() -> dict:
+    return {
+        'bind': f'{settings.server_host}:{settings.server_port}',
+        'workers': server_workers(),
+        'worker_class': 'src.uvicorn_worker.UvicornWorker',
+        'keepalive': settings.server_keep_alive,
+        'backlog': settings.server_backlog,
+        'max_requests': settings.server_max_requests,
+        'max_requests_jitter': settings.server_max_requests_jitter,
+        'graceful_timeout': settings.server_graceful_timeout + APP_SHUTDOWN_SECONDS,
+        'timeout': settings.server_worker_timeout,
+        }
+
+
+def uvicorn_options() -> dict:
+    # No `limit_max_requests`: uvicorn does not start a new worker in place of one that exits.
+    return {
+        'host': settings.server_host,
+        'port': settings.server_port,
+        'workers': server_workers(),
+        'loop': 'auto',
+        'http': 'auto',
+        'timeout_keep_alive': settings.server_keep_alive,
+        'backlog': settings.server_backlog,
+        'timeout_graceful_shutdown': settings.server_graceful_timeout,
+        }
+
+
+def serve() -> None:
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        logging.config.dictConfig(LOGGING_CONFIG)
+        logger.warning('gunicorn is not installed: running the workers with uvicorn, without recycling them.')
+        uvicorn.run(APP, **uvicorn_options())
+        return
+
+    class Application(BaseApplication):
+        def load_config(self,):
+            for name, value in gunicorn_options().items():
+                self.cfg.set(name, value)
+
+        def load(self,):
+            from main import my_rest_api
+            return my_rest_api
+
+    Application().run()
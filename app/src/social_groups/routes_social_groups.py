@@ -1,90 +1,142 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, Response, status
+from fastapi import APIRouter, Depends, Header, Response, status
 from src.oauth2 import get_current_user
 from src.social_groups.models_social_groups import (
     PostCreateSocialGroup,
     GetSocialGroup,
     GetAllSocialGroups,
     )
-from src.database.db_setup import SessionLocal, get_db
+from src.database.db_setup import SessionLocal, get_async_db, get_async_routed_db
 from src.database.db_models import (
     Session,
-    DBSession,
-    DBSessionUsers,
-    DBSessionSocialGroups,
+    AsyncDBSession,
+    AsyncDBSessionUsers,
+    AsyncDBSessionSocialGroups,
     GroupMembers,
     )
 from src.database.http_exceptions import (
     check_object_availability,
     check_resource_availability,
-    check_add_resource,
+    check_add_resource_async,
     check_user_id_authorization,
     check_uniqueness,
-    check_delete_resource,
+    check_delete_resource_async,
+    check_cursor,
     )
+from src.pagination import get_page_size, decode_cursor, paginate, CREATED_AT_CURSOR
+from src.streaming import wants_ndjson, ndjson_response, stream_limit
+from src.serialization import rows_response
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[GetAllSocialGroups],)
-def get_all_social_groups(
-    db: Session = Depends(get_db),
+async def get_all_social_groups(
+    response: Response,
+    db: Session = Depends(get_async_routed_db),
     limit: Optional[int] = None,
     skip: Optional[int] = None,
     search: Optional[str] = "",
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     ):
-
-    db_session = DBSessionSocialGroups(db,)
-
-    all_resources = db_session.all_social_groups()
+    """Social groups, newest first; paginated (or streamed) like `GET /posts/`."""
+
+    db_session = AsyncDBSessionSocialGroups(db,)
+
+    if wants_ndjson(accept):
+        rows = await db_session.all_social_groups(
+            limit=stream_limit(limit),
+            skip=skip,
+            search=search,
+            cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
+            stream=True,
+            )
+        return ndjson_response(rows, GetAllSocialGroups)
+
+    page_size = get_page_size(limit)
+
+    all_resources = await db_session.all_social_groups(
+        limit=page_size + 1,
+        skip=skip,
+        search=search,
+        cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
+        )
 
     check_object_availability(all_resources, 'No social groups were found.', 404)
     
-    return all_resources
+    page = paginate(response, all_resources, page_size, ['created_at', 'group_id'])
+
+    return rows_response(response, page, GetAllSocialGroups)
 
 
 @router.get("/my_social_groups", response_model=List[GetAllSocialGroups],)
-def get_users_social_groups(
-    db: Session = Depends(get_db),
+async def get_users_social_groups(
+    response: Response,
+    db: Session = Depends(get_async_db),
     limit: Optional[int] = None,
     skip: Optional[int] = None,
     search: Optional[str] = "",
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(None),
     credentials_user: int = Depends(get_current_user),
     ):
     """Get the social groups that user is member of."""
 
-    db_session = DBSessionSocialGroups(db,)
-    users_groups = db_session.fetch_social_group_members(user_id=3)
+    db_session = AsyncDBSessionSocialGroups(db,)
+
+    if wants_ndjson(accept):
+        rows = await db_session.fetch_social_group_members(
+            user_id=3,
+            limit=stream_limit(limit),
+            skip=skip,
+            search=search,
+            cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
+            stream=True,
+            )
+        return ndjson_response(rows, GetAllSocialGroups)
+
+    page_size = get_page_size(limit)
+
+    users_groups = await db_session.fetch_social_group_members(
+        user_id=3,
+        limit=page_size + 1,
+        skip=skip,
+        search=search,
+        cursor=check_cursor(lambda: decode_cursor(cursor, CREATED_AT_CURSOR)),
+        )
     # all_resources = db_session.all_social_groups(
     #     filter_columns={'user_id': credentials_user.user_id}
     # )
 
     check_object_availability(users_groups, 'No social groups were found.', 404)
     
-    return users_groups
+    page = paginate(response, users_groups, page_size, ['created_at', 'group_id'])
+
+    return rows_response(response, page, GetAllSocialGroups)
 
 
 @router.get("/{group_id}", response_model=GetSocialGroup,)
-def get_social_group(
+async def get_social_group(
     group_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     ):
 
     # Get group.
-    db_session_group = DBSessionSocialGroups(db,)
+    db_session_group = AsyncDBSessionSocialGroups(db,)
     
-    resource_group = db_session_group.fetch_resource({'group_id': group_id}, False)
+    resource_group = await db_session_group.fetch_resource({'group_id': group_id}, False)
 
     check_object_availability(resource_group, f'Group with ID {group_id} not found.', 404)
 
     # Get number of members.
-    resource_group.members = db_session_group.count_members_by_social_group(group_id=group_id)
+    resource_group.members = await db_session_group.count_members_by_social_group(group_id=group_id)
     
     # Get admin name.
-    db_session_users = DBSessionUsers(db,)
+    db_session_users = AsyncDBSessionUsers(db,)
     
-    resource_user = db_session_users.fetch_resource({'user_id': resource_group.admin_id}, False)
+    resource_user = await db_session_users.fetch_resource({'user_id': resource_group.admin_id}, False)
     
     full_resource = {
         'group_id': resource_group.group_id, 
@@ -105,9 +157,9 @@ def get_social_group(
     status_code=status.HTTP_201_CREATED,
     response_model=PostCreateSocialGroup,
     )
-def post_social_group(
+async def post_social_group(
     resource: PostCreateSocialGroup,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
@@ -120,20 +172,20 @@ def post_social_group(
     post_dump['admin_id'] = user_id
 
     
-    db_session_group = DBSessionSocialGroups(db,)
+    db_session_group = AsyncDBSessionSocialGroups(db,)
 
     # Check group.
-    resource_group = db_session_group.fetch_resource({'title': group_title}, False)
+    group_exists = await db_session_group.resource_exists({'title': group_title})
 
-    check_resource_availability(resource_group, f'Social Group {group_title} already exists.', conflict=True)
+    check_resource_availability(group_exists, f'Social Group {group_title} already exists.', conflict=True)
     
     # Add group.
-    check_add_resource(lambda: db_session_group.add_resource(post_dump), 404) 
-    
-    current_resource = db_session_group.fetch_last_created
+    current_resource = await check_add_resource_async(lambda: db_session_group.add_resource(post_dump), 404) 
+
+    check_object_availability(current_resource, f'Social Group {group_title} could not be created.', 404)
     
     # Add admin to group members.
-    db_session_members = DBSession(db, GroupMembers)
+    db_session_members = AsyncDBSession(db, GroupMembers)
 
     group_members_entry = {
         'user_id': user_id,
@@ -141,7 +193,7 @@ def post_social_group(
         'admin': True,
     }
 
-    check_add_resource(lambda: db_session_members.add_resource(group_members_entry), 404) 
+    await check_add_resource_async(lambda: db_session_members.add_resource(group_members_entry), 404) 
 
     
     return Response(
@@ -155,30 +207,30 @@ def post_social_group(
     status_code=status.HTTP_200_OK,
     response_model=PostCreateSocialGroup,
     )
-def post_create_social_group(
+async def post_create_social_group(
     group_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
     user_id = credentials_user.user_id
 
     # Check group.
-    db_session_group = DBSessionSocialGroups(db,)
+    db_session_group = AsyncDBSessionSocialGroups(db,)
     
-    resource_group = db_session_group.fetch_resource({'group_id': group_id}, False)
+    group_exists = await db_session_group.resource_exists({'group_id': group_id})
 
-    check_object_availability(resource_group, f'Social group with ID {group_id} was not found.', 404)
+    check_object_availability(group_exists, f'Social group with ID {group_id} was not found.', 404)
 
     # Add admin to group members.
-    db_session_members = DBSession(db, GroupMembers)
+    db_session_members = AsyncDBSession(db, GroupMembers)
 
     group_members_entry = {
         'user_id': user_id,
         'group_id': group_id,
     }
 
-    check_add_resource(lambda: db_session_members.add_resource(group_members_entry), 404) 
+    await check_add_resource_async(lambda: db_session_members.add_resource(group_members_entry), 404) 
 
     
     return Response(
@@ -189,23 +241,22 @@ def post_create_social_group(
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_social_group(
+async def delete_social_group(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionSocialGroups(db,)
+    db_session = AsyncDBSessionSocialGroups(db,)
 
-    admin_id = db_session.fetch_value_by_unique_value('group_id', 'admin_id', id)
+    admin_id = await db_session.fetch_value_by_unique_value('group_id', 'admin_id', id)
 
     check_user_id_authorization(admin_id, credentials_user.user_id)
 
-    check_uniqueness(
-        False, db_session.unique_values('group_id'), id, f'Social group with ID {id} was not found.',
-        )
+    # The admin lookup doubles as the existence check.
+    check_uniqueness(False, admin_id is not None, f'Social group with ID {id} was not found.',)
     
-    check_delete_resource(
+    await check_delete_resource_async(
         lambda: db_session.delete_resource({'group_id': id}),
         f'Social group with ID {id} was not found.',
         )
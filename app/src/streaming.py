@@ -0,0 +1,52 @@
+from itertools import islice
+from typing import AsyncIterator, Iterator, Optional, Type
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.database.db_setup import run_in_db_executor
+from src.env_models import settings
+from src.serialization import row_serializer
+
+# Media type of the streamed listings: one JSON object per line.
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether the `Accept` header asks for the streamed (NDJSON) version of a listing."""
+    if not accept:
+        return False
+    return any(media_range.split(';')[0].strip().lower() == NDJSON_MEDIA_TYPE for media_range in accept.split(','))
+
+
+async def ndjson_lines(rows: Iterator[dict], model: Type[BaseModel]) -> AsyncIterator[bytes]:
+    """`rows` shaped like `model` (see `row_serializer`), one JSON line per row. The rows are
+    pulled `STREAM_CHUNK_SIZE` at a time on the database executor, so the event loop never
+    waits on the cursor and only one chunk is held in memory.
+    """
+    serialize = row_serializer(model)
+    try:
+        while True:
+            chunk = await run_in_db_executor(lambda: list(islice(rows, settings.stream_chunk_size)))
+            if not chunk:
+                return
+            yield b''.join(orjson.dumps(serialize(row)) + b'\n' for row in chunk)
+    finally:
+        # Client gone before the end: release the cursor (and its connection) right away.
+        close = getattr(rows, 'close', None)
+        if close is not None:
+            await run_in_db_executor(close)
+
+
+def ndjson_response(rows: Iterator[dict], model: Type[BaseModel]) -> StreamingResponse:
+    return StreamingResponse(ndjson_lines(rows, model), media_type=NDJSON_MEDIA_TYPE)
+
+
+def stream_limit(limit: Optional[int]) -> int:
+    """Clamp the rows of a streamed listing to `STREAM_MAX_ROWS` (instead of `MAX_PAGE_SIZE`),
+    also their default: a stream holds a pool connection until the client has read it.
+    """
+    if not limit or limit <= 0:
+        return settings.stream_max_rows
+    return min(limit, settings.stream_max_rows)
@@ -7,30 +7,33 @@ from fastapi import (
     status,
     Depends
     )
-from src.utils import capitalize_names, hash_pw
+from src.utils import capitalize_names
+from src.password_hashing import password_hasher
 from src.users.models_users import PostUser, GetUser, PatchUser
-from src.database.db_setup import get_db
-from src.database.db_models import Session, DBSessionUsers
+from src.database.db_setup import get_async_db
+from src.database.db_models import Session, AsyncDBSessionUsers
 from src.oauth2 import get_current_user
 from src.database.http_exceptions import (
     check_user_id_authorization,
     check_object_availability,
-    check_add_resource,
+    check_add_resource_async,
     check_partial_fields,
-    check_delete_resource,
+    check_delete_resource_async,
+    check_password_hashing_async,
     )
+from src.auth.token_cache import token_cache
 
 router = APIRouter()
 
 @router.get("/id/{id}", response_model=GetUser)
-def get_user_by_id(
-    id: int, db: Session = Depends(get_db),
+async def get_user_by_id(
+    id: int, db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
     
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
     
-    user_info = db_session.fetch_user_info('user_id', credentials_user.user_id,)
+    user_info = await db_session.fetch_user_info('user_id', credentials_user.user_id,)
     
     check_object_availability(user_info, f'The user {id} was not found.', 404)
 
@@ -38,17 +41,17 @@ def get_user_by_id(
 
 
 @router.get("/name/{name}", response_model=GetUser)
-def get_user_by_name(
+async def get_user_by_name(
     name: str = Path(...), min_length=2, max_length=50,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
     
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     name = capitalize_names(name)
 
-    user_info = db_session.fetch_user_info('name', name,)
+    user_info = await db_session.fetch_user_info('name', name,)
    
     check_object_availability(user_info, f'The user {name} was not found.', 404)
 
@@ -59,44 +62,50 @@ def get_user_by_name(
     status_code=status.HTTP_201_CREATED,
     response_model=GetUser,
     )
-def post_user(
+async def post_user(
     resource: PostUser,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     ):
 
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     resource_dump = resource.model_dump()
 
-    resource_dump['password'] = hash_pw(resource_dump['password'])
+    resource_dump['password'] = await check_password_hashing_async(
+        lambda: password_hasher.hash_password(resource_dump['password'])
+        )
 
-    check_add_resource(lambda: db_session.add_resource(resource_dump), 400)
+    resource = await check_add_resource_async(lambda: db_session.add_resource(resource_dump), 400)
 
-    resource = db_session.fetch_last_created
+    resource.posts = 0 # a new user has no posts yet.
 
     return resource
 
 
 @router.put("/id/{id}")
-def put_user(
+async def put_user(
     id: int,
     resource: PostUser,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     check_user_id_authorization(id, credentials_user.user_id)
 
     resource_dump = resource.model_dump()
 
-    resource_dump['password'] = hash_pw(resource_dump['password'])
+    resource_dump['password'] = await check_password_hashing_async(
+        lambda: password_hasher.hash_password(resource_dump['password'])
+        )
 
-    check_add_resource(
+    await check_add_resource_async(
         lambda: db_session.update_resource('user_id', id, resource_dump),
         500,
         )
+
+    token_cache.invalidate_user(id)
     
     return Response(
             status_code=status.HTTP_200_OK,
@@ -105,14 +114,14 @@ def put_user(
 
 
 @router.patch("/id/{id}")
-def patch_user(
+async def patch_user(
     id: int,
     resource: PatchUser,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     check_user_id_authorization(id, credentials_user.user_id)
 
@@ -124,12 +133,16 @@ def patch_user(
     check_partial_fields(input_fields, required_fields)
 
     if 'password' in partial_resource_dump:
-        partial_resource_dump['password'] = hash_pw(partial_resource_dump['password'])
+        partial_resource_dump['password'] = await check_password_hashing_async(
+            lambda: password_hasher.hash_password(partial_resource_dump['password'])
+            )
 
-    check_add_resource(
+    await check_add_resource_async(
         lambda: db_session.update_resource('user_id', id, partial_resource_dump),
         500,
         )
+
+    token_cache.invalidate_user(id)
     
     return Response(
             status_code=status.HTTP_200_OK,
@@ -138,20 +151,22 @@ def patch_user(
 
 
 @router.delete("/id/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_by_id(
+async def delete_user_by_id(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     check_user_id_authorization(id, credentials_user.user_id)
     
-    check_delete_resource(
+    await check_delete_resource_async(
         lambda: db_session.delete_resource({'user_id': id}),
         f'User with ID {id} was not found.',
         )
+
+    token_cache.invalidate_user(id)
     
     return Response(
         status_code=status.HTTP_204_NO_CONTENT,
@@ -159,25 +174,27 @@ def delete_user_by_id(
 
 
 @router.delete("/name/{name}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user_by_name(
+async def delete_user_by_name(
     name: str = Path(...), min_length=2, max_length=50,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
 
-    db_session = DBSessionUsers(db)
+    db_session = AsyncDBSessionUsers(db)
 
     name = capitalize_names(name)
 
-    user_id = db_session.fetch_value_by_unique_value('name', 'user_id', name)
+    user_id = await db_session.fetch_value_by_unique_value('name', 'user_id', name)
 
     check_user_id_authorization(user_id, credentials_user.user_id)
 
-    check_delete_resource(
+    await check_delete_resource_async(
         lambda: db_session.delete_resource({'name': name}),
         f'User {name} was not found.',
         )
 
+    token_cache.invalidate_user(user_id)
+
     return Response(
         status_code=status.HTTP_204_NO_CONTENT,
         )
\ No newline at end of file
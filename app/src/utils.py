@@ -1,11 +1,15 @@
 import os
 import sys
 import re
+from typing import Optional, Tuple
 from passlib.hash import bcrypt
 from passlib.context import CryptContext
 
-# Defining the hashing algorithm for the passwords.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated='auto',)
+from src.env_models import settings
+
+# Defining the hashing algorithm for the passwords; hashes made with another cost than
+# `BCRYPT_ROUNDS` are flagged for update (see `verify_and_update_pw`).
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated='auto', bcrypt__rounds=settings.bcrypt_rounds,)
 
 def hash_pw(password: str):
     return pwd_context.hash(password)
@@ -14,6 +18,12 @@ def validate_pw(user_input_password, stored_hashed_password):
     validation = bcrypt.verify(user_input_password, stored_hashed_password)
     return validation
 
+def verify_and_update_pw(user_input_password: str, stored_hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Whether the password matches the hash and, if the hash was made with another cost, the
+    password hashed again with `BCRYPT_ROUNDS`.
+    """
+    return pwd_context.verify_and_update(user_input_password, stored_hashed_password)
+
 def capitalize_names(input_string):
     input_string = re.sub('_', ' ', input_string)
     words = input_string.split()
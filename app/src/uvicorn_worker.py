@@ -0,0 +1,17 @@
+# Gunicorn worker class of the production server (see 'src/server.py'); only imported by
+# gunicorn, which `uvicorn.workers` requires.
+from uvicorn.workers import UvicornWorker as BaseUvicornWorker
+
+from src.env_models import settings
+
+
+class UvicornWorker(BaseUvicornWorker):
+    """`UvicornWorker` (uvloop and httptools when installed) that, on SIGTERM, stops accepting
+    connections and gives the open requests `SERVER_GRACEFUL_TIMEOUT` seconds to finish before
+    the app shuts down (writing its pending background writes).
+    """
+
+    CONFIG_KWARGS = {
+        **BaseUvicornWorker.CONFIG_KWARGS,
+        'timeout_graceful_shutdown': settings.server_graceful_timeout,
+        }
@@ -7,41 +7,50 @@ from fastapi import (
     status
     )
 from src.votes.models_votes import PostVote
-from src.database.db_setup import SessionLocal, get_db
+from src.database.db_setup import SessionLocal, get_async_db
 from src.database.db_models import (
     Session,
-    DBSession,
-    Votes,
+    AsyncDBSessionVotes,
+    AsyncDBSessionPosts,
     )
 from src.oauth2 import get_current_user
 from src.database.http_exceptions import (
-    check_add_resource,
+    check_add_resource_async,
     check_resource_availability,
-    check_delete_resource,
+    check_bulk_size,
     )
+from src.models_bulk import BulkItemResult, BulkResult, bulk_result, insert_results
+from src.env_models import settings
 
 router = APIRouter()
 
 @router.post('/',)
-def post_vote(
+async def post_vote(
     vote: PostVote,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_async_db),
     credentials_user: int = Depends(get_current_user),
     ):
+    """Upvote (`vote` 1) or remove the upvote (`vote` 0) of a post, in a single statement: the
+    rows it affects tell whether the vote was done.
+    """
 
-    db_session = DBSession(db, Votes)
+    db_session = AsyncDBSessionVotes(db)
 
-    new_resource = {'post_id': vote.post_id, 'user_id': credentials_user.user_id}
-
-    current_resource = db_session.fetch_resource(new_resource, convert_to_dict=True,)
+    user_id = credentials_user.user_id
 
     if vote.vote == 1:
-        check_resource_availability(
-            current_resource,
-            f'User {credentials_user.user_id} already voted on post {vote.post_id}.',
-            conflict=True
-            )
-        check_add_resource(lambda: db_session.add_resource(new_resource), 404)    
+        inserted = await check_add_resource_async(lambda: db_session.add_vote(vote.post_id, user_id), 500)
+
+        if not inserted:
+            # Nothing inserted: either the post is missing or the vote exists.
+            post_exists = await AsyncDBSessionPosts(db).resource_exists({'post_id': vote.post_id})
+
+            check_resource_availability(post_exists, f'Post {vote.post_id} not found.',)
+            check_resource_availability(
+                True,
+                f'User {user_id} already voted on post {vote.post_id}.',
+                conflict=True
+                )
     
         return Response(
             status_code=status.HTTP_202_ACCEPTED,
@@ -50,14 +59,64 @@ def post_vote(
 
 
     if vote.vote == 0:
-        check_resource_availability(
-            current_resource,
-            f'Post {vote.post_id} not found.',
-            )
-        
-        check_delete_resource(lambda: db_session.delete_resource(new_resource), id)
+        deleted = await check_add_resource_async(lambda: db_session.remove_vote(vote.post_id, user_id), 500)
+
+        check_resource_availability(deleted, f'Post {vote.post_id} not found.',)
     
         return Response(
             status_code=status.HTTP_202_ACCEPTED,
             content='Upvote removed.'
-            )
\ No newline at end of file
+            )
+
+
+@router.post('/bulk', response_model=BulkResult,)
+async def post_votes_bulk(
+    votes: List[PostVote],
+    db: Session = Depends(get_async_db),
+    credentials_user: int = Depends(get_current_user),
+    ):
+    """Upvotes (`vote` 1) and vote removals (`vote` 0) of the logged in user on several posts:
+    the current votes are read in one query, upvotes are inserted in batches and removals run
+    as one DELETE.
+    """
+
+    check_bulk_size(votes, settings.bulk_max_items)
+
+    db_session = AsyncDBSessionVotes(db)
+
+    user_id = credentials_user.user_id
+
+    voted_posts = await db_session.existing_values(
+        'post_id', list({vote.post_id for vote in votes}), {'user_id': user_id},
+        )
+
+    results = []
+    upvote_dumps, upvote_indexes, removed_posts = [], [], []
+    seen_posts = set()
+
+    for index, vote in enumerate(votes):
+        if vote.post_id in seen_posts:
+            results.append(BulkItemResult(index=index, status='failed', detail=f'Post {vote.post_id} appears more than once.'))
+        elif vote.vote == 1 and vote.post_id in voted_posts:
+            results.append(BulkItemResult(index=index, status='failed', detail=f'User {user_id} already voted on post {vote.post_id}.'))
+        elif vote.vote == 0 and vote.post_id not in voted_posts:
+            results.append(BulkItemResult(index=index, status='failed', detail=f'Post {vote.post_id} not found.'))
+        elif vote.vote == 1:
+            upvote_dumps.append({'post_id': vote.post_id, 'user_id': user_id})
+            upvote_indexes.append(index)
+        else:
+            removed_posts.append(vote.post_id)
+            results.append(BulkItemResult(index=index, status='removed'))
+        seen_posts.add(vote.post_id)
+
+    if upvote_dumps:
+        errors = await check_add_resource_async(lambda: db_session.add_resources(upvote_dumps), 500)
+        results = results + insert_results(errors, upvote_indexes)
+
+    if removed_posts:
+        await check_add_resource_async(
+            lambda: db_session.delete_resources('post_id', removed_posts, {'user_id': user_id}),
+            500,
+            )
+
+    return bulk_result(sorted(results, key=lambda result: result.index))
@@ -0,0 +1,107 @@
+# Startup warmup of a worker process, run by the lifespan in 'main.py' before the worker takes
+# requests: opens the pool connections, runs the hot queries once (mapper configuration, SQL
+# compilation, first round trips), builds the listing serializers and the OpenAPI document.
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi import FastAPI
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from src.database.db_setup import SessionLocal, engine, replica_engines
+from src.database.db_models import (
+    DBSessionPosts,
+    DBSessionUsers,
+    DBSessionSocialGroups,
+    DBSessionGroupMembers,
+    )
+from src.posts.models_posts import GetAllPosts
+from src.social_groups.models_social_groups import GetAllSocialGroups
+from src.group_members.models_group_members import GetGroupMemberShort_1, GetGroupMemberShort_2
+from src.serialization import row_serializer
+from src.env_models import settings
+
+# The queries behind the busiest routes, with values matching no row.
+HOT_QUERIES: List[Tuple[str, Callable[[Session], Any]]] = [
+    ('posts listing', lambda db: DBSessionPosts(db).all_posts(limit=1)),
+    ('posts search', lambda db: DBSessionPosts(db).all_posts(limit=1, search='warmup')),
+    ('posts full-text search', lambda db: DBSessionPosts(db).search_posts('warmup', limit=1)),
+    ('post', lambda db: DBSessionPosts(db).fetch_resource({'post_id': 0}, False, ['user_info'])),
+    ('social groups listing', lambda db: DBSessionSocialGroups(db).all_social_groups(limit=1)),
+    ('group members', lambda db: DBSessionGroupMembers(db).get_all_members_by_group('group_id', 0, limit=1)),
+    (
+        'memberships listing',
+        lambda db: DBSessionGroupMembers(db).all_resources(
+            search_column='group_id', limit=1, columns=list(GetGroupMemberShort_1.model_fields),
+            ),
+        ),
+    ('user by email', lambda db: DBSessionUsers(db).fetch_resource({'email': ''})),
+    ]
+
+LISTING_MODELS = [GetAllPosts, GetAllSocialGroups, GetGroupMemberShort_1, GetGroupMemberShort_2]
+
+# Outcome of the last warmup of this worker process (see `GET /metrics/warmup`).
+warmup_report: Dict[str, Any] = {}
+
+
+def warm_pool(pool_engine, connections: int) -> int:
+    """Opens `connections` connections of the engine's pool at once (at most what the pool
+    keeps) and returns them to it; returns how many were opened.
+    """
+    if connections <= 0 or not isinstance(pool_engine.pool, QueuePool):
+        return 0
+
+    opened = []
+    try:
+        for _ in range(min(connections, pool_engine.pool.size())):
+            opened.append(pool_engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def run_hot_queries(session_local: Callable[[], Session] = SessionLocal,) -> List[str]:
+    """Runs every query of `HOT_QUERIES`; returns the names of those that failed (e.g. the
+    full-text search before its migration), which do not stop the warmup.
+    """
+    failed = []
+    db = session_local()
+    try:
+        for name, query in HOT_QUERIES:
+            try:
+                query(db)
+            except Exception:
+                failed.append(name)
+    finally:
+        db.close()
+    return failed
+
+
+def warm_up(app: FastAPI) -> Dict[str, Any]:
+    """Blocking: runs on the database executor."""
+    started = time.perf_counter()
+    report = {}
+
+    report['pool_connections'] = sum(
+        warm_pool(pool_engine, settings.warmup_pool_connections or settings.db_pool_size)
+        for pool_engine in [engine, *replica_engines]
+        )
+    report['pool_seconds'] = time.perf_counter() - started
+
+    stage_started = time.perf_counter()
+    report['failed_queries'] = run_hot_queries(SessionLocal)
+    report['queries'] = len(HOT_QUERIES) - len(report['failed_queries'])
+    report['queries_seconds'] = time.perf_counter() - stage_started
+
+    stage_started = time.perf_counter()
+    for model in LISTING_MODELS:
+        row_serializer(model)
+    app.openapi()
+    report['openapi_seconds'] = time.perf_counter() - stage_started
+
+    report['total_seconds'] = time.perf_counter() - started
+
+    warmup_report.clear()
+    warmup_report.update(report)
+    return report
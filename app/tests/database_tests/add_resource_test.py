@@ -0,0 +1,47 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Users, DBSession
+
+
+def test_add_resource_returns_persisted_row_in_one_statement(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    db = sessionmaker(autocommit=True, autoflush=False, expire_on_commit=False, bind=engine)()
+    new_user = DBSession(db, Users).add_resource(
+        {'name': 'New User', 'email': 'new_user@mymail.com', 'password': 'x'}
+        )
+    db.close()
+
+    assert new_user.user_id == 2
+    assert new_user.email == 'new_user@mymail.com'
+    assert new_user.created_at is not None
+    # No SELECT: the row, then the table versions.
+    assert [statement.split()[0] for statement in statements] == ['INSERT', 'UPDATE']
+    assert statements[1].startswith('UPDATE table_versions')
+
+
+def test_add_resources_rejects_only_failing_rows(engine):
+    db = sessionmaker(autocommit=True, autoflush=False, expire_on_commit=False, bind=engine)()
+    dumps = [
+        {'name': f'User {i}', 'email': f'user_{i}@mymail.com', 'password': f'x{i}'}
+        for i in range(5)
+        ]
+    dumps[3]['email'] = dumps[1]['email'] # unique constraint on 'users.email'.
+
+    errors = DBSession(db, Users).add_resources(dumps, chunk_size=2)
+
+    assert [error is None for error in errors] == [True, True, True, False, True]
+    assert db.query(Users).count() == 5 # with the test user.
+    db.close()
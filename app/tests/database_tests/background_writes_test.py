@@ -0,0 +1,91 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import asyncio
+
+from src.background_writes import BackgroundWriteQueue
+
+
+def write_queue(**options) -> BackgroundWriteQueue:
+    return BackgroundWriteQueue(**{
+        'batch_size': 100,
+        'batch_delay': 0.01,
+        'max_retries': 2,
+        'retry_delay': 0,
+        'max_pending': 100,
+        **options,
+        })
+
+
+def test_items_are_written_in_batches_and_flushed_on_stop():
+    queue = write_queue(batch_size=3)
+    batches = []
+    queue.register('last_login', batches.append)
+
+    async def submit_and_stop():
+        queue.start()
+        for user_id in range(5):
+            assert queue.submit('last_login', user_id)
+        # Still waiting for the batch to fill (`batch_delay`).
+        assert queue.snapshot()['depth'] == 5
+        await queue.stop()
+
+    asyncio.run(submit_and_stop())
+
+    assert batches == [[0, 1, 2], [3, 4]]
+    statistics = queue.snapshot()
+    assert statistics['depth'] == 0 and statistics['written'] == 5 and statistics['batches'] == 2
+
+
+def test_failed_batches_are_retried_then_handed_back():
+    queue = write_queue()
+    calls, handed_back = [], []
+
+    def flaky_write(items):
+        calls.append(items)
+        if len(calls) < 3:
+            raise ConnectionError('database gone')
+
+    queue.register('post_views', flaky_write)
+    queue.register('last_login', lambda items: 1 / 0, on_failure=handed_back.extend)
+
+    queue.submit('post_views', {1: 2})
+    queue.submit('last_login', 1)
+    asyncio.run(queue.stop())
+
+    assert calls == [[{1: 2}]] * 3
+    assert handed_back == [1]
+    statistics = queue.snapshot()
+    assert statistics['written'] == 1 and statistics['failed'] == 1 and statistics['retries'] == 4
+
+
+def test_failed_batches_are_logged(caplog):
+    queue = write_queue()
+    queue.register('last_login', lambda items: 1 / 0)
+
+    queue.submit('last_login', 1)
+    asyncio.run(queue.stop())
+
+    retries = [record for record in caplog.records if record.levelname == 'WARNING']
+    failures = [record for record in caplog.records if record.levelname == 'ERROR']
+    assert len(retries) == 2
+    assert len(failures) == 1
+    assert failures[0].name == 'src.background_writes'
+    assert 'last_login' in failures[0].getMessage() and 'dropped' in failures[0].getMessage()
+    assert failures[0].exc_info[0] is ZeroDivisionError
+
+
+def test_full_queue_drops_new_items():
+    queue = write_queue(max_pending=1)
+    queue.register('last_login', lambda items: None)
+
+    assert queue.submit('last_login', 1)
+    assert not queue.submit('last_login', 2)
+    assert queue.snapshot()['dropped'] == 1
@@ -0,0 +1,128 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import gzip
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.compression import SUPPORTED_ENCODINGS, preferred_encoding
+from src.etags import encoded_etag, etag_matches
+from src.middleware import CacheResponses, ConditionalGet, CompressResponses
+from src.response_cache import ResponseCache
+
+LARGE_BODY = 'post title, author@mymail.com, 2023-01-01T00:00:00 ' * 100
+
+
+def compressed_app(cache: ResponseCache = None, etags: bool = False) -> TestClient:
+    app = FastAPI()
+
+    @app.get('/posts/')
+    def get_posts():
+        return Response(LARGE_BODY, media_type='text/plain')
+
+    @app.get('/small')
+    def get_small():
+        return Response('small', media_type='text/plain')
+
+    @app.get('/encoded')
+    def get_encoded():
+        return Response(gzip.compress(LARGE_BODY.encode()), headers={'Content-Encoding': 'gzip'})
+
+    @app.get('/stream')
+    def get_stream():
+        return StreamingResponse(iter([LARGE_BODY.encode(), b'end']), media_type='text/plain')
+
+    if cache is not None:
+        app.add_middleware(CacheResponses, cache=cache)
+    if etags:
+        app.add_middleware(ConditionalGet)
+    app.add_middleware(CompressResponses)
+    return TestClient(app)
+
+
+def test_preferred_encoding():
+    assert preferred_encoding('gzip, deflate') == 'gzip'
+    assert preferred_encoding('deflate') is None
+    assert preferred_encoding('gzip;q=0') is None
+    assert preferred_encoding('*') == SUPPORTED_ENCODINGS[0]
+    assert preferred_encoding('br;q=0.5, gzip') == 'gzip'
+
+
+def test_only_large_unencoded_bodies_are_compressed():
+    client = compressed_app()
+    gzip_only = {'Accept-Encoding': 'gzip'}
+
+    response = client.get('/posts/', headers=gzip_only)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.headers['vary'] == 'Accept-Encoding'
+    assert int(response.headers['content-length']) < len(LARGE_BODY) / 10
+    assert response.text == LARGE_BODY
+
+    assert 'content-encoding' not in client.get('/small', headers=gzip_only).headers
+    assert 'content-encoding' not in client.get('/posts/', headers={'Accept-Encoding': 'identity'}).headers
+
+    # Compressed by the route: not compressed again.
+    response = client.get('/encoded', headers=gzip_only)
+    assert response.text == LARGE_BODY
+
+    response = client.get('/stream', headers=gzip_only)
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert response.text == LARGE_BODY + 'end'
+
+
+def test_cache_hits_keep_their_compressed_body():
+    cache = ResponseCache(max_bytes=1024 * 1024, ttl=60)
+    client = compressed_app(cache)
+    gzip_only = {'Accept-Encoding': 'gzip'}
+
+    assert client.get('/posts/', headers=gzip_only).headers['x-cache'] == 'MISS'
+    entry = cache.entries['/posts/?']
+    assert entry.body == LARGE_BODY.encode() and entry.encoded_bodies == {}
+
+    response = client.get('/posts/', headers=gzip_only)
+    assert response.headers['x-cache'] == 'HIT'
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.text == LARGE_BODY
+    compressed = entry.encoded_bodies['gzip']
+    assert cache.size == entry.size
+
+    # The next hits reuse it.
+    client.get('/posts/', headers=gzip_only)
+    assert entry.encoded_bodies['gzip'] is compressed
+
+    response = client.get('/posts/', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in response.headers
+    assert response.text == LARGE_BODY
+
+
+def test_compressed_responses_have_their_own_etag():
+    assert encoded_etag('"1a2b"', 'gzip') == '"1a2b-gzip"'
+    assert encoded_etag('W/"1a2b"', 'br') == 'W/"1a2b-br"'
+    assert etag_matches('"1a2b-gzip"', '"1a2b"') == '"1a2b-gzip"'
+    assert not etag_matches('"1a2b-deflate"', '"1a2b"')
+
+    client = compressed_app(ResponseCache(max_bytes=1024 * 1024, ttl=60), etags=True)
+    gzip_only = {'Accept-Encoding': 'gzip'}
+
+    # Compressed by `CompressResponses` (miss), then by the cache (hit).
+    miss = client.get('/posts/', headers=gzip_only)
+    hit = client.get('/posts/', headers=gzip_only)
+    identity = client.get('/posts/', headers={'Accept-Encoding': 'identity'})
+    assert [response.headers['x-cache'] for response in [miss, hit, identity]] == ['MISS', 'HIT', 'HIT']
+    etag = identity.headers['etag']
+    for response in [miss, hit]:
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['etag'] == encoded_etag(etag, 'gzip')
+
+    response = client.get('/posts/', headers={**gzip_only, 'If-None-Match': encoded_etag(etag, 'gzip')})
+    assert response.status_code == 304 and response.headers['etag'] == encoded_etag(etag, 'gzip')
@@ -0,0 +1,62 @@
+import os
+import sys
+import re
+import tempfile
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+# Without the project '.env' file (e.g. in CI) run on a temporary SQLite database.
+if os.getenv('PROJECTS_CONFIG') is None:
+    for variable, value in [
+        ('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'app.db')}"),
+        ('AUTH_SECRET_KEY', 'test'),
+        ('AUTH_ALGORITHM', 'HS256'),
+        ('AUTH_ACCESS_TOKEN_EXPIRE_MINUTES', '30'),
+        ]:
+        os.environ.setdefault(variable, value)
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_setup import engine as app_engine
+from src.database.db_models import Base, Users
+
+TEST_USER = {'user_id': 1, 'name': 'Test User', 'email': 'test_user@mymail.com', 'password': 'x'}
+
+
+@pytest.fixture(scope='session', autouse=True)
+def app_database():
+    """Tables of the application's own database (e.g. the table versions read by the
+    middlewares), when it is the temporary SQLite one.
+    """
+    if app_engine.url.drivername == 'sqlite':
+        Base.metadata.create_all(app_engine)
+
+
+@pytest.fixture
+def create_database(tmp_path):
+    """Creates SQLite databases in `tmp_path` with every table and `TEST_USER`."""
+
+    def create(name: str = 'test.db', **engine_options):
+        engine = create_engine(f'sqlite:///{tmp_path / name}', **engine_options)
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Users.__table__.insert(), TEST_USER)
+        return engine
+
+    return create
+
+
+@pytest.fixture
+def engine(create_database):
+    return create_database(connect_args={'check_same_thread': False})
+
+
+@pytest.fixture
+def session_local(engine):
+    return sessionmaker(autocommit=True, autoflush=False, bind=engine)
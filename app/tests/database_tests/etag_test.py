@@ -0,0 +1,74 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.database.db_models import Users, Posts, DBSession, DBSessionVotes
+from src.database.table_versions import TableVersions
+from src.etags import route_etag, etag_matches
+from src.middleware import ConditionalGet
+
+
+def test_writes_bump_the_table_versions(engine, session_local):
+    db = session_local()
+    table_versions = TableVersions(engine)
+    versions = table_versions.get(['users', 'posts', 'votes'])
+
+    DBSession(db, Users).add_resource({'user_id': 2, 'name': 'New User', 'email': 'new_user@mymail.com', 'password': 'x'})
+    DBSession(db, Posts).add_resource({'post_id': 1, 'user_id': 1, 'title': 'post', 'view_count': 0})
+    DBSessionVotes(db).add_vote(1, 1)
+    DBSession(db, Posts).update_resource('post_id', 1, {'title': 'edited'})
+    DBSession(db, Posts).delete_resource({'post_id': 1})
+
+    users, posts, votes = (new - old for new, old in zip(table_versions.get(['users', 'posts', 'votes']), versions))
+    assert (users, posts, votes) == (1, 4, 1)
+
+
+def test_etags():
+    etag = route_etag('/posts/', b'limit=5&skip=0', [1, 2], now=0)
+
+    assert etag == route_etag('/posts/', b'skip=0&limit=5', [1, 2], now=1)
+    assert etag != route_etag('/posts/', b'limit=6', [1, 2], now=0)
+    assert etag != route_etag('/posts/', b'limit=5&skip=0', [1, 3], now=0)
+    # Expires with the window (`ETAG_WINDOW`).
+    assert etag != route_etag('/posts/', b'limit=5&skip=0', [1, 2], now=3600)
+
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_etags_are_shared_by_the_worker_processes(engine, session_local):
+    calls = []
+
+    def worker() -> TestClient:
+        # Each process has its own middlewares, over the same database.
+        app = FastAPI()
+        app.add_middleware(ConditionalGet, versions=TableVersions(engine))
+
+        @app.get('/posts/')
+        def get_posts():
+            calls.append(1)
+            return []
+
+        return TestClient(app)
+
+    first_worker, second_worker = worker(), worker()
+
+    etag = first_worker.get('/posts/').headers['etag']
+
+    response = second_worker.get('/posts/', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.headers['etag'] == etag
+    assert len(calls) == 1
+
+    # A write handled by the first process.
+    DBSession(session_local(), Posts).add_resource({'post_id': 1, 'user_id': 1, 'title': 'post', 'view_count': 0})
+    assert second_worker.get('/posts/', headers={'If-None-Match': etag}).status_code == 200
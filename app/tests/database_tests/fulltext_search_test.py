@@ -0,0 +1,54 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Posts, DBSessionPosts
+
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {'post_id': 1, 'user_id': 1, 'title': 'Gradient boosting on tabular data', 'view_count': 0},
+                {'post_id': 2, 'user_id': 1, 'title': 'Boosting, boosting and more boosting', 'view_count': 0},
+                {'post_id': 3, 'user_id': 1, 'title': 'Neural networks', 'view_count': 0},
+            ],
+            )
+    session = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+def test_fulltext_search_ranks_by_relevance(db):
+    posts = DBSessionPosts(db).all_posts(search='boosting', search_mode='fulltext')
+
+    assert [post['post_id'] for post in posts] == [2, 1]
+    assert posts[0]['relevance'] > posts[1]['relevance']
+
+
+def test_fulltext_search_matches_words_not_substrings(db):
+    db_session = DBSessionPosts(db)
+
+    assert db_session.all_posts(search='boost', search_mode='fulltext') == []
+    assert len(db_session.all_posts(search='boost')) == 2 # substring fallback.
+
+
+def test_fulltext_index_follows_writes(db):
+    db_session = DBSessionPosts(db)
+
+    db_session.update_resource('post_id', 3, {'title': 'Boosting neural networks'})
+    db_session.delete_resource({'post_id': 2})
+
+    posts = db_session.all_posts(search='boosting "quoted -syntax:', search_mode='fulltext')
+    assert sorted(post['post_id'] for post in posts) == [1, 3]
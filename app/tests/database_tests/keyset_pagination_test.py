@@ -0,0 +1,107 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Posts, DBSessionPosts
+from src.database.db_setup import get_async_routed_db
+from src.pagination import (
+    NEXT_CURSOR_HEADER,
+    CREATED_AT_CURSOR,
+    RELEVANCE_CURSOR,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    )
+from main import my_rest_api
+
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as connection:
+        # Posts 1-10 share their creation time two by two, so the order relies on `post_id`.
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {
+                    'post_id': i,
+                    'user_id': 1,
+                    'title': f'post {i}',
+                    'view_count': 0,
+                    'created_at': datetime(2023, 1, 1) + timedelta(minutes=(i + 1) // 2),
+                    }
+                for i in range(1, 11)
+            ],
+            )
+    session = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+def test_cursor_pages_cover_all_posts_once(db):
+    db_session = DBSessionPosts(db)
+    post_ids, cursor = [], None
+
+    while True:
+        response = Response()
+        rows = db_session.all_posts(limit=4, cursor=decode_cursor(cursor, CREATED_AT_CURSOR))
+        page = paginate(response, rows, 3, ['created_at', 'post_id'])
+        post_ids += [post['post_id'] for post in page]
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert post_ids == list(range(10, 0, -1))
+
+
+def test_invalid_cursor():
+    for cursor in ['not a cursor', encode_cursor([1])]:
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, CREATED_AT_CURSOR)
+
+
+def test_tampered_cursor():
+    created_at = datetime(2023, 1, 1).isoformat()
+    tampered = [['notadate', 1], [created_at, '1'], [created_at, True], [None, 1], [1, 1]]
+    for values in tampered:
+        with pytest.raises(ValueError, match='Invalid cursor.'):
+            decode_cursor(encode_cursor(values), CREATED_AT_CURSOR)
+
+    with pytest.raises(ValueError, match='Invalid cursor.'):
+        decode_cursor(encode_cursor(['high', 1]), RELEVANCE_CURSOR)
+
+    assert decode_cursor(encode_cursor([created_at, 1]), CREATED_AT_CURSOR) == [datetime(2023, 1, 1), 1]
+    assert decode_cursor(encode_cursor([2, 1]), RELEVANCE_CURSOR) == [2.0, 1]
+
+
+def test_tampered_cursor_is_a_bad_request(db):
+    my_rest_api.dependency_overrides[get_async_routed_db] = lambda: db
+    try:
+        response = TestClient(my_rest_api).get('/posts/', params={'cursor': encode_cursor(['notadate', 1])})
+    finally:
+        my_rest_api.dependency_overrides.clear()
+
+    assert response.status_code == 400
+
+
+def test_lightweight_rows_match_orm_rows(db):
+    db_session = DBSessionPosts(db)
+    cursor = [datetime(2023, 1, 1, 0, 4).isoformat(), 8]
+
+    lightweight_rows = db_session.all_posts(limit=3, cursor=cursor, lightweight=True)
+    orm_rows = db_session.all_posts(limit=3, cursor=cursor, lightweight=False)
+
+    assert [post['post_id'] for post in lightweight_rows] == [7, 6, 5]
+    assert lightweight_rows == orm_rows
@@ -0,0 +1,53 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from src.database.http_exceptions import check_password_hashing_async
+from src.env_models import settings
+from src.password_hashing import PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hashes_are_verified_and_rehashed_with_the_current_cost(hasher):
+    hashed = asyncio.run(hasher.hash_password('secret'))
+    assert hashed.startswith(f'$2b${settings.bcrypt_rounds:02d}$')
+    assert asyncio.run(hasher.verify_password('secret', hashed)) == (True, None)
+    assert asyncio.run(hasher.verify_password('wrong', hashed)) == (False, None)
+
+    # Stored with another cost: the login gets the password hashed again.
+    old_hashed = CryptContext(schemes=['bcrypt'], bcrypt__rounds=4).hash('secret')
+    valid, new_hashed = asyncio.run(hasher.verify_password('secret', old_hashed))
+    assert valid and new_hashed.startswith(f'$2b${settings.bcrypt_rounds:02d}$')
+
+
+def test_saturated_pool_answers_503(hasher):
+    async def burst():
+        return await asyncio.gather(
+            hasher.hash_password('first'),
+            check_password_hashing_async(lambda: hasher.hash_password('second')),
+            return_exceptions=True,
+            )
+
+    first, second = asyncio.run(burst())
+
+    assert isinstance(first, str)
+    assert isinstance(second, HTTPException) and second.status_code == 503
+    assert hasher.pending == 0
@@ -0,0 +1,114 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.database.db_setup import run_in_db_executor
+from src.database.pool_stats import InstrumentedQueuePool, PoolStatistics, current_route
+from src.metrics import routes_metrics
+from main import my_rest_api
+
+LONG_HOLD_SECONDS = 0.05
+
+
+@pytest.fixture
+def engine(create_database):
+    engine = create_database(
+        connect_args={'check_same_thread': False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+        )
+    # Without the checkouts of the tables creation.
+    engine.pool.statistics = PoolStatistics(LONG_HOLD_SECONDS)
+    return engine
+
+
+def hold_connection(engine, seconds: float) -> None:
+    with engine.connect():
+        time.sleep(seconds)
+
+
+def test_statistics_summary():
+    statistics = PoolStatistics(long_hold_seconds=1)
+    for seconds in [0.01, 0.02, 0.03]:
+        statistics.record_wait(seconds)
+    statistics.record_wait(0.5, timed_out=True)
+    statistics.record_hold(0.5, 'GET /posts/')
+    statistics.record_hold(1.5, 'GET /users/{id}')
+
+    summary = statistics.snapshot()
+
+    assert summary['checkouts'] == 3
+    assert summary['checkout_timeouts'] == 1
+    assert summary['wait_ms_avg'] == pytest.approx(20)
+    assert summary['wait_ms_max'] == pytest.approx(30)
+    assert summary['hold_ms_avg'] == pytest.approx(1000)
+    assert summary['hold_ms_max'] == pytest.approx(1500)
+    assert summary['long_holds'] == [{'route': 'GET /users/{id}', 'hold_ms': pytest.approx(1500)}]
+
+
+def test_wait_hold_and_timed_out_checkouts_are_recorded(engine):
+    holder = threading.Thread(target=hold_connection, args=(engine, 0.08))
+    holder.start()
+    time.sleep(0.02)
+    # Waits for the only connection until the holder returns it.
+    hold_connection(engine, 0)
+    holder.join()
+
+    holder = threading.Thread(target=hold_connection, args=(engine, 0.3))
+    holder.start()
+    time.sleep(0.02)
+    with pytest.raises(PoolTimeoutError):
+        hold_connection(engine, 0)
+    holder.join()
+
+    summary = engine.pool.statistics.snapshot(engine.pool)
+    assert summary['checkouts'] == 3
+    assert summary['checkout_timeouts'] == 1
+    assert summary['wait_ms_max'] >= 30
+    assert summary['hold_ms_max'] >= 300
+    assert summary['checked_out'] == 0
+    assert [hold['route'] for hold in summary['long_holds']] == ['unknown', 'unknown']
+
+
+def test_long_holds_are_attributed_to_the_route(engine):
+    async def request(route: str, seconds: float):
+        current_route.set(route)
+        await run_in_db_executor(hold_connection, engine, seconds)
+
+    async def requests():
+        # One task per request, as under the ASGI server.
+        await asyncio.create_task(request('GET /posts/', LONG_HOLD_SECONDS * 2))
+        await asyncio.create_task(request('GET /social_groups/', 0))
+
+    asyncio.run(requests())
+
+    summary = engine.pool.statistics.snapshot()
+    assert [hold['route'] for hold in summary['long_holds']] == ['GET /posts/']
+
+
+def test_pool_statistics_endpoint(engine, monkeypatch):
+    hold_connection(engine, LONG_HOLD_SECONDS * 2)
+    monkeypatch.setattr(routes_metrics, 'engine', engine)
+
+    response = TestClient(my_rest_api).get('/metrics/db_pool')
+
+    assert response.status_code == 200
+    assert response.json()['pool_size'] == 1
+    assert response.json()['checkouts'] == 1
+    assert response.json()['long_holds'][0]['hold_ms'] >= LONG_HOLD_SECONDS * 2000
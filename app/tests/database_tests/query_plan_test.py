@@ -0,0 +1,87 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import (
+    Base,
+    Posts,
+    Votes,
+    SocialGroups,
+    GroupMembers,
+    DBSessionPosts,
+    DBSessionVotes,
+    DBSessionUsers,
+    DBSessionSocialGroups,
+    DBSessionGroupMembers,
+    )
+
+# The queries behind the most requested routes, none of which may read a whole table.
+HOT_QUERIES = {
+    'GET /posts/': lambda db: DBSessionPosts(db).all_posts(limit=10),
+    'GET /posts/ next page': lambda db: DBSessionPosts(db).all_posts(limit=10, cursor=['2023-01-01T00:00:00', 5]),
+    'GET /posts/my_posts': lambda db: DBSessionPosts(db).all_posts(limit=10, filter_columns={'user_id': 1}),
+    'GET /posts/{id}': lambda db: DBSessionPosts(db).fetch_resource({'post_id': 1}),
+    'fetch_last_created': lambda db: DBSessionPosts(db).fetch_last_created,
+    'POST /votes/ upvote': lambda db: DBSessionVotes(db).add_vote(1, 1),
+    'POST /votes/ removal': lambda db: DBSessionVotes(db).remove_vote(1, 1),
+    'POST /votes/bulk': lambda db: DBSessionVotes(db).existing_values('post_id', [1, 2], {'user_id': 1}),
+    'GET /users/name/{name}': lambda db: DBSessionUsers(db).fetch_user_info('name', 'Test User'),
+    'DELETE /users/name/{name}': lambda db: DBSessionUsers(db).fetch_value_by_unique_value('name', 'user_id', 'Test User'),
+    'GET /social_groups/': lambda db: DBSessionSocialGroups(db).all_social_groups(limit=10),
+    'GET /social_groups/my_social_groups': lambda db: DBSessionSocialGroups(db).fetch_social_group_members(1, limit=10),
+    'GET /social_groups/{group_id}': lambda db: DBSessionSocialGroups(db).count_members_by_social_group(1),
+    'POST /social_groups/create': lambda db: DBSessionSocialGroups(db).resource_exists({'title': 'group'}),
+    'GET /group_members/{group_id}': lambda db: DBSessionGroupMembers(db).get_all_members_by_group('group_id', 1, limit=10),
+    'DELETE /group_members/leave/{group_id}': lambda db: DBSessionGroupMembers(db).resource_exists({'group_id': 1, 'user_id': 1}),
+    }
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as connection:
+        connection.execute(Posts.__table__.insert(), {'post_id': 1, 'user_id': 1, 'title': 'post', 'view_count': 0})
+        connection.execute(Votes.__table__.insert(), {'post_id': 1, 'user_id': 1})
+        connection.execute(
+            SocialGroups.__table__.insert(), {'group_id': 1, 'admin_id': 1, 'title': 'group', 'details': 'details'},
+            )
+        connection.execute(GroupMembers.__table__.insert(), {'member_id': 1, 'group_id': 1, 'user_id': 1})
+    return engine
+
+
+def full_scans(plan: list) -> list:
+    """Plan steps reading a whole table: `SCAN <table>` without an index (`SCAN <table> USING
+    INDEX ...` walks an index in order, `SCAN` of a subquery or a constant row is not a table).
+    """
+    tables = set(Base.metadata.tables)
+    return [
+        step for step in plan
+        if step.startswith('SCAN ') and step.split()[1] in tables and ' USING ' not in step
+        ]
+
+
+@pytest.mark.parametrize('route', list(HOT_QUERIES))
+def test_hot_query_uses_indexes(engine, route):
+    db = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+
+    statements = []
+    listener = lambda connection, cursor, statement, parameters, *args: statements.append((statement, parameters))
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        HOT_QUERIES[route](db)
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+
+    assert statements
+    for statement, parameters in statements:
+        plan = [row[-1] for row in engine.execute('EXPLAIN QUERY PLAN ' + statement, parameters)]
+        assert full_scans(plan) == [], f'{route}: {statement}'
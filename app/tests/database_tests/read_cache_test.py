@@ -0,0 +1,75 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Users, Posts, DBSession, DBSessionPosts
+from src.database.read_cache import read_cache_statistics
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            {'post_id': 1, 'user_id': 1, 'title': 'post', 'view_count': 0},
+            )
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_identical_lookups_share_one_query(engine, statements):
+    db = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+    queries_saved = read_cache_statistics.snapshot()['queries_saved']
+
+    # e.g. `get_current_user` and then the route, each with its own `DBSession`.
+    user = DBSession(db, Users).fetch_resource({'user_id': 1})
+    assert DBSession(db, Users).fetch_resource({'user_id': 1}) is user
+    assert DBSessionPosts(db).fetch_value_by_unique_value('post_id', 'user_id', 1) == 1
+    assert DBSessionPosts(db).fetch_value_by_unique_value('post_id', 'user_id', 1) == 1
+
+    assert len(statements) == 2
+    assert DBSession(db, Users).read_cache.queries_saved == 2
+    assert read_cache_statistics.snapshot()['queries_saved'] == queries_saved + 2
+
+    # Another session (request) does not see these entries.
+    DBSession(sessionmaker(bind=engine)(), Users).fetch_resource({'user_id': 1})
+    assert len(statements) == 3
+
+
+def test_writes_invalidate_the_cache(engine, statements):
+    db = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+    db_session = DBSessionPosts(db)
+
+    assert db_session.fetch_resource({'post_id': 1}, convert_to_dict=True)['view_count'] == 0
+    db_session.update_resource('post_id', 1, {'view_count': 5})
+    assert db_session.fetch_resource({'post_id': 1}, convert_to_dict=True)['view_count'] == 5
+
+    db_session.delete_resource({'post_id': 1})
+    assert db_session.fetch_resource({'post_id': 1}) is None
+
+
+def test_relationships_are_joined(engine, statements):
+    db = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+
+    # e.g. `GET /posts/{id}`: `GetPost` reads `user_info` on the event loop.
+    post = DBSessionPosts(db).fetch_resource({'post_id': 1}, False, ['user_info'])
+    db.close()
+
+    assert post.user_info.name == 'Test User'
+    assert len(statements) == 1
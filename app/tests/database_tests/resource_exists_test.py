@@ -0,0 +1,44 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Posts, DBSessionPosts
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            [{'post_id': i, 'user_id': 1, 'title': f'post {i}', 'view_count': 0} for i in range(1, 4)],
+            )
+    return engine
+
+
+def test_resource_exists_is_one_probe(engine):
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    db_session = DBSessionPosts(sessionmaker(autocommit=True, bind=engine)())
+
+    assert db_session.resource_exists({'post_id': 2}) is True
+    assert db_session.resource_exists({'post_id': 2, 'user_id': 2}) is False
+    assert db_session.resource_exists({'post_id': 10}) is False
+    assert len(statements) == 3
+    assert all('EXISTS' in statement for statement in statements)
+
+
+def test_owner_lookup_is_existence_check(engine):
+    db_session = DBSessionPosts(sessionmaker(autocommit=True, bind=engine)())
+
+    assert db_session.fetch_value_by_unique_value('post_id', 'user_id', 3) == 1
+    assert db_session.fetch_value_by_unique_value('post_id', 'user_id', 10) is None
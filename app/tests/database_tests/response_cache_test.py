@@ -0,0 +1,91 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.database.db_models import DBSessionPosts
+from src.middleware import CacheResponses
+from src.response_cache import ResponseCache, response_cache
+
+
+class Clock:
+    def __init__(self,):
+        self.now = 0.0
+
+    def __call__(self,) -> float:
+        return self.now
+
+
+def test_entries_expire_and_lru_stays_within_bytes():
+    clock = Clock()
+    cache = ResponseCache(max_bytes=250, ttl=10, clock=clock)
+
+    for key in ['a', 'b']:
+        assert cache.put(key, 200, [], b'x' * 100, ['posts'], cache.generation)
+    assert cache.get('a') is not None
+
+    # 'b' is the least recently used one.
+    cache.put('c', 200, [], b'x' * 100, ['posts'], cache.generation)
+    assert cache.get('b') is None
+    assert cache.snapshot()['size_bytes'] == 200
+
+    clock.now = 10
+    assert cache.get('a') is None and cache.get('c') is None
+
+    # Too big for the cache, or computed before a write was done: not stored.
+    assert not cache.put('d', 200, [], b'x' * 300, ['posts'], cache.generation)
+    generation = cache.generation
+    cache.invalidate('social_groups')
+    assert not cache.put('d', 200, [], b'x', ['posts'], generation)
+
+    # Stored at other versions of its tables: written through another process.
+    cache.put('e', 200, [], b'x', ['posts'], cache.generation, versions=(1, 1))
+    assert cache.get('e', (1, 1)) is not None
+    assert cache.get('e', (2, 1)) is None and cache.get('e') is None
+
+
+def test_writes_invalidate_the_responses_of_their_tables(session_local):
+    db = session_local()
+    posts_db = DBSessionPosts(db)
+
+    app = FastAPI()
+    app.add_middleware(CacheResponses)
+
+    @app.get('/posts/')
+    def get_posts():
+        return {'posts': len(posts_db.all_posts(limit=10))}
+
+    @app.post('/posts/')
+    def post_post():
+        posts_db.add_resource({'user_id': 1, 'title': 'post', 'view_count': 0})
+        return {}
+
+    @app.get('/social_groups/{group_id}')
+    def get_social_group(group_id: int):
+        return {'social_groups': 0}
+
+    client = TestClient(app)
+    response_cache.clear()
+
+    assert client.get('/posts/?limit=5&skip=1').headers['x-cache'] == 'MISS'
+    response = client.get('/posts/?skip=1&limit=5')
+    assert response.headers['x-cache'] == 'HIT' and response.json() == {'posts': 0}
+    client.get('/social_groups/1')
+
+    # The write drops the entry itself, before the response is sent.
+    posts_db.add_resource({'user_id': 1, 'title': 'post', 'view_count': 0})
+    assert response_cache.get('/posts/?limit=5&skip=1') is None
+
+    client.post('/posts/')
+    response = client.get('/posts/?limit=5&skip=1')
+    assert response.headers['x-cache'] == 'MISS' and response.json() == {'posts': 2}
+    assert client.get('/social_groups/1').headers['x-cache'] == 'HIT'
+
@@ -0,0 +1,108 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import itertools
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_setup import RoutingSession
+from src.database.db_models import Posts, DBSessionPosts
+
+
+@pytest.fixture
+def create_posts_database(create_database):
+    def create(name: str, title: str):
+        engine = create_database(f'{name}.db', connect_args={'check_same_thread': False})
+        with engine.begin() as connection:
+            connection.execute(
+                Posts.__table__.insert(),
+                {'post_id': 1, 'user_id': 1, 'title': title, 'view_count': 0},
+                )
+        return engine
+
+    return create
+
+
+@pytest.fixture
+def engines(create_posts_database):
+    primary = create_posts_database('primary', 'primary post')
+    replica = create_posts_database('replica', 'replica post')
+    return primary, replica
+
+
+def make_session(primary, replicas):
+    RoutedSessionLocal = sessionmaker(
+        class_=RoutingSession,
+        autocommit=True,
+        autoflush=False,
+        primary=primary,
+        replicas=itertools.cycle(replicas) if replicas else None,
+        )
+    return RoutedSessionLocal()
+
+
+def test_reads_go_to_replica(engines):
+    primary, replica = engines
+    db_session = DBSessionPosts(make_session(primary, [replica]))
+
+    post = db_session.fetch_resource({'post_id': 1})
+
+    assert post.title == 'replica post'
+    assert db_session.all_posts()[0]['title'] == 'replica post'
+
+
+def test_writes_go_to_primary_and_stick(engines):
+    primary, replica = engines
+    session = make_session(primary, [replica])
+    db_session = DBSessionPosts(session)
+
+    db_session.update_resource('post_id', 1, {'title': 'updated post'})
+
+    assert session.stick_to_primary
+    assert primary.execute('SELECT title FROM posts WHERE post_id = 1').scalar() == 'updated post'
+    assert replica.execute('SELECT title FROM posts WHERE post_id = 1').scalar() == 'replica post'
+    # The same request reads its own write.
+    assert db_session.fetch_value_by_unique_value('post_id', 'title', 1) == 'updated post'
+
+
+def test_inserts_go_to_primary(engines):
+    primary, replica = engines
+    session = make_session(primary, [replica])
+    db_session = DBSessionPosts(session)
+
+    db_session.add_resource({'user_id': 1, 'title': 'new post', 'view_count': 0})
+
+    assert primary.execute('SELECT COUNT(*) FROM posts').scalar() == 2
+    assert replica.execute('SELECT COUNT(*) FROM posts').scalar() == 1
+    assert session.stick_to_primary
+
+
+def test_without_replicas_everything_goes_to_primary(engines):
+    primary, _ = engines
+    db_session = DBSessionPosts(make_session(primary, []))
+
+    assert db_session.fetch_resource({'post_id': 1}).title == 'primary post'
+
+
+def test_replicas_are_used_round_robin(engines, create_posts_database):
+    primary, replica = engines
+    second_replica = create_posts_database('replica_2', 'second replica post')
+    RoutedSessionLocal = sessionmaker(
+        class_=RoutingSession,
+        autocommit=True,
+        autoflush=False,
+        primary=primary,
+        replicas=itertools.cycle([replica, second_replica]),
+        )
+
+    titles = [DBSessionPosts(RoutedSessionLocal()).fetch_resource({'post_id': 1}).title for _ in range(2)]
+
+    assert titles == ['replica post', 'second replica post']
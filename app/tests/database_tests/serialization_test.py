@@ -0,0 +1,82 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from datetime import datetime
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from src.posts.models_posts import GetAllPosts
+from src.social_groups.models_social_groups import GetAllSocialGroups
+from src.serialization import rows_response
+from src.pagination import NEXT_CURSOR_HEADER
+from main import my_rest_api
+
+
+POST_ROWS = [
+    {
+        'post_id': 2,
+        'view_count': 7,
+        'user_id': 1,
+        'title': 'post "2" — ünïcode',
+        'created_at': datetime(2023, 1, 1, 10, 30, 0, 123456),
+        'updated_at': None,
+        'author': 'Test User',
+        'email': 'test_user@mymail.com',
+        'upvotes': 3,
+        # Full-text search rows carry their relevance, which the response leaves out.
+        'relevance': 1.5,
+        },
+    {
+        'post_id': 1,
+        'view_count': 0,
+        'user_id': 1,
+        'title': 'post 1',
+        'created_at': datetime(2023, 1, 1),
+        'updated_at': datetime(2023, 1, 2, 8),
+        'author': 'Test User',
+        'email': 'test_user@mymail.com',
+        'upvotes': 0,
+        },
+    ]
+
+SOCIAL_GROUP_ROWS = [
+    {
+        'group_id': 1,
+        'title': 'group',
+        'details': 'details',
+        'created_at': datetime(2023, 1, 1),
+        'updated_at': None,
+        'admin_info': {'user_id': 1, 'name': 'Test User', 'email': 'test_user@mymail.com'},
+        'members': 4,
+        },
+    ]
+
+
+def test_fast_path_matches_the_response_model():
+    for rows, model in [(POST_ROWS, GetAllPosts), (SOCIAL_GROUP_ROWS, GetAllSocialGroups)]:
+        response = Response()
+        response.headers[NEXT_CURSOR_HEADER] = 'cursor'
+
+        fast_response = rows_response(response, rows, model)
+
+        # What the route would send through its `response_model`.
+        adapter = TypeAdapter(List[model])
+        assert fast_response.body == adapter.dump_json(adapter.validate_python(rows))
+        assert fast_response.headers[NEXT_CURSOR_HEADER] == 'cursor'
+
+
+def test_listings_keep_their_documented_schema():
+    responses = my_rest_api.openapi()['paths']['/posts/']['get']['responses']
+    schema = responses['200']['content']['application/json']['schema']
+
+    assert schema['type'] == 'array'
+    assert schema['items'] == {'$ref': '#/components/schemas/GetAllPosts'}
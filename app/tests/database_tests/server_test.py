@@ -0,0 +1,49 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from uvicorn.config import LOGGING_CONFIG
+
+from src import server
+from src.env_models import settings
+from src.server import APP, APP_SHUTDOWN_SECONDS, gunicorn_options, uvicorn_options
+
+
+def test_server_options_follow_the_settings(monkeypatch):
+    monkeypatch.setattr(settings, 'server_workers', 3)
+    monkeypatch.setattr(settings, 'server_max_requests', 500)
+
+    options = gunicorn_options()
+    assert options['workers'] == 3
+    assert options['worker_class'] == 'src.uvicorn_worker.UvicornWorker'
+    assert options['max_requests'] == 500
+    assert options['bind'] == f'{settings.server_host}:{settings.server_port}'
+    # The worker's graceful shutdown ends before gunicorn gives up on it.
+    assert options['graceful_timeout'] == settings.server_graceful_timeout + APP_SHUTDOWN_SECONDS
+
+    options = uvicorn_options()
+    assert options['workers'] == 3
+    assert 'limit_max_requests' not in options
+
+    monkeypatch.setattr(settings, 'server_workers', 0)
+    assert gunicorn_options()['workers'] == (os.cpu_count() or 1)
+
+
+def test_uvicorn_fallback_is_logged(monkeypatch, caplog):
+    monkeypatch.setitem(sys.modules, 'gunicorn.app.base', None) # as if gunicorn was not installed
+    logging_configs, runs = [], []
+    monkeypatch.setattr(server.logging.config, 'dictConfig', logging_configs.append)
+    monkeypatch.setattr(server.uvicorn, 'run', lambda app, **options: runs.append(app))
+
+    server.serve()
+
+    assert runs == [APP]
+    assert logging_configs == [LOGGING_CONFIG]
+    [record] = [record for record in caplog.records if record.name == 'uvicorn.error']
+    assert record.levelname == 'WARNING' and 'gunicorn is not installed' in record.getMessage()
@@ -0,0 +1,94 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Posts, DBSessionPosts
+from src.posts.models_posts import GetAllPosts
+from src.database.db_setup import get_async_routed_db
+from src.env_models import settings
+from src.streaming import NDJSON_MEDIA_TYPE, ndjson_response, stream_limit, wants_ndjson
+from main import my_rest_api
+
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {
+                    'post_id': i,
+                    'user_id': 1,
+                    'title': f'post {i}',
+                    'view_count': 0,
+                    'created_at': datetime(2023, 1, 1) + timedelta(minutes=i),
+                    }
+                for i in range(1, 26)
+            ],
+            )
+    session = sessionmaker(autocommit=True, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+def test_streamed_rows_match_the_listing(db):
+    db_session = DBSessionPosts(db)
+
+    rows = db_session.all_posts(limit=20, stream=True)
+    assert not isinstance(rows, list)
+    assert list(rows) == db_session.all_posts(limit=20)
+
+    # Read in chunks smaller than the result.
+    statement = Posts.__table__.select().order_by(Posts.post_id)
+    assert [row['post_id'] for row in db_session.stream_rows(statement, chunk_size=4)] == list(range(1, 26))
+
+
+def test_ndjson_response_writes_one_post_per_line(db):
+    app = FastAPI()
+
+    @app.get('/posts/')
+    def get_posts():
+        return ndjson_response(DBSessionPosts(db).all_posts(stream=True), GetAllPosts)
+
+    response = TestClient(app).get('/posts/', headers={'Accept': NDJSON_MEDIA_TYPE})
+
+    assert response.headers['content-type'] == NDJSON_MEDIA_TYPE
+    posts = [json.loads(line) for line in response.text.splitlines()]
+    assert [post['post_id'] for post in posts] == list(range(25, 0, -1))
+    assert posts[0]['author'] == 'Test User'
+
+
+def test_streams_are_capped(db, monkeypatch):
+    monkeypatch.setattr(settings, 'stream_max_rows', 10)
+    assert [stream_limit(limit) for limit in [None, 0, 5, 50]] == [10, 10, 5, 10]
+
+    my_rest_api.dependency_overrides[get_async_routed_db] = lambda: db
+    try:
+        client = TestClient(my_rest_api)
+        unbounded = client.get('/posts/', headers={'Accept': NDJSON_MEDIA_TYPE})
+        too_long = client.get('/posts/?limit=20', headers={'Accept': NDJSON_MEDIA_TYPE})
+    finally:
+        my_rest_api.dependency_overrides.clear()
+
+    assert len(unbounded.text.splitlines()) == 10
+    assert len(too_long.text.splitlines()) == 10
+
+
+def test_wants_ndjson():
+    assert wants_ndjson('application/json, application/x-ndjson;q=0.9')
+    assert not wants_ndjson('application/json')
+    assert not wants_ndjson(None)
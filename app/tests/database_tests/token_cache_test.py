@@ -0,0 +1,94 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src import oauth2
+from src.auth.models_auth import CurrentUser
+from src.auth.token_cache import TokenCache, token_cache
+from src.database.db_models import DBSessionUsers
+from src.oauth2 import create_access_token, get_current_user
+
+
+class Clock:
+    def __init__(self,):
+        self.now = 1000.0
+
+    def __call__(self,) -> float:
+        return self.now
+
+
+def user(user_id: int) -> CurrentUser:
+    return CurrentUser(user_id=user_id, name=f'User {user_id}', email=f'user_{user_id}@mymail.com')
+
+
+def test_entries_expire_with_their_token_and_stay_bounded():
+    clock = Clock()
+    cache = TokenCache(max_entries=2, ttl=60, clock=clock)
+
+    assert cache.put('a', user(1), token_expires_at=1010, generation=cache.generation)
+    assert cache.put('b', user(2), token_expires_at=None, generation=cache.generation)
+    assert cache.get('a') == user(1)
+
+    # 'b' is the least recently used one.
+    cache.put('c', user(3), token_expires_at=None, generation=cache.generation)
+    assert cache.get('b') is None
+
+    clock.now = 1010
+    assert cache.get('a') is None and cache.get('c') == user(3)
+    clock.now = 1060
+    assert cache.get('c') is None
+
+
+def test_invalidated_users_are_not_cached_again():
+    cache = TokenCache(max_entries=10, ttl=60)
+    cache.put('a', user(1), None, cache.generation)
+    cache.put('b', user(1), None, cache.generation)
+    cache.put('c', user(2), None, cache.generation)
+
+    # Resolved before the invalidation.
+    generation = cache.generation
+    assert cache.invalidate_user(1) == 2
+    assert not cache.put('a', user(1), None, generation)
+
+    assert cache.get('a') is None and cache.get('b') is None
+    assert cache.get('c') == user(2)
+
+
+@pytest.fixture
+def db(session_local):
+    session = session_local()
+    token_cache.clear()
+    yield session
+    session.close()
+    token_cache.clear()
+
+
+def test_repeat_requests_skip_the_decoding_and_the_lookup(db, monkeypatch):
+    token = create_access_token({'user_id': 1})
+    decodes = []
+    decode = oauth2.jwt.decode
+    monkeypatch.setattr(oauth2.jwt, 'decode', lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+
+    for _ in range(3):
+        assert asyncio.run(get_current_user(token, db)) == CurrentUser(
+            user_id=1, name='Test User', email='test_user@mymail.com',
+            )
+    assert len(decodes) == 1
+
+    # Deleted: the cached user goes with it and the token no longer authenticates.
+    DBSessionUsers(db).delete_resource({'user_id': 1})
+    token_cache.invalidate_user(1)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_current_user(token, db))
+    assert error.value.status_code == 401
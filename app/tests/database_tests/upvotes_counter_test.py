@@ -0,0 +1,72 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Users, Posts, Votes, DBSessionVotes
+from src.jobs.reconcile_upvotes import reconcile_upvotes
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Users.__table__.insert(),
+            [
+                {'user_id': user_id, 'name': f'User {user_id}', 'email': f'user_{user_id}@mymail.com', 'password': f'x{user_id}'}
+                for user_id in range(2, 4)
+                ],
+            )
+        connection.execute(
+            Posts.__table__.insert(),
+            [{'post_id': post_id, 'user_id': 1, 'title': f'post {post_id}', 'view_count': 0} for post_id in range(1, 4)],
+            )
+    return engine
+
+
+def upvotes(engine) -> dict:
+    with engine.connect() as connection:
+        return dict(connection.execute(select([Posts.post_id, Posts.upvotes])).fetchall())
+
+
+def test_vote_writes_keep_the_counter(engine):
+    db_session = DBSessionVotes(sessionmaker(autocommit=True, autoflush=False, bind=engine)())
+
+    db_session.add_resource({'post_id': 1, 'user_id': 1})
+    errors = db_session.add_resources([
+        {'post_id': 1, 'user_id': 2},
+        {'post_id': 2, 'user_id': 2},
+        # Fails and is not counted.
+        {'post_id': None, 'user_id': 3},
+        ])
+    assert errors[:2] == [None, None] and errors[2] is not None
+    assert upvotes(engine) == {1: 2, 2: 1, 3: 0}
+
+    db_session.delete_resource({'post_id': 1, 'user_id': 1})
+    assert db_session.delete_resources('post_id', [1, 2, 3], {'user_id': 2}) == 2
+    # Nothing left to delete: the counters do not move.
+    assert db_session.delete_resources('post_id', [1, 2], {'user_id': 2}) == 0
+    assert upvotes(engine) == {1: 0, 2: 0, 3: 0}
+
+
+def test_reconcile_fixes_drifted_counters(engine):
+    with engine.begin() as connection:
+        # Votes written behind `DBSessionVotes`, e.g. left over by a cascade or a manual fix.
+        connection.execute(Votes.__table__.insert(), [{'post_id': 2, 'user_id': 1}, {'post_id': 2, 'user_id': 3}])
+        connection.execute(Posts.__table__.update().where(Posts.post_id == 3).values(upvotes=5))
+
+    assert reconcile_upvotes(engine, batch_size=2, dry_run=True) == {2: 2, 3: 0}
+    assert upvotes(engine) == {1: 0, 2: 0, 3: 5}
+
+    assert reconcile_upvotes(engine, batch_size=2) == {2: 2, 3: 0}
+    assert upvotes(engine) == {1: 0, 2: 2, 3: 0}
+    assert reconcile_upvotes(engine) == {}
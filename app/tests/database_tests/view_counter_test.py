@@ -0,0 +1,101 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event, select
+
+from src.background_writes import BackgroundWriteQueue
+from src.database.db_models import Posts
+from src.posts.view_counter import ViewCountBuffer, register_views_writer
+
+
+@pytest.fixture
+def engine(engine):
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            [
+                {'post_id': 1, 'user_id': 1, 'title': 'post 1', 'view_count': 10},
+                {'post_id': 2, 'user_id': 1, 'title': 'post 2', 'view_count': None},
+                ],
+            )
+    return engine
+
+
+def view_counts(engine) -> dict:
+    with engine.connect() as connection:
+        return dict(connection.execute(select([Posts.post_id, Posts.view_count])).fetchall())
+
+
+def views_queue(buffer: ViewCountBuffer, engine, **options) -> BackgroundWriteQueue:
+    queue = BackgroundWriteQueue(**{
+        'batch_size': 100,
+        'batch_delay': 0,
+        'max_retries': 1,
+        'retry_delay': 0,
+        'max_pending': 100,
+        **options,
+        })
+    register_views_writer(queue, buffer, engine)
+    return queue
+
+
+def test_concurrent_views_are_written_in_one_update(engine):
+    buffer = ViewCountBuffer()
+    queue = views_queue(buffer, engine)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(buffer.add_view, [1] * 500 + [2] * 100))
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    assert buffer.submit_pending(queue)
+    # Submitted twice before the worker runs: both batches are merged into the same UPDATE.
+    buffer.add_view(1)
+    assert buffer.submit_pending(queue)
+    asyncio.run(queue.stop())
+
+    assert len([statement for statement in statements if statement.startswith('UPDATE')]) == 1
+    assert view_counts(engine) == {1: 511, 2: 100}
+    assert buffer.pending == {}
+    assert not buffer.submit_pending(queue)
+
+
+def test_failed_write_requeues_the_views(engine):
+    buffer = ViewCountBuffer()
+    queue = views_queue(buffer, engine)
+    buffer.add_view(1)
+    buffer.add_view(1)
+
+    assert buffer.submit_pending(queue)
+    with engine.connect() as connection:
+        connection.execute('DROP TABLE posts')
+    asyncio.run(queue.stop())
+
+    assert queue.snapshot()['failed'] == 1
+    # Back in the buffer for the next submit, with the views counted since.
+    buffer.add_view(1)
+    assert buffer.pending == {1: 3}
+
+
+def test_full_queue_keeps_the_views(engine):
+    buffer = ViewCountBuffer()
+    queue = views_queue(buffer, engine, max_pending=0)
+    buffer.add_view(2)
+
+    assert not buffer.submit_pending(queue)
+
+    assert queue.snapshot()['dropped'] == 1
+    assert buffer.pending == {2: 1}
+    assert view_counts(engine) == {1: 10, 2: None}
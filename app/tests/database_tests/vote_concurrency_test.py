@@ -0,0 +1,77 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from src.database.db_models import Posts, Votes, DBSessionVotes
+
+THREADS = 16
+
+
+@pytest.fixture
+def engine(create_database):
+    engine = create_database(connect_args={'timeout': 30})
+    with engine.begin() as connection:
+        connection.execute(
+            Posts.__table__.insert(),
+            {'post_id': 1, 'user_id': 1, 'title': 'post', 'view_count': 0},
+            )
+    return engine
+
+
+def vote_state(engine) -> tuple:
+    with engine.connect() as connection:
+        votes = connection.execute(select([func.count()]).select_from(Votes.__table__)).scalar()
+        upvotes = connection.execute(select([Posts.upvotes])).scalar()
+    return votes, upvotes
+
+
+def fire(engine, method: str) -> list:
+    """The same vote from `THREADS` threads, each with its own session (request)."""
+
+    def vote(_) -> int:
+        db_session = DBSessionVotes(sessionmaker(autocommit=True, autoflush=False, bind=engine)())
+        try:
+            return getattr(db_session, method)(1, 1)
+        finally:
+            db_session.SessionLocal.close()
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        return list(executor.map(vote, range(THREADS)))
+
+
+def test_concurrent_upvotes_insert_one_vote(engine):
+    assert sorted(fire(engine, 'add_vote')) == [0] * (THREADS - 1) + [1]
+    assert vote_state(engine) == (1, 1)
+
+    assert sorted(fire(engine, 'remove_vote')) == [0] * (THREADS - 1) + [1]
+    assert vote_state(engine) == (0, 0)
+
+
+def test_vote_is_one_statement(engine):
+    db_session = DBSessionVotes(sessionmaker(autocommit=True, autoflush=False, bind=engine)())
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    assert db_session.add_vote(1, 1) == 1
+    # The vote and its counter, then the table versions.
+    assert [statement.split()[0] for statement in statements] == ['INSERT', 'UPDATE', 'UPDATE']
+    assert statements[0].startswith('INSERT OR IGNORE INTO votes')
+    assert statements[2].startswith('UPDATE table_versions')
+
+    # Missing post: nothing inserted, no counter update.
+    assert db_session.add_vote(2, 1) == 0
+    assert db_session.remove_vote(2, 1) == 0
+    assert vote_state(engine) == (1, 1)
@@ -0,0 +1,54 @@
+import os
+import sys
+import re
+
+full_path = os.path.dirname(os.path.abspath(__file__))
+
+path = re.sub('/tests/database_tests', '', full_path)
+
+sys.path.append(path)
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy.pool import QueuePool
+
+from src import warmup
+from src.warmup import HOT_QUERIES, warm_pool, run_hot_queries, warm_up
+
+
+@pytest.fixture
+def engine(create_database):
+    return create_database(
+        connect_args={'check_same_thread': False}, poolclass=QueuePool, pool_size=3,
+        )
+
+
+def test_pool_is_filled_up_to_its_size(engine):
+    engine.dispose()
+
+    assert warm_pool(engine, 10) == 3
+    assert engine.pool.checkedin() == 3
+    assert engine.pool.checkedout() == 0
+    assert warm_pool(engine, 0) == 0
+
+
+def test_hot_queries_run_once(session_local):
+    failed = run_hot_queries(session_local)
+
+    # Only the full-text search needs its migration (not run by `create_all`).
+    assert set(failed) <= {'posts full-text search'}
+
+
+def test_warmup_report(engine, session_local, monkeypatch):
+    monkeypatch.setattr(warmup, 'engine', engine)
+    monkeypatch.setattr(warmup, 'replica_engines', [])
+    monkeypatch.setattr(warmup, 'SessionLocal', session_local)
+    app = FastAPI()
+
+    report = warm_up(app)
+
+    assert report['pool_connections'] == 3
+    assert report['queries'] + len(report['failed_queries']) == len(HOT_QUERIES)
+    assert report['total_seconds'] >= report['pool_seconds'] + report['queries_seconds']
+    assert app.openapi_schema is not None
+    assert warmup.warmup_report == report